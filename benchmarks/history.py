@@ -0,0 +1,56 @@
+'''
+The history files of the benchmarks: one JSON record per run, appended to a file under .kavm/benchmarks
+'''
+
+import json
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Final, List, Optional
+
+REPO_ROOT: Final = Path(__file__).resolve().parent.parent
+
+
+def commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def last_record(history: Path) -> Optional[Dict[str, Any]]:
+    if not history.exists():
+        return None
+    lines = [line for line in history.read_text().splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def append_record(history: Path, **fields: Any) -> None:
+    """Append a run to the history, stamped with the time, the commit and the Python version it ran with"""
+    record = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit(),
+        'python': sys.version.split()[0],
+        **fields,
+    }
+    history.parent.mkdir(parents=True, exist_ok=True)
+    with history.open('a') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def compare(name: str, median: float, previous: Optional[float], threshold: float, regressions: List[str]) -> None:
+    """Print a case's median next to the previous run's, adding the case to `regressions` if it got too slow"""
+    line = f'{name:<40}{median:>9.3f}s'
+    if previous is not None:
+        change = median / previous - 1 if previous else 0.0
+        line += f'{previous:>9.3f}s{change:>+9.0%}'
+        if change > threshold:
+            regressions.append(name)
+    print(line)
+
+
+def print_header() -> None:
+    print(f'{"case":<40}{"median":>10}{"previous":>10}{"change":>9}')
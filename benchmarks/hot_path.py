@@ -0,0 +1,167 @@
+'''
+Latency of the K Coin Vault mint/burn hot path, on every backend
+
+Every backend runs in its own interpreter, which times, `--runs` times each: the deployment of the vault,
+a single mint, a single burn, a mint followed by burning what it minted, and a sequence of `--steps`
+alternating mints and burns. Per case, the median, min and max wall-clock times, the outputs of the calls,
+and the peak resident memory of the interpreter so far are appended to the history in
+.kavm/benchmarks/hot-path.jsonl, with the time spent in every profiled phase, e.g. `app-create` or `sign`.
+Each run is compared with the previous one in the history, and with --check the script fails
+if a case got slower by more than --threshold.
+
+    poetry run python benchmarks/hot_path.py --backend kavm --backend sandbox --runs 5 --check
+
+A backend that cannot run, e.g. the sandbox when it is not up, is recorded with its error and skipped.
+'''
+
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Callable, Dict, Final, List
+
+from history import REPO_ROOT, append_record, compare, last_record, print_header
+
+from kcoin_vault.paths import BENCHMARK_DIR
+
+BACKENDS: Final = ('kavm', 'sandbox', 'fast')
+DEFAULT_BACKENDS: Final = ('kavm', 'sandbox')
+
+PYTEAL_CODE_MODULE: Final = 'kcoin_vault.kcoin_vault_pyteal_fixed'
+
+MINT_AMOUNT: Final = 10000
+BURN_AMOUNT: Final = 5000
+
+
+def _peak_rss_mb() -> float:
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _time_case(runs: int, setup: Callable[[], Any], call: Callable[[Any], Any]) -> Dict[str, Any]:
+    times = []
+    outputs = []
+    for _ in range(runs):
+        arg = setup()
+        start = time.perf_counter()
+        outputs.append(call(arg))
+        times.append(time.perf_counter() - start)
+    return {
+        'median_s': statistics.median(times),
+        'min_s': min(times),
+        'max_s': max(times),
+        'outputs': outputs,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def run_worker(backend: str, runs: int, steps: int) -> Dict[str, Any]:
+    """Time the cases on a backend, in this interpreter"""
+    from kcoin_vault.client import ContractClient
+    from kcoin_vault.engine import create_algod, creator_account
+    from kcoin_vault.profiling import PROFILER
+    from kcoin_vault.sequence import MethodCall, run_calls
+
+    PROFILER.enable()
+    creator = creator_account(backend)
+    algod = create_algod(backend, creator)
+    addr, pk = creator['address'], creator['private_key']
+
+    def deploy(_: None) -> int:
+        # the TEAL compilation is part of a deployment, so it is not served from the cache
+        return ContractClient(algod, addr, pk, PYTEAL_CODE_MODULE, cache_compiled=False).app_id
+
+    def sequence(_: None) -> Dict[str, int]:
+        calls = (
+            MethodCall('mint', (MINT_AMOUNT,)) if i % 2 == 0 else MethodCall('burn', (BURN_AMOUNT,))
+            for i in range(steps)
+        )
+        summary = run_calls(client, addr, pk, calls)
+        return {'calls': summary.calls, 'failed': summary.failed}
+
+    results = {'deploy': _time_case(runs, lambda: None, deploy)}
+    client = ContractClient(algod, addr, pk, PYTEAL_CODE_MODULE)
+    results['mint'] = _time_case(runs, lambda: None, lambda _: client.call_mint(addr, pk, MINT_AMOUNT))
+    results['burn'] = _time_case(
+        runs, lambda: client.call_mint(addr, pk, MINT_AMOUNT), lambda _: client.call_burn(addr, pk, BURN_AMOUNT)
+    )
+    results['mint+burn'] = _time_case(
+        runs, lambda: None, lambda _: client.call_burn(addr, pk, client.call_mint(addr, pk, MINT_AMOUNT))
+    )
+    results[f'sequence x{steps}'] = _time_case(runs, lambda: None, sequence)
+    return {'results': results, 'phases': PROFILER.report()['phases']}
+
+
+def run_backend(backend: str, runs: int, steps: int) -> Dict[str, Any]:
+    """Time the cases on a backend, in a fresh interpreter so that its imports and memory are its own"""
+    proc = subprocess.run(
+        [sys.executable, __file__, '--worker', backend, '--runs', str(runs), '--steps', str(steps)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = proc.stderr.strip().splitlines()
+        return {'error': error[-1] if error else f'exit code {proc.returncode}'}
+    # the backends may print to stdout, the worker's report is the last line
+    return json.loads(lines[-1])
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Measure the latency of the mint/burn hot path on every backend')
+    parser.add_argument(
+        '--backend',
+        dest='backends',
+        action='append',
+        choices=BACKENDS,
+        help=f'Backend to run, {" and ".join(DEFAULT_BACKENDS)} by default',
+    )
+    parser.add_argument('--runs', type=int, default=5, help='Runs per case')
+    parser.add_argument('--steps', type=int, default=100, help='Calls of the sequence case')
+    parser.add_argument('--history', type=Path, default=BENCHMARK_DIR / 'hot-path.jsonl', help='History file')
+    parser.add_argument('--no-record', dest='record', default=True, action='store_false', help='Do not append the run')
+    parser.add_argument('--check', default=False, action='store_true', help='Fail if a case regressed')
+    parser.add_argument(
+        '--threshold', type=float, default=0.2, help='Slowdown, as a fraction of the previous median, that regresses'
+    )
+    parser.add_argument('--worker', choices=BACKENDS, help='Run the cases on a backend and print the report as JSON')
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(run_worker(args.worker, args.runs, args.steps)))
+        return
+
+    history = args.history if args.history.is_absolute() else REPO_ROOT / args.history
+    previous = (last_record(history) or {}).get('backends', {})
+    backends = {backend: run_backend(backend, args.runs, args.steps) for backend in args.backends or DEFAULT_BACKENDS}
+
+    regressions: List[str] = []
+    print_header()
+    for backend, report in backends.items():
+        if 'error' in report:
+            print(f'{backend:<40}failed: {report["error"]}')
+            continue
+        before = previous.get(backend, {}).get('results', {})
+        for case, result in report['results'].items():
+            median_before = before[case]['median_s'] if case in before else None
+            compare(f'{backend}/{case}', result['median_s'], median_before, args.threshold, regressions)
+        peak_rss_mb = max(result['peak_rss_mb'] for result in report['results'].values())
+        print(f'{backend + " peak RSS":<40}{peak_rss_mb:>8.0f}MB')
+
+    if args.record:
+        append_record(history, runs=args.runs, steps=args.steps, backends=backends)
+
+    if regressions:
+        print(f'Slower than the previous run by more than {args.threshold:.0%}: {", ".join(regressions)}')
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+'''
+Cold-start time of the kavm-demo command line
+
+Every case runs in fresh interpreters, `--runs` times, and its median wall-clock time is appended to
+the history in .kavm/benchmarks/startup.jsonl together with the commit it was measured at.
+Each run is compared with the previous one in the history, and with --check the script fails
+if a case got slower by more than --threshold.
+
+    poetry run python benchmarks/startup.py --runs 10 --check
+'''
+
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Dict, Final, List
+
+from history import REPO_ROOT, append_record, compare, last_record, print_header
+
+from kcoin_vault.paths import BENCHMARK_DIR
+
+_RUN_DEMO: Final = 'from kcoin_vault.__main__ import run_demo; run_demo()'
+
+# Case name -> arguments of the interpreter. The commands only parse their arguments, or fail right after,
+# so what is measured is the interpreter and the imports the command line pays for before doing any work.
+CASES: Final = {
+    'help': ['-c', _RUN_DEMO, '--help'],
+    'test --help': ['-c', _RUN_DEMO, 'test', '--help'],
+    'verify --help': ['-c', _RUN_DEMO, 'verify', '--help'],
+    'serve --stop': ['-c', _RUN_DEMO, 'serve', '--stop'],
+    'import kcoin_vault.__main__': ['-c', 'import kcoin_vault.__main__'],
+    'import kcoin_vault.client': ['-c', 'import kcoin_vault.client'],
+    'python': ['-c', 'pass'],
+}
+
+
+def measure(args: List[str], runs: int) -> Dict[str, float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        # the exit code is not checked: `serve --stop` fails without a server, and the import cases may lack KAVM
+        subprocess.run(
+            [sys.executable, *args], cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False
+        )
+        times.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'max_s': max(times)}
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Measure the cold-start time of the kavm-demo command line')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per case')
+    parser.add_argument(
+        '--case', dest='cases', action='append', choices=list(CASES), help='Case to run, all by default'
+    )
+    parser.add_argument('--history', type=Path, default=BENCHMARK_DIR / 'startup.jsonl', help='History file')
+    parser.add_argument('--no-record', dest='record', default=True, action='store_false', help='Do not append the run')
+    parser.add_argument('--check', default=False, action='store_true', help='Fail if a case regressed')
+    parser.add_argument(
+        '--threshold', type=float, default=0.2, help='Slowdown, as a fraction of the previous median, that regresses'
+    )
+    args = parser.parse_args()
+
+    history = args.history if args.history.is_absolute() else REPO_ROOT / args.history
+    previous = last_record(history)
+    results = {name: measure(CASES[name], args.runs) for name in args.cases or CASES}
+
+    regressions: List[str] = []
+    print_header()
+    for name, result in results.items():
+        before = (previous or {}).get('results', {}).get(name)
+        compare(name, result['median_s'], before['median_s'] if before else None, args.threshold, regressions)
+
+    if args.record:
+        append_record(history, runs=args.runs, results=results)
+
+    if regressions:
+        print(f'Slower than the previous run by more than {args.threshold:.0%}: {", ".join(regressions)}')
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
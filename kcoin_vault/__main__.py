@@ -1,13 +1,29 @@
+import json
 import logging
+import shutil
 import sys
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from contextlib import ExitStack, closing
 from pathlib import Path
-from typing import Callable, Final, List, TypeVar
+from typing import TYPE_CHECKING, Callable, Final, List, Optional, TypeVar
 
-import coloredlogs
-import pytest
-from kavm.prover import AutoProver
-from pyk.cli_utils import file_path
+from kcoin_vault.paths import (
+    FAST_EXAMPLES_DIR,
+    N_TESTS,
+    PROFILE_DIR,
+    PROOF_CACHE_DIR,
+    PROOF_PROGRESS,
+    PROOF_STATS,
+    SERVE_SOCKET,
+)
+from kcoin_vault.profiling import PROFILER, phase
+
+if TYPE_CHECKING:
+    from kcoin_vault.load import LoadConfig
+
+# Every command imports what it needs when it runs: pytest, PyTeal, the SDK and above all KAVM take seconds to
+# import, which `--help`, `serve --stop` or a proof run by the KAVM server should not pay for.
+# benchmarks/startup.py keeps track of the cold-start time of the commands.
 
 T = TypeVar('T')
 
@@ -19,23 +35,97 @@ def run_demo(args=sys.argv) -> None:
     sys.setrecursionlimit(15000000)
     parser = create_argument_parser()
     args = parser.parse_args()
+    if args.command == 'check-rounding':
+        _check_rounding_range(parser, args)
+
+    import coloredlogs
+
     coloredlogs.install(level=_loglevel(args), fmt=_LOG_FORMAT)
 
     if not args.debug:
         logging.getLogger('pyk.ktool.kprove').setLevel(logging.CRITICAL)
         logging.getLogger('pyk.ktool.krun').setLevel(logging.CRITICAL)
 
+    if args.profile:
+        PROFILER.enable(cprofile=args.cprofile)
+    try:
+        with phase(args.command):
+            _exec(args)
+    finally:
+        if args.profile:
+            PROFILER.write(args.profile_dir, args.command)
+
+
+def _exec(args: Namespace) -> None:
     if args.command == 'test':
         exec_test(
             pyteal_code_file=args.pyteal_code_file,
             test_code_file=args.test_code_file,
             verbose=args.verbose,
             backend=args.backend,
+            examples=args.examples,
+            workers=args.workers,
+            seed=args.seed,
+            profile=args.profile,
+            use_server=args.use_server,
+            shrink=args.shrink,
         )
     elif args.command == 'verify':
-        exec_verify(pyteal_code_file=args.pyteal_code_file, method=args.method)
+        exec_verify(
+            pyteal_code_file=args.pyteal_code_file,
+            methods=args.methods,
+            jobs=args.jobs,
+            use_cache=args.use_cache,
+            cache_size=args.cache_size,
+            use_server=args.use_server,
+            progress_interval=args.progress_interval,
+            kore_log=args.kore_log,
+        )
     elif args.command == 'simulate':
-        exec_simulate(pyteal_code_file=args.pyteal_code_file, methods=args.methods, backend=args.backend)
+        exec_simulate(
+            pyteal_code_file=args.pyteal_code_file,
+            methods=args.methods,
+            methods_file=args.methods_file,
+            output=args.output,
+            backend=args.backend,
+            use_server=args.use_server,
+        )
+    elif args.command == 'serve':
+        exec_serve(stop=args.stop)
+    elif args.command == 'shell':
+        exec_shell(
+            pyteal_code_file=args.pyteal_code_file,
+            backend=args.backend,
+            verbose=args.verbose,
+            use_server=args.use_server,
+        )
+    elif args.command == 'load':
+        from kcoin_vault.load import LoadConfig
+
+        exec_load(
+            pyteal_code_file=args.pyteal_code_file,
+            config=LoadConfig(
+                n_accounts=args.accounts,
+                rate=args.rate,
+                duration=args.duration,
+                mint_ratio=args.mint_ratio,
+                max_in_flight=args.max_in_flight,
+                seed=args.seed,
+            ),
+            backend=args.backend,
+            report_file=args.report_file,
+            sign_workers=args.sign_workers,
+            verbose=args.verbose,
+        )
+    elif args.command == 'check-rounding':
+        exec_check_rounding(
+            pyteal_code_file=args.pyteal_code_file,
+            min_microalgos=args.min_microalgos,
+            max_microalgos=args.max_microalgos,
+            tolerance=args.tolerance,
+            exchange_rate=args.exchange_rate,
+            output=args.output,
+        )
 
 
 def exec_test(
@@ -43,66 +133,317 @@ def exec_test(
     test_code_file: Path,
     verbose: bool = False,
     backend: str = 'kavm',
+    examples: Optional[int] = None,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    profile: bool = False,
+    use_server: bool = True,
+    shrink: bool = True,
 ) -> None:
+    import pytest
+
+    from kcoin_vault.workers import run_pytest_workers
+
     if not verbose:
         logging.getLogger('kavm.kavm').setLevel(logging.CRITICAL)
         logging.getLogger('kavm.algod').setLevel(logging.CRITICAL)
+    if examples is None:
+        examples = N_TESTS
     pyteal_code_module_str = str(pyteal_code_file).strip('.py').replace('/', '.')
-    pytest.main(
-        [
+    server_socket = _running_server(use_server)
+    if server_socket is not None and workers > 1 and backend == 'kavm':
+        # the server runs one session at a time, the workers would just wait for each other
+        _LOGGER.info('Not using the KAVM server: every worker loads its own KAVM')
+        server_socket = None
+
+    def pytest_args(run_backend: str) -> List[str]:
+        return [
             "-s",
-            f"--tb={'long' if verbose else 'no'}",
             f"--hypothesis-verbosity={'verbose' if verbose else 'normal'}",
             "--hypothesis-show-statistics",
-            f"--backend={backend}",
+            f"--backend={run_backend}",
             "--pyteal-code-module-str",
             pyteal_code_module_str,
+            *([f"--example-db={FAST_EXAMPLES_DIR}"] if backend == 'fast' else []),
+            *([] if shrink else ["--no-shrink"]),
+            *([f"--kavm-server={server_socket}"] if server_socket is not None and run_backend == 'kavm' else []),
             str(test_code_file),
         ]
-    )
 
+    if backend == 'fast':
+        shutil.rmtree(FAST_EXAMPLES_DIR, ignore_errors=True)
+        if seed is not None:
+            _LOGGER.warning(
+                'Ignoring --seed on the fast backend: Hypothesis does not save the failing examples of seeded runs, '
+                'which are needed to re-check them on KAVM'
+            )
+            seed = None
+    if workers > 1:
+        exit_code = run_pytest_workers(
+            pytest_args(backend),
+            examples=examples,
+            workers=workers,
+            seed=seed,
+            profile=profile,
+            seeded=backend != 'fast',
+        )
+    else:
+        exit_code = pytest.main(
+            [
+                f"--tb={'long' if verbose else 'no'}",
+                f"--max-examples={examples}",
+                *([f"--hypothesis-seed={seed}"] if seed is not None else []),
+                *pytest_args(backend),
+            ]
+        )
+    if backend == 'fast' and exit_code != pytest.ExitCode.OK:
+        # the fast AVM is an approximation of the AVM, so only counterexamples that KAVM reproduces count
+        _LOGGER.info('Re-checking the counterexamples found on the fast AVM with KAVM')
+        with phase('kavm-recheck'):
+            recheck_exit_code = pytest.main(
+                [f"--tb={'long' if verbose else 'short'}", "--replay-examples", *pytest_args('kavm')]
+            )
+        if recheck_exit_code == pytest.ExitCode.OK:
+            # still fail the run: the fast AVM disagrees with KAVM
+            _LOGGER.error(
+                f'KAVM does not reproduce the counterexamples found on the fast AVM, saved in {FAST_EXAMPLES_DIR}'
+            )
+        else:
+            exit_code = recheck_exit_code
+    sys.exit(exit_code)
+
+
+def exec_simulate(
+    pyteal_code_file: Path,
+    methods: Optional[str] = None,
+    methods_file: Optional[Path] = None,
+    output: Optional[Path] = None,
+    backend: str = 'kavm',
+    verbose: bool = False,
+    use_server: bool = True,
+) -> None:
+    from kcoin_vault.engine import SimulationEngine
+    from kcoin_vault.sequence import open_sequence, read_calls
 
-def exec_simulate(pyteal_code_file: Path, methods: str, backend: str = 'kavm', verbose: bool = False) -> None:
     if not verbose:
         logging.getLogger('kavm.kavm').setLevel(logging.CRITICAL)
         logging.getLogger('kavm.algod').setLevel(logging.CRITICAL)
     pyteal_code_module_str = str(pyteal_code_file).strip('.py').replace('/', '.')
-    test_code_file = 'kcoin_vault/test_method_sequence.py'
-    sys.exit(
-        pytest.main(
-            args=[
-                "-s",
-                f"--tb={'long' if verbose else 'no'}",
-                "--disable-warnings",
-                f"--backend={backend}",
-                f"--pyteal-code-module-str={pyteal_code_module_str}",
-                f"--methods={methods}",
-                str(test_code_file),
-            ]
+    server_socket = _running_server(use_server) if backend == 'kavm' else None
+    with ExitStack() as stack:
+        engine = stack.enter_context(SimulationEngine(pyteal_code_module_str, backend, server_socket))
+        calls = stack.enter_context(open_sequence(methods_file)) if methods_file is not None else read_calls([methods])
+        output_file = stack.enter_context(output.open('w')) if output is not None else None
+        _LOGGER.info('Running method sequence')
+        summary = engine.run(calls, output=output_file)
+    if not summary.calls:
+        _LOGGER.error('The method sequence has no calls')
+    elif summary.failed:
+        _LOGGER.error(f'Ran {summary.calls} calls, {summary.failed} failed')
+    else:
+        _LOGGER.info(f'Ran {summary.calls} calls, none failed')
+    sys.exit(0 if summary.calls and not summary.failed else 1)
+
+
+def exec_shell(
+    pyteal_code_file: Path,
+    backend: str = 'kavm',
+    verbose: bool = False,
+    use_server: bool = True,
+) -> None:
+    from kcoin_vault.engine import SimulationEngine
+    from kcoin_vault.shell import VaultShell
+
+    if not verbose:
+        logging.getLogger('kavm.kavm').setLevel(logging.CRITICAL)
+        logging.getLogger('kavm.algod').setLevel(logging.CRITICAL)
+    pyteal_code_module_str = str(pyteal_code_file).strip('.py').replace('/', '.')
+    server_socket = _running_server(use_server) if backend == 'kavm' else None
+    _LOGGER.info(f'Deploying {pyteal_code_module_str} on the {backend} backend')
+    with SimulationEngine(pyteal_code_module_str, backend, server_socket) as engine:
+        # the calls' results are printed by the shell
+        logging.getLogger('kcoin_vault.sequence').setLevel(logging.WARNING)
+        VaultShell(engine).cmdloop()
+
+
+def exec_load(
+    pyteal_code_file: Path,
+    config: 'LoadConfig',
+    backend: str = 'kavm',
+    report_file: Optional[Path] = None,
+    sign_workers: int = 0,
+    verbose: bool = False,
+) -> None:
+    from algosdk.account import generate_account
+    from algosdk.v2client.algod import AlgodClient
+
+    from kcoin_vault.client import ContractClient
+    from kcoin_vault.load import run_load
+    from kcoin_vault.sandbox import get_accounts
+    from kcoin_vault.signing import BulkSigner
+
+    if not verbose:
+        logging.getLogger('kavm.kavm').setLevel(logging.CRITICAL)
+        logging.getLogger('kavm.algod').setLevel(logging.CRITICAL)
+    pyteal_code_module_str = str(pyteal_code_file).strip('.py').replace('/', '.')
+
+    algod: AlgodClient
+    if backend == 'sandbox':
+        creator_addr, creator_private_key = get_accounts(limit=1)[0]
+        algod = AlgodClient("a" * 64, "http://localhost:4001")
+    else:
+        from kavm.algod import KAVMClient
+
+        creator_private_key, creator_addr = generate_account()
+        with phase('kavm-init'):
+            algod = KAVMClient(faucet_address=creator_addr, log_level=logging.ERROR)
+
+    with ExitStack() as stack:
+        bulk_signer = stack.enter_context(BulkSigner(max_workers=sign_workers)) if sign_workers else None
+        _LOGGER.info(f'Deploying {pyteal_code_module_str} on the {backend} backend')
+        with phase('deploy'):
+            client = ContractClient(
+                algod, creator_addr, creator_private_key, pyteal_code_module_str, bulk_signer=bulk_signer
+            )
+        report = run_load(backend, client, (creator_addr, creator_private_key), config)
+
+    for method, summary in report['methods'].items():
+        latency = summary['latency_s']
+        _LOGGER.info(
+            f'{method}: {summary["groups"]} ok, {summary["failures"]} failed, {summary["throughput_tps"]:.1f} txn/s, '
+            f'latency p50 {latency["p50"]:.3f}s p90 {latency["p90"]:.3f}s p99 {latency["p99"]:.3f}s'
         )
-    )
+    if report_file is not None:
+        report_file.write_text(json.dumps(report, indent=2))
+        _LOGGER.info(f'Wrote load report to {report_file}')
+    else:
+        print(json.dumps(report, indent=2))
+
+
+def exec_check_rounding(
+    pyteal_code_file: Path,
+    min_microalgos: Optional[int] = None,
+    max_microalgos: Optional[int] = None,
+    tolerance: int = 1,
+    exchange_rate: Optional[int] = None,
+    output: Optional[Path] = None,
+) -> None:
+    from kcoin_vault.rounding import check_round_trip
+    from kcoin_vault.test_mint_burn import MAX_ARG_VALUE, MIN_ARG_VALUE
+
+    min_microalgos = min_microalgos if min_microalgos is not None else MIN_ARG_VALUE
+    max_microalgos = max_microalgos if max_microalgos is not None else MAX_ARG_VALUE
+    pyteal_code_module_str = str(pyteal_code_file).strip('.py').replace('/', '.')
+    with ExitStack() as stack:
+        failures_file = stack.enter_context(output.open('w', newline='')) if output is not None else None
+        result = check_round_trip(
+            pyteal_code_module_str,
+            min_microalgos,
+            max_microalgos,
+            tolerance=tolerance,
+            exchange_rate=exchange_rate,
+            failures_file=failures_file,
+        )
+
+    _LOGGER.info(f'Checked {result.checked} amounts in {result.elapsed:.3f}s')
+    for failure in result.failures:
+        if failure.minted is None:
+            outcome = 'is rejected'
+        elif failure.returned is None:
+            outcome = f'gives {failure.minted} microKs, burning them is rejected'
+        else:
+            outcome = f'gives {failure.minted} microKs, burning them returns {failure.returned}, off by {failure.error}'
+        _LOGGER.error(f'Minting with {failure.microalgos} microalgos {outcome}')
+    if result.failed:
+        _LOGGER.error(
+            f'{result.failed} of {result.checked} amounts are off by more than {tolerance} microalgos '
+            f'or rejected ({result.rejected}), largest error {result.max_error} microalgos'
+            + (f', all of them written to {output}' if output is not None else '')
+        )
+    else:
+        _LOGGER.info(f'All amounts round-trip within {tolerance} microalgos, largest error {result.max_error}')
+    sys.exit(1 if result.failed else 0)
 
 
 def exec_verify(
     pyteal_code_file: Path,
-    method: str,
+    methods: List[str],
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    cache_size: int = 128,
+    use_server: bool = True,
+    progress_interval: float = 10.0,
+    kore_log: bool = False,
 ) -> None:
+    from kcoin_vault.cache import DiskCache
+    from kcoin_vault.remote import connect_server
+    from kcoin_vault.verify import hoare_methods, report, write_stats
+
     pyteal_code_module_str = str(pyteal_code_file).strip('.py').replace('/', '.')
     sys.setrecursionlimit(15000000)
 
-    _LOGGER.info(f'Verifying specifications in module {pyteal_code_module_str}')
+    if methods == ['all']:
+        methods = hoare_methods(pyteal_code_file)
+        if not methods:
+            raise ValueError(f'No methods decorated with @router.hoare_method in {pyteal_code_file}')
+
+    _LOGGER.info(f'Verifying specifications of methods {methods} in module {pyteal_code_module_str}')
 
     # Note that KAVM can use account data that is retrived from Algorand Node REST API.
     # We define the account data for the KCoin Vault contract and its creator at the
     # bottom of this file for portability.
-    prover = AutoProver(
-        pyteal_module_name=pyteal_code_module_str,
-        app_id=1,
-        sdk_app_creator_account_dict=sdk_app_creator_account_dict,
-        sdk_app_account_dict=sdk_app_account_dict,
-        method_names=[method],
-    )
-    prover.prove(method)
+    prove_args = {
+        'sdk_app_creator_account_dict': sdk_app_creator_account_dict,
+        'sdk_app_account_dict': sdk_app_account_dict,
+        'jobs': jobs,
+        'cache': DiskCache(PROOF_CACHE_DIR, max_entries=cache_size) if use_cache else None,
+        'progress_interval': progress_interval,
+        'kore_log': kore_log,
+    }
+    # the proofs of this run stream their progress afresh, wherever they run
+    PROOF_PROGRESS.unlink(missing_ok=True)
+    _LOGGER.info(f'Reporting the progress of the proofs every {progress_interval:g}s, streamed to {PROOF_PROGRESS}')
+    server = connect_server() if use_server else None
+    if server is not None:
+        with closing(server):
+            results = server.call('prove', pyteal_code_module_str=pyteal_code_module_str, methods=methods, **prove_args)
+    else:
+        from kcoin_vault.verify import prove_methods
+
+        results = prove_methods(pyteal_code_module_str, methods, **prove_args)
+    write_stats(results, PROOF_STATS)
+    _LOGGER.info(f'Wrote the statistics of the proofs to {PROOF_STATS}')
+    sys.exit(0 if report(results) else 1)
+
+
+def exec_serve(stop: bool = False) -> None:
+    from kcoin_vault.remote import connect_server
+
+    if stop:
+        server = connect_server()
+        if server is None:
+            _LOGGER.error(f'No KAVM server is running at {SERVE_SOCKET}')
+            sys.exit(1)
+        with closing(server):
+            server.call('shutdown')
+        return
+    from kcoin_vault.serve import KAVMServer
+
+    try:
+        KAVMServer(SERVE_SOCKET).serve()
+    except KeyboardInterrupt:
+        _LOGGER.info('KAVM server stopped')
+
+
+def _running_server(use_server: bool) -> Optional[Path]:
+    """The socket of the KAVM server of the current directory, if one is running and should be used"""
+    from kcoin_vault.remote import connect_server
+
+    server = connect_server() if use_server else None
+    if server is None:
+        return None
+    server.close()
+    return SERVE_SOCKET
 
 
 def create_argument_parser() -> ArgumentParser:
@@ -114,87 +455,338 @@ def create_argument_parser() -> ArgumentParser:
 
     parser = ArgumentParser(prog='kavm-demo')
 
-    shared_args = ArgumentParser(add_help=False)
-    shared_args.add_argument('--verbose', '-v', default=False, action='store_true', help='Verbose output.')
-    shared_args.add_argument('--debug', default=False, action='store_true', help='Debug output.')
-    shared_args.add_argument(
+    common_args = ArgumentParser(add_help=False)
+    common_args.add_argument('--verbose', '-v', default=False, action='store_true', help='Verbose output.')
+    common_args.add_argument('--debug', default=False, action='store_true', help='Debug output.')
+    common_args.add_argument(
         '--profile',
         default=False,
         action='store_true',
-        help='Coarse process-level profiling.',
+        help=f'Time the phases of the run, from PyTeal compilation to proving, and write a report to {PROFILE_DIR}.',
     )
+    common_args.add_argument(
+        '--cprofile',
+        default=False,
+        action='store_true',
+        help='With --profile, also dump cProfile statistics of the whole run.',
+    )
+    common_args.add_argument(
+        '--profile-dir',
+        dest='profile_dir',
+        type=Path,
+        default=PROFILE_DIR,
+        help='Directory to write profiles to.',
+    )
+    shared_args = ArgumentParser(add_help=False, parents=[common_args])
     shared_args.add_argument(
         '--pyteal-code-file',
         dest='pyteal_code_file',
-        type=file_path,
+        type=_file_path,
         required=True,
         help='Path to the PyTeal source code file to test',
     )
 
+    server_args = ArgumentParser(add_help=False)
+    server_args.add_argument(
+        '--no-server',
+        dest='use_server',
+        default=True,
+        action='store_false',
+        help='Load KAVM in this process even if a `kavm-demo serve` server is running',
+    )
+
     command_parser = parser.add_subparsers(dest='command', required=True, help='Command to execute')
 
     # test
     test_subparser = command_parser.add_parser(
         'test',
         help='Run a concrete property test',
-        parents=[shared_args],
+        parents=[shared_args, server_args],
         allow_abbrev=False,
     )
     test_subparser.add_argument(
         '--backend',
         dest='backend',
         type=str,
-        choices=['kavm', 'sandbox'],
-        help='Interpreter to execute the tests with, KAVM or the Algorand Sandbox',
+        choices=['kavm', 'sandbox', 'fast'],
+        help=(
+            'Interpreter to execute the tests with: KAVM, the Algorand Sandbox, '
+            'or the fast AVM with counterexamples re-checked on KAVM'
+        ),
         default='kavm',
     )
     test_subparser.add_argument(
         '--test-code-file',
         dest='test_code_file',
-        type=file_path,
+        type=_file_path,
         help='Path to the Python file with the testing code',
     )
+    test_subparser.add_argument(
+        '--examples',
+        dest='examples',
+        type=int,
+        default=None,
+        help=f'Number of examples to generate per property test, split between the workers, {N_TESTS} by default',
+    )
+    test_subparser.add_argument(
+        '--workers',
+        dest='workers',
+        type=int,
+        default=1,
+        help='Number of worker processes, each with its own backend and deployed contract',
+    )
+    test_subparser.add_argument(
+        '--seed',
+        dest='seed',
+        type=int,
+        default=None,
+        help='Hypothesis seed; with several workers, worker i uses seed + i',
+    )
+    test_subparser.add_argument(
+        '--no-shrink',
+        dest='shrink',
+        default=True,
+        action='store_false',
+        help=(
+            'Report failing examples as generated instead of shrinking them to minimal ones, '
+            'which re-runs the test many times, each a KAVM run on the kavm backend'
+        ),
+    )
 
     # verify
     verify_subparser = command_parser.add_parser(
         'verify',
         help='Verify the pre and post conditions of contract methods by symbolic execution',
-        parents=[shared_args],
+        parents=[shared_args, server_args],
         allow_abbrev=False,
     )
     verify_subparser.add_argument(
         '--method',
-        dest='method',
-        type=str,
-        help='Method of the contract to verify',
+        dest='methods',
+        type=list_of(str, delim=','),
+        default=['all'],
+        help='Comma-separated methods of the contract to verify, or \'all\' for every hoare method (default)',
+    )
+    verify_subparser.add_argument(
+        '--jobs',
+        '-j',
+        dest='jobs',
+        type=int,
+        default=None,
+        help='Maximum number of proofs to run in parallel, one per method by default',
+    )
+    verify_subparser.add_argument(
+        '--no-cache',
+        dest='use_cache',
+        default=True,
+        action='store_false',
+        help=f'Re-prove every method instead of reusing verdicts cached in {PROOF_CACHE_DIR}',
+    )
+    verify_subparser.add_argument(
+        '--cache-size',
+        dest='cache_size',
+        type=int,
+        default=128,
+        help='Maximum number of cached proof verdicts to keep',
+    )
+    verify_subparser.add_argument(
+        '--progress-interval',
+        dest='progress_interval',
+        type=float,
+        default=10.0,
+        help=f'Seconds between progress reports of a running proof, also streamed to {PROOF_PROGRESS}',
+    )
+    verify_subparser.add_argument(
+        '--kore-log',
+        dest='kore_log',
+        default=False,
+        action='store_true',
+        help=(
+            'Report the rewrite steps and branches of the proofs, by adding logging options to KORE_EXEC_OPTS, '
+            'which the installed kore-exec must accept'
+        ),
     )
 
     # simulate
     simulate_subparser = command_parser.add_parser(
         'simulate',
         help='Run a simulation',
-        parents=[shared_args],
+        parents=[shared_args, server_args],
         allow_abbrev=False,
     )
-    simulate_subparser.add_argument(
+    simulate_methods = simulate_subparser.add_mutually_exclusive_group(required=True)
+    simulate_methods.add_argument(
         '--methods',
         dest='methods',
         type=str,
-        required=True,
-        help='Method sequence to call, for example \'mint(10000) burn(20000)\'',
+        help='Method sequence to call, for example \'mint(10000) burn(20000)\', of any methods of the app',
+    )
+    simulate_methods.add_argument(
+        '--methods-file',
+        dest='methods_file',
+        type=Path,
+        help=(
+            'File to stream the method sequence from, with calls like mint(10000) or JSON records like '
+            '{"method": "mint", "args": [10000]} on every line; - for the standard input'
+        ),
+    )
+    simulate_subparser.add_argument(
+        '--output',
+        dest='output',
+        type=Path,
+        default=None,
+        help='File to write the result of every call to as it completes, as JSON records',
     )
     simulate_subparser.add_argument(
         '--backend',
         dest='backend',
         type=str,
-        choices=['kavm', 'sandbox'],
+        choices=['kavm', 'sandbox', 'fast'],
         help='Interpreter to execute the tests with',
         default='kavm',
     )
 
+    # load
+    load_subparser = command_parser.add_parser(
+        'load',
+        help='Drive a mint/burn load from many accounts and report throughput and latency',
+        parents=[shared_args],
+        allow_abbrev=False,
+    )
+    load_subparser.add_argument(
+        '--backend',
+        dest='backend',
+        type=str,
+        choices=['kavm', 'sandbox'],
+        help='Interpreter to execute the load with',
+        default='kavm',
+    )
+    load_subparser.add_argument(
+        '--accounts', dest='accounts', type=int, default=10, help='Number of funded accounts to spread calls over'
+    )
+    load_subparser.add_argument('--rate', dest='rate', type=float, default=10.0, help='Target calls per second')
+    load_subparser.add_argument(
+        '--duration', dest='duration', type=float, default=30.0, help='Seconds to keep submitting calls for'
+    )
+    load_subparser.add_argument(
+        '--mint-ratio', dest='mint_ratio', type=float, default=0.5, help='Fraction of calls that are mints'
+    )
+    load_subparser.add_argument(
+        '--max-in-flight',
+        dest='max_in_flight',
+        type=int,
+        default=32,
+        help='Maximum number of pending transaction groups on the sandbox backend',
+    )
+    load_subparser.add_argument('--seed', dest='seed', type=int, default=None, help='Seed of the call mix')
+    load_subparser.add_argument(
+        '--sign-workers',
+        dest='sign_workers',
+        type=int,
+        default=0,
+        help='Number of processes to sign the funding and opt-in transactions with, 0 to sign them in this process',
+    )
+    load_subparser.add_argument(
+        '--report',
+        dest='report_file',
+        type=Path,
+        default=None,
+        help='Path to write the JSON report to, instead of standard output',
+    )
+
+    # serve
+    serve_subparser = command_parser.add_parser(
+        'serve',
+        help='Keep KAVM loaded in a server that verify, test and simulate use instead of loading it themselves',
+        parents=[common_args],
+        allow_abbrev=False,
+    )
+    serve_subparser.add_argument(
+        '--stop', dest='stop', default=False, action='store_true', help='Stop the running server'
+    )
+
+    # shell
+    shell_subparser = command_parser.add_parser(
+        'shell',
+        help='Deploy the vault once and run calls on it interactively, keeping its ledger between them',
+        parents=[shared_args, server_args],
+        allow_abbrev=False,
+    )
+    shell_subparser.add_argument(
+        '--backend',
+        dest='backend',
+        type=str,
+        choices=['kavm', 'sandbox', 'fast'],
+        help='Interpreter to execute the calls with',
+        default='kavm',
+    )
+
+    # check-rounding
+    check_rounding_subparser = command_parser.add_parser(
+        'check-rounding',
+        help='Check the rounding of minting and burning back every amount of microalgos in a range',
+        parents=[shared_args],
+        allow_abbrev=False,
+    )
+    check_rounding_subparser.add_argument(
+        '--min',
+        dest='min_microalgos',
+        type=int,
+        default=None,
+        help='Smallest amount of microalgos to mint, MIN_ARG_VALUE of test_mint_burn.py by default',
+    )
+    check_rounding_subparser.add_argument(
+        '--max',
+        dest='max_microalgos',
+        type=int,
+        default=None,
+        help='Largest amount of microalgos to mint, MAX_ARG_VALUE of test_mint_burn.py by default',
+    )
+    check_rounding_subparser.add_argument(
+        '--tolerance',
+        dest='tolerance',
+        type=int,
+        default=1,
+        help='Largest acceptable difference, in microalgos, between the minted and the returned amount',
+    )
+    check_rounding_subparser.add_argument(
+        '--exchange-rate',
+        dest='exchange_rate',
+        type=int,
+        default=None,
+        help='Exchange rate in the vault\'s global state, INITIAL_EXCHANGE_RATE of the PyTeal module by default',
+    )
+    check_rounding_subparser.add_argument(
+        '--output',
+        dest='output',
+        type=Path,
+        default=None,
+        help='Path to write every failing amount to, as CSV',
+    )
+
     return parser
 
 
+def _file_path(s: str) -> Path:
+    path = Path(s)
+    if not path.is_file():
+        raise ArgumentTypeError(f'No such file: {path}')
+    return path
+
+
+def _check_rounding_range(parser: ArgumentParser, args: Namespace) -> None:
+    from kcoin_vault.test_mint_burn import MAX_ARG_VALUE, MIN_ARG_VALUE
+
+    if args.min_microalgos is None:
+        args.min_microalgos = MIN_ARG_VALUE
+    if args.max_microalgos is None:
+        args.max_microalgos = MAX_ARG_VALUE
+    if args.min_microalgos < 0:
+        parser.error(f'argument --min: negative amount of microalgos: {args.min_microalgos}')
+    if args.min_microalgos > args.max_microalgos:
+        parser.error(f'argument --min: {args.min_microalgos} is greater than --max {args.max_microalgos}')
+
+
 def _loglevel(args: Namespace) -> int:
     if args.debug:
         return logging.DEBUG
@@ -0,0 +1,229 @@
+import asyncio
+import base64
+import http.client
+import json
+import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Final, List, Optional, Tuple, TypeVar
+from urllib import parse
+
+from algosdk import constants, encoding, error
+from algosdk.abi import Method
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    TransactionWithSigner,
+)
+from algosdk.future import transaction
+from algosdk.v2client.algod import AlgodClient, api_version_path_prefix
+
+from kcoin_vault.client import CALL_FEE, ContractClient
+from kcoin_vault.confirmation import AsyncConfirmationTracker
+from kcoin_vault.stats import ThroughputStats
+from kcoin_vault.templates import abi_return
+
+T = TypeVar('T')
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+SANDBOX_ALGOD_ADDRESS: Final = 'http://localhost:4001'
+SANDBOX_ALGOD_TOKEN: Final = 'a' * 64
+
+
+class PooledAlgodClient(AlgodClient):
+    '''
+    An `AlgodClient` that reuses keep-alive HTTP connections from a shared pool
+
+    The stock client opens a new connection for every request. This one is safe to use from many threads at once,
+    each request borrowing an idle connection or opening a new one; at most `pool_size` idle connections are kept.
+    '''
+
+    def __init__(
+        self,
+        algod_token: str = SANDBOX_ALGOD_TOKEN,
+        algod_address: str = SANDBOX_ALGOD_ADDRESS,
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: int = 32,
+        timeout: float = 30.0,
+    ) -> None:
+        super().__init__(algod_token, algod_address, headers)
+        url = parse.urlsplit(algod_address)
+        self._connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self._netloc = url.netloc
+        self._base_path = url.path.rstrip('/')
+        self._timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format='json'):
+        header = {'User-Agent': 'py-algorand-sdk'}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header.update({constants.algod_auth_header: self.algod_token})
+
+        if requrl not in constants.unversioned_paths:
+            requrl = api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + '?' + parse.urlencode(params)
+
+        status, body = self._request(method, self._base_path + requrl, data, header)
+        if status >= 400:
+            message = body.decode('utf-8')
+            try:
+                message = json.loads(message)['message']
+            except (ValueError, KeyError, TypeError):
+                pass
+            raise error.AlgodHTTPError(message, status)
+        if response_format == 'json':
+            try:
+                return json.loads(body)
+            except Exception as e:
+                raise error.AlgodResponseError('Failed to parse JSON response from algod') from e
+        return body
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _request(self, method: str, path: str, data: Optional[bytes], header: Dict[str, str]) -> Tuple[int, bytes]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return self._send(self._connect(), method, path, data, header)
+        try:
+            return self._send(conn, method, path, data, header)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            # the server closed the idle keep-alive connection, retry on a fresh one
+            return self._send(self._connect(), method, path, data, header)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        return self._connection_class(self._netloc, timeout=self._timeout)
+
+    def _send(
+        self, conn: http.client.HTTPConnection, method: str, path: str, data: Optional[bytes], header: Dict[str, str]
+    ) -> Tuple[int, bytes]:
+        try:
+            conn.request(method, path, body=data, headers=header)
+            resp = conn.getresponse()
+            body = resp.read()
+        except BaseException:
+            conn.close()
+            raise
+        self._release(conn, resp)
+        return resp.status, body
+
+    def _release(self, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+        if resp.will_close:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+class AsyncContractClient:
+    '''
+    Calls a deployed K Coin Vault for many accounts concurrently
+
+    Groups are built and signed as in `ContractClient`, then submitted from a pool of worker threads sharing
+    one `PooledAlgodClient`, so up to `max_in_flight` groups are pending at once. Their confirmations are
+    resolved together by an `AsyncConfirmationTracker`, one sweep per round.
+    Every group's confirmation latency, and every failure, is recorded in `stats`.
+    Use it on the sandbox backend: KAVM executes transactions in-process, one group at a time.
+    '''
+
+    def __init__(
+        self,
+        client: ContractClient,
+        algod: Optional[PooledAlgodClient] = None,
+        max_in_flight: int = 32,
+        wait_rounds: int = 4,
+    ) -> None:
+        self.client = client
+        self.algod = algod if algod is not None else PooledAlgodClient(pool_size=max_in_flight)
+        self.stats = ThroughputStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='kcoin-vault')
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self.confirmations = AsyncConfirmationTracker(self.algod, self._run, wait_rounds=wait_rounds)
+
+    async def __aenter__(self) -> 'AsyncContractClient':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.algod.close()
+
+    async def pay(self, sender_addr: str, sender_pk: str, receiver: str, microalgo_amount: int) -> None:
+        comp = AtomicTransactionComposer()
+        sp = self.client.suggested_params.get()
+        txn = transaction.PaymentTxn(
+            sender=sender_addr, sp=sp, receiver=receiver, amt=microalgo_amount, note=self.client._next_note()
+        )
+        comp.add_transaction(TransactionWithSigner(txn, AccountTransactionSigner(sender_pk)))
+        await self._submit(comp)
+
+    async def opt_in(self, sender_addr: str, sender_pk: str) -> None:
+        """Opt an account into the vault's K Coin asset"""
+        comp = AtomicTransactionComposer()
+        sp = self.client.suggested_params.get()
+        txn = transaction.AssetOptInTxn(sender=sender_addr, sp=sp, index=self.client.asset_id)
+        comp.add_transaction(TransactionWithSigner(txn, AccountTransactionSigner(sender_pk)))
+        await self._submit(comp)
+
+    async def mint(self, sender_addr: str, sender_pk: str, microalgo_amount: int, fee: int = CALL_FEE) -> int:
+        return await self._call_template('mint', sender_addr, sender_pk, microalgo_amount, fee)
+
+    async def burn(self, sender_addr: str, sender_pk: str, asset_amount: int, fee: int = CALL_FEE) -> int:
+        return await self._call_template('burn', sender_addr, sender_pk, asset_amount, fee)
+
+    async def _call_template(self, method: str, sender_addr: str, sender_pk: str, amount: int, fee: int) -> Any:
+        template = self.client.call_template(method, sender_addr, sender_pk, fee)
+        signed = template.sign(amount, self.client.suggested_params.get(fee=fee), self.client._next_note())
+        (result,) = await self._send(signed.raw, len(signed.tx_ids), {signed.tx_id: signed.method})
+        return result
+
+    async def _submit(self, comp: AtomicTransactionComposer) -> List[Any]:
+        """Send a group and wait for it to be confirmed, returning the results of its method calls"""
+        signed_txns = comp.gather_signatures()
+        raw = b''.join(base64.b64decode(encoding.msgpack_encode(stxn)) for stxn in signed_txns)
+        methods = {comp.tx_ids[i]: method for i, method in comp.method_dict.items()}
+        return await self._send(raw, len(signed_txns), methods or {comp.tx_ids[0]: None})
+
+    async def _send(self, raw: bytes, n_txns: int, methods: Dict[str, Optional[Method]]) -> List[Any]:
+        """
+        Send encoded signed transactions and wait for them to be confirmed
+
+        `methods` are the transactions to wait for, with the methods they call, or None if they are not method
+        calls. Returns the results of the method calls.
+        """
+        async with self._in_flight:
+            start = time.perf_counter()
+            try:
+                await self._run(
+                    self.algod.algod_request,
+                    'POST',
+                    '/transactions',
+                    None,
+                    raw,
+                    {'Content-Type': 'application/x-binary'},
+                )
+                tx_infos = await asyncio.gather(*(self.confirmations.wait(tx_id) for tx_id in methods))
+            except Exception as err:
+                self.stats.record_failure(type(err).__name__)
+                raise
+            self.stats.record(time.perf_counter() - start, n_txns)
+        return [abi_return(method, tx_info) for method, tx_info in zip(methods.values(), tx_infos) if method]
+
+    async def _run(self, f: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, f, *args)
@@ -0,0 +1,900 @@
+import base64
+import copy
+import functools
+import hashlib
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Final, List, Optional, Tuple, Union
+
+import msgpack
+from algosdk import encoding, error
+from algosdk.abi import Method
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+from algosdk.v2client.algod import AlgodClient
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+Value = Union[int, bytes]
+Txn = Dict[str, Any]
+
+MAX_UINT64: Final = 2**64 - 1
+MIN_TXN_FEE: Final = 1000
+MIN_BALANCE: Final = 100000
+APP_MIN_BALANCE: Final = 100000
+APP_UINT_MIN_BALANCE: Final = 28500
+APP_BYTES_MIN_BALANCE: Final = 50000
+ASSET_MIN_BALANCE: Final = 100000
+# Opcode budget of every app call in a group, pooled across the group
+APP_CALL_BUDGET: Final = 700
+MAX_LOGS: Final = 32
+MAX_LOG_SIZE: Final = 1024
+MAX_BYTES_SIZE: Final = 4096
+MAX_INNER_TXNS: Final = 256
+ZERO_ADDRESS: Final = bytes(32)
+
+GENESIS_ID: Final = 'fast-avm-v1'
+GENESIS_HASH: Final = base64.b64encode(hashlib.sha256(GENESIS_ID.encode()).digest()).decode()
+CONSENSUS_VERSION: Final = 'fast-avm'
+
+TYPE_ENUMS: Final = {'pay': 1, 'keyreg': 2, 'acfg': 3, 'axfer': 4, 'afrz': 5, 'appl': 6}
+ON_COMPLETIONS: Final = {
+    'NoOp': 0,
+    'OptIn': 1,
+    'CloseOut': 2,
+    'ClearState': 3,
+    'UpdateApplication': 4,
+    'DeleteApplication': 5,
+}
+NAMED_INTS: Final = {**TYPE_ENUMS, **ON_COMPLETIONS}
+
+# TEAL transaction fields, by the msgpack key of the field in an encoded transaction and the field's zero value
+TXN_FIELDS: Final = {
+    'Sender': ('snd', ZERO_ADDRESS),
+    'Fee': ('fee', 0),
+    'FirstValid': ('fv', 0),
+    'LastValid': ('lv', 0),
+    'Note': ('note', b''),
+    'Receiver': ('rcv', ZERO_ADDRESS),
+    'Amount': ('amt', 0),
+    'CloseRemainderTo': ('close', ZERO_ADDRESS),
+    'XferAsset': ('xaid', 0),
+    'AssetAmount': ('aamt', 0),
+    'AssetSender': ('asnd', ZERO_ADDRESS),
+    'AssetReceiver': ('arcv', ZERO_ADDRESS),
+    'AssetCloseTo': ('aclose', ZERO_ADDRESS),
+    'ApplicationID': ('apid', 0),
+    'OnCompletion': ('apan', 0),
+    'RekeyTo': ('rekey', ZERO_ADDRESS),
+    'ConfigAsset': ('caid', 0),
+    'ApprovalProgram': ('apap', b''),
+    'ClearStateProgram': ('apsu', b''),
+}
+ASSET_PARAMS_FIELDS: Final = {
+    'ConfigAssetTotal': ('t', 0),
+    'ConfigAssetDecimals': ('dc', 0),
+    'ConfigAssetDefaultFrozen': ('df', 0),
+    'ConfigAssetUnitName': ('un', b''),
+    'ConfigAssetName': ('an', b''),
+    'ConfigAssetURL': ('au', b''),
+    'ConfigAssetMetadataHash': ('am', b''),
+    'ConfigAssetManager': ('m', ZERO_ADDRESS),
+    'ConfigAssetReserve': ('r', ZERO_ADDRESS),
+    'ConfigAssetFreeze': ('f', ZERO_ADDRESS),
+    'ConfigAssetClawback': ('c', ZERO_ADDRESS),
+}
+ARRAY_FIELDS: Final = {'ApplicationArgs': 'apaa', 'Accounts': 'apat', 'Assets': 'apas', 'Applications': 'apfa'}
+LENGTH_FIELDS: Final = {'NumAppArgs': 'apaa', 'NumAccounts': 'apat', 'NumAssets': 'apas', 'NumApplications': 'apfa'}
+
+
+class LogicError(Exception):
+    """A transaction was rejected, e.g. because its app call failed"""
+
+
+@dataclass(frozen=True)
+class Program:
+    """A TEAL program, assembled into `(opcode, handler, immediate)` triples with branch targets resolved"""
+
+    ops: Tuple[Tuple[str, Callable, Any], ...]
+
+
+@functools.lru_cache(maxsize=64)
+def assemble(source: str) -> Program:
+    """Parse TEAL source, converting constants and labels once so that evaluation only dispatches"""
+    lines = []
+    labels = {}
+    for lineno, line in enumerate(source.splitlines(), start=1):
+        tokens = _tokenize(line)
+        if not tokens or tokens[0].startswith('#pragma'):
+            continue
+        if tokens[0].endswith(':'):
+            labels[tokens[0][:-1]] = len(lines)
+            continue
+        lines.append((lineno, tokens))
+    ops = []
+    for lineno, (opcode, *args) in lines:
+        if opcode not in _OPS:
+            raise LogicError(f'line {lineno}: opcode {opcode} is not supported by the fast AVM')
+        handler, parse_immediate = _OPS[opcode]
+        try:
+            immediate = parse_immediate(args, labels)
+        except (KeyError, IndexError, ValueError) as err:
+            raise LogicError(f'line {lineno}: invalid arguments {args} for {opcode}: {err}') from err
+        ops.append((opcode, handler, immediate))
+    return Program(tuple(ops))
+
+
+def _tokenize(line: str) -> List[str]:
+    tokens = []
+    for match in re.finditer(r'"(?:[^"\\]|\\.)*"|//.*|\S+', line):
+        token = match.group()
+        if token.startswith('//'):
+            break
+        tokens.append(token)
+    return tokens
+
+
+def _parse_bytes(args: List[str]) -> bytes:
+    if args[0].startswith('"'):
+        return args[0][1:-1].encode('latin-1').decode('unicode_escape').encode('latin-1')
+    if args[0].startswith('0x'):
+        return bytes.fromhex(args[0][2:])
+    if args[0] in ('base64', 'b64'):
+        return base64.b64decode(args[1])
+    if args[0].startswith(('base64(', 'b64(')):
+        return base64.b64decode(args[0].split('(', 1)[1].rstrip(')'))
+    raise ValueError(f'unsupported byte constant {args[0]}')
+
+
+def _parse_int(args: List[str]) -> int:
+    return NAMED_INTS[args[0]] if args[0] in NAMED_INTS else int(args[0], 0)
+
+
+def _no_immediate(args: List[str], labels: Dict[str, int]) -> None:
+    if args:
+        raise ValueError('no immediate arguments expected')
+
+
+def _label(args: List[str], labels: Dict[str, int]) -> int:
+    return labels[args[0]]
+
+
+def _field(args: List[str], labels: Dict[str, int]) -> str:
+    return args[0]
+
+
+def _uint(value: Value) -> int:
+    if not isinstance(value, int):
+        raise LogicError(f'expected uint64, got bytes {value!r}')
+    return value
+
+
+def _bytes(value: Value) -> bytes:
+    if not isinstance(value, bytes):
+        raise LogicError(f'expected bytes, got uint64 {value}')
+    return value
+
+
+def _check_uint64(value: int) -> int:
+    if value > MAX_UINT64:
+        raise LogicError(f'uint64 overflow: {value}')
+    if value < 0:
+        raise LogicError(f'uint64 underflow: {value}')
+    return value
+
+
+def _div(a: int, b: int) -> int:
+    if b == 0:
+        raise LogicError('division by zero')
+    return a // b
+
+
+def _mod(a: int, b: int) -> int:
+    if b == 0:
+        raise LogicError('modulo by zero')
+    return a % b
+
+
+class _Halt(Exception):
+    def __init__(self, approved: bool) -> None:
+        self.approved = approved
+
+
+@dataclass
+class _Group:
+    """State shared by the transactions of a group while it is evaluated"""
+
+    txns: List[Txn]
+    tx_ids: List[str]
+    fee_credit: int
+    budget: int
+
+
+@dataclass
+class _AppCall:
+    """The evaluation of one program, for one app call transaction"""
+
+    ledger: '_Ledger'
+    group: _Group
+    index: int
+    app_id: int
+    stack: List[Value] = field(default_factory=list)
+    scratch: List[Value] = field(default_factory=lambda: [0] * 256)
+    frames: List[int] = field(default_factory=list)
+    logs: List[bytes] = field(default_factory=list)
+    inner_txns: List[Dict[str, Any]] = field(default_factory=list)
+    building: Optional[Txn] = None
+    last_inner: Optional[Tuple[Txn, Dict[str, Any]]] = None
+
+    @property
+    def txn(self) -> Txn:
+        return self.group.txns[self.index]
+
+    def run(self, program: Program) -> bool:
+        pc = 0
+        ops = program.ops
+        try:
+            while pc < len(ops):
+                opcode, handler, immediate = ops[pc]
+                self.group.budget -= 1
+                if self.group.budget < 0:
+                    raise LogicError('dynamic cost budget exceeded')
+                pc += 1
+                try:
+                    target = handler(self, immediate, pc)
+                except LogicError as err:
+                    raise LogicError(f'{err}: pc={pc - 1} op={opcode}') from err
+                if target is not None:
+                    pc = target
+        except _Halt as halt:
+            return halt.approved
+        if len(self.stack) != 1:
+            raise LogicError(f'stack finished with {len(self.stack)} elements')
+        return _uint(self.stack[0]) != 0
+
+    def pop(self) -> Value:
+        if not self.stack:
+            raise LogicError('stack underflow')
+        return self.stack.pop()
+
+    def txn_field(self, txn: Txn, name: str, group_index: int, tx_id: str) -> Value:
+        if name in TXN_FIELDS:
+            key, zero = TXN_FIELDS[name]
+            value = txn.get(key, zero)
+        elif name in ASSET_PARAMS_FIELDS:
+            key, zero = ASSET_PARAMS_FIELDS[name]
+            value = txn.get('apar', {}).get(key, zero)
+        elif name == 'TypeEnum':
+            value = TYPE_ENUMS[txn['type']]
+        elif name == 'Type':
+            value = txn['type'].encode()
+        elif name == 'GroupIndex':
+            value = group_index
+        elif name == 'TxID':
+            value = base64.b32decode(tx_id + '=' * (-len(tx_id) % 8)) if tx_id else b''
+        elif name in LENGTH_FIELDS:
+            value = len(txn.get(LENGTH_FIELDS[name], []))
+        else:
+            raise LogicError(f'unsupported transaction field {name}')
+        if isinstance(value, str):
+            value = value.encode()
+        if isinstance(value, bool):
+            value = int(value)
+        return value
+
+    def txna_field(self, txn: Txn, name: str, i: int) -> Value:
+        if name not in ARRAY_FIELDS:
+            raise LogicError(f'unsupported transaction array field {name}')
+        values = txn.get(ARRAY_FIELDS[name], [])
+        if name == 'Accounts':
+            values = [txn['snd'], *values]
+        elif name == 'Applications':
+            values = [self.app_id, *values]
+        if i >= len(values):
+            raise LogicError(f'invalid {name} index {i}')
+        return values[i]
+
+    def global_field(self, name: str) -> Value:
+        if name == 'CreatorAddress':
+            return self.ledger.apps[self.app_id]['creator']
+        if name == 'CurrentApplicationAddress':
+            return self.ledger.app_address(self.app_id)
+        if name == 'CurrentApplicationID':
+            return self.app_id
+        if name == 'GroupSize':
+            return len(self.group.txns)
+        if name == 'MinTxnFee':
+            return MIN_TXN_FEE
+        if name == 'MinBalance':
+            return MIN_BALANCE
+        if name == 'ZeroAddress':
+            return ZERO_ADDRESS
+        if name == 'Round':
+            return self.ledger.round
+        if name == 'LatestTimestamp':
+            return self.ledger.timestamp
+        if name == 'OpcodeBudget':
+            return self.group.budget
+        raise LogicError(f'unsupported global field {name}')
+
+    def submit_inner(self) -> None:
+        txn = self.building
+        if txn is None:
+            raise LogicError('itxn_submit without itxn_begin')
+        if len(self.inner_txns) >= MAX_INNER_TXNS:
+            raise LogicError('too many inner transactions')
+        if 'type' not in txn:
+            raise LogicError('inner transaction has no type')
+        if 'fee' not in txn:
+            # the fee defaults to the minimum, unless the group paid enough extra fees to cover it
+            txn['fee'] = 0 if self.group.fee_credit >= MIN_TXN_FEE else MIN_TXN_FEE
+        shortfall = max(0, MIN_TXN_FEE - txn['fee'])
+        if shortfall > self.group.fee_credit:
+            raise LogicError(f'fee too small for inner transaction: {txn["fee"]}')
+        self.group.fee_credit -= shortfall
+        info = self.ledger.apply(txn, self.group, None)
+        self.inner_txns.append(info)
+        self.last_inner = (txn, info)
+        self.building = None
+
+
+def _op_int(call: _AppCall, value: int, pc: int) -> None:
+    call.stack.append(value)
+
+
+def _op_byte(call: _AppCall, value: bytes, pc: int) -> None:
+    call.stack.append(value)
+
+
+def _op_binary_uint(f: Callable[[int, int], int]) -> Callable[[_AppCall, None, int], None]:
+    def op(call: _AppCall, immediate: None, pc: int) -> None:
+        b = _uint(call.pop())
+        a = _uint(call.pop())
+        call.stack.append(_check_uint64(f(a, b)))
+
+    return op
+
+
+def _op_eq(call: _AppCall, immediate: None, pc: int) -> None:
+    b = call.pop()
+    a = call.pop()
+    if type(a) is not type(b):
+        raise LogicError('cannot compare uint64 to bytes')
+    call.stack.append(int(a == b))
+
+
+def _op_neq(call: _AppCall, immediate: None, pc: int) -> None:
+    _op_eq(call, immediate, pc)
+    call.stack.append(1 - call.pop())
+
+
+def _op_not(call: _AppCall, immediate: None, pc: int) -> None:
+    call.stack.append(int(_uint(call.pop()) == 0))
+
+
+def _op_bnz(call: _AppCall, target: int, pc: int) -> Optional[int]:
+    return target if _uint(call.pop()) != 0 else None
+
+
+def _op_bz(call: _AppCall, target: int, pc: int) -> Optional[int]:
+    return target if _uint(call.pop()) == 0 else None
+
+
+def _op_b(call: _AppCall, target: int, pc: int) -> int:
+    return target
+
+
+def _op_err(call: _AppCall, immediate: None, pc: int) -> None:
+    raise LogicError('err opcode executed')
+
+
+def _op_assert(call: _AppCall, immediate: None, pc: int) -> None:
+    if _uint(call.pop()) == 0:
+        raise LogicError('assert failed')
+
+
+def _op_return(call: _AppCall, immediate: None, pc: int) -> None:
+    raise _Halt(_uint(call.pop()) != 0)
+
+
+def _op_pop(call: _AppCall, immediate: None, pc: int) -> None:
+    call.pop()
+
+
+def _op_dup(call: _AppCall, immediate: None, pc: int) -> None:
+    value = call.pop()
+    call.stack += [value, value]
+
+
+def _op_swap(call: _AppCall, immediate: None, pc: int) -> None:
+    b = call.pop()
+    a = call.pop()
+    call.stack += [b, a]
+
+
+def _op_store(call: _AppCall, slot: int, pc: int) -> None:
+    call.scratch[slot] = call.pop()
+
+
+def _op_load(call: _AppCall, slot: int, pc: int) -> None:
+    call.stack.append(call.scratch[slot])
+
+
+def _op_callsub(call: _AppCall, target: int, pc: int) -> int:
+    call.frames.append(pc)
+    return target
+
+
+def _op_retsub(call: _AppCall, immediate: None, pc: int) -> int:
+    if not call.frames:
+        raise LogicError('retsub with empty call stack')
+    return call.frames.pop()
+
+
+def _op_itob(call: _AppCall, immediate: None, pc: int) -> None:
+    call.stack.append(_uint(call.pop()).to_bytes(8, 'big'))
+
+
+def _op_btoi(call: _AppCall, immediate: None, pc: int) -> None:
+    value = _bytes(call.pop())
+    if len(value) > 8:
+        raise LogicError(f'btoi of {len(value)} bytes')
+    call.stack.append(int.from_bytes(value, 'big'))
+
+
+def _op_concat(call: _AppCall, immediate: None, pc: int) -> None:
+    b = _bytes(call.pop())
+    a = _bytes(call.pop())
+    if len(a) + len(b) > MAX_BYTES_SIZE:
+        raise LogicError('concat produced too big a byte array')
+    call.stack.append(a + b)
+
+
+def _op_len(call: _AppCall, immediate: None, pc: int) -> None:
+    call.stack.append(len(_bytes(call.pop())))
+
+
+def _op_log(call: _AppCall, immediate: None, pc: int) -> None:
+    value = _bytes(call.pop())
+    if len(call.logs) >= MAX_LOGS or sum(map(len, call.logs)) + len(value) > MAX_LOG_SIZE:
+        raise LogicError('too many log calls or log data')
+    call.logs.append(value)
+
+
+def _op_txn(call: _AppCall, name: str, pc: int) -> None:
+    call.stack.append(call.txn_field(call.txn, name, call.index, call.group.tx_ids[call.index]))
+
+
+def _op_txna(call: _AppCall, immediate: Tuple[str, int], pc: int) -> None:
+    name, i = immediate
+    call.stack.append(call.txna_field(call.txn, name, i))
+
+
+def _op_gtxns(call: _AppCall, name: str, pc: int) -> None:
+    i = _uint(call.pop())
+    if i >= len(call.group.txns):
+        raise LogicError(f'gtxns lookup of transaction {i} in a group of {len(call.group.txns)}')
+    call.stack.append(call.txn_field(call.group.txns[i], name, i, call.group.tx_ids[i]))
+
+
+def _op_global(call: _AppCall, name: str, pc: int) -> None:
+    call.stack.append(call.global_field(name))
+
+
+def _op_app_global_get(call: _AppCall, immediate: None, pc: int) -> None:
+    key = _bytes(call.pop())
+    call.stack.append(call.ledger.apps[call.app_id]['global'].get(key, 0))
+
+
+def _op_app_global_put(call: _AppCall, immediate: None, pc: int) -> None:
+    value = call.pop()
+    key = _bytes(call.pop())
+    app = call.ledger.apps[call.app_id]
+    state = app['global']
+    state[key] = value
+    n_uints = sum(isinstance(v, int) for v in state.values())
+    if n_uints > app['num-uint'] or len(state) - n_uints > app['num-byte-slice']:
+        raise LogicError('store integer or bytes count exceeds the global state schema')
+
+
+def _op_app_global_del(call: _AppCall, immediate: None, pc: int) -> None:
+    call.ledger.apps[call.app_id]['global'].pop(_bytes(call.pop()), None)
+
+
+def _op_itxn_begin(call: _AppCall, immediate: None, pc: int) -> None:
+    if call.building is not None:
+        raise LogicError('itxn_begin without itxn_submit')
+    call.building = {'snd': call.ledger.app_address(call.app_id)}
+
+
+def _op_itxn_field(call: _AppCall, name: str, pc: int) -> None:
+    txn = call.building
+    if txn is None:
+        raise LogicError('itxn_field without itxn_begin')
+    value = call.pop()
+    if name == 'TypeEnum':
+        types = {enum: name for name, enum in TYPE_ENUMS.items()}
+        if value not in types:
+            raise LogicError(f'unknown inner transaction type {value}')
+        txn['type'] = types[value]
+    elif name == 'Type':
+        txn['type'] = _bytes(value).decode()
+    elif name in TXN_FIELDS:
+        txn[TXN_FIELDS[name][0]] = value
+    elif name in ASSET_PARAMS_FIELDS:
+        txn.setdefault('apar', {})[ASSET_PARAMS_FIELDS[name][0]] = value
+    else:
+        raise LogicError(f'unsupported inner transaction field {name}')
+
+
+def _op_itxn_submit(call: _AppCall, immediate: None, pc: int) -> None:
+    call.submit_inner()
+
+
+def _op_itxn(call: _AppCall, name: str, pc: int) -> None:
+    if call.last_inner is None:
+        raise LogicError('no inner transaction was submitted')
+    txn, info = call.last_inner
+    if name == 'CreatedAssetID':
+        call.stack.append(info.get('asset-index', 0))
+    elif name == 'CreatedApplicationID':
+        call.stack.append(info.get('application-index', 0))
+    else:
+        call.stack.append(call.txn_field(txn, name, 0, ''))
+
+
+def _slot(args: List[str], labels: Dict[str, int]) -> int:
+    slot = int(args[0])
+    if not 0 <= slot < 256:
+        raise ValueError(f'scratch slot {slot} out of range')
+    return slot
+
+
+_OPS: Final[Dict[str, Tuple[Callable, Callable]]] = {
+    'int': (_op_int, lambda args, labels: _parse_int(args)),
+    'pushint': (_op_int, lambda args, labels: _parse_int(args)),
+    'byte': (_op_byte, lambda args, labels: _parse_bytes(args)),
+    'pushbytes': (_op_byte, lambda args, labels: _parse_bytes(args)),
+    'addr': (_op_byte, lambda args, labels: encoding.decode_address(args[0])),
+    'method': (_op_byte, lambda args, labels: Method.from_signature(args[0][1:-1]).get_selector()),
+    '+': (_op_binary_uint(lambda a, b: a + b), _no_immediate),
+    '-': (_op_binary_uint(lambda a, b: a - b), _no_immediate),
+    '*': (_op_binary_uint(lambda a, b: a * b), _no_immediate),
+    '/': (_op_binary_uint(_div), _no_immediate),
+    '%': (_op_binary_uint(_mod), _no_immediate),
+    '<': (_op_binary_uint(lambda a, b: int(a < b)), _no_immediate),
+    '>': (_op_binary_uint(lambda a, b: int(a > b)), _no_immediate),
+    '<=': (_op_binary_uint(lambda a, b: int(a <= b)), _no_immediate),
+    '>=': (_op_binary_uint(lambda a, b: int(a >= b)), _no_immediate),
+    '&&': (_op_binary_uint(lambda a, b: int(bool(a) and bool(b))), _no_immediate),
+    '||': (_op_binary_uint(lambda a, b: int(bool(a) or bool(b))), _no_immediate),
+    '==': (_op_eq, _no_immediate),
+    '!=': (_op_neq, _no_immediate),
+    '!': (_op_not, _no_immediate),
+    'bnz': (_op_bnz, _label),
+    'bz': (_op_bz, _label),
+    'b': (_op_b, _label),
+    'err': (_op_err, _no_immediate),
+    'assert': (_op_assert, _no_immediate),
+    'return': (_op_return, _no_immediate),
+    'pop': (_op_pop, _no_immediate),
+    'dup': (_op_dup, _no_immediate),
+    'swap': (_op_swap, _no_immediate),
+    'store': (_op_store, _slot),
+    'load': (_op_load, _slot),
+    'callsub': (_op_callsub, _label),
+    'retsub': (_op_retsub, _no_immediate),
+    'itob': (_op_itob, _no_immediate),
+    'btoi': (_op_btoi, _no_immediate),
+    'concat': (_op_concat, _no_immediate),
+    'len': (_op_len, _no_immediate),
+    'log': (_op_log, _no_immediate),
+    'txn': (_op_txn, _field),
+    'txna': (_op_txna, lambda args, labels: (args[0], int(args[1]))),
+    'gtxns': (_op_gtxns, _field),
+    'global': (_op_global, _field),
+    'app_global_get': (_op_app_global_get, _no_immediate),
+    'app_global_put': (_op_app_global_put, _no_immediate),
+    'app_global_del': (_op_app_global_del, _no_immediate),
+    'itxn_begin': (_op_itxn_begin, _no_immediate),
+    'itxn_field': (_op_itxn_field, _field),
+    'itxn_submit': (_op_itxn_submit, _no_immediate),
+    'itxn': (_op_itxn, _field),
+}
+
+
+class _Ledger:
+    '''
+    Balances, assets and apps, keyed by raw 32-byte addresses and integer ids
+
+    Programs are stored as TEAL source, which is what the fast AVM's `compile` returns in place of bytecode.
+    '''
+
+    def __init__(self) -> None:
+        self.accounts: Dict[bytes, Dict[str, Any]] = {}
+        self.apps: Dict[int, Dict[str, Any]] = {}
+        self.assets: Dict[int, Dict[str, Any]] = {}
+        self.next_id = 1
+        self.round = 1
+        self.timestamp = 0
+
+    def account(self, address: bytes) -> Dict[str, Any]:
+        if address not in self.accounts:
+            self.accounts[address] = {'amount': 0, 'assets': {}, 'created-apps': []}
+        return self.accounts[address]
+
+    @staticmethod
+    def app_address(app_id: int) -> bytes:
+        return encoding.decode_address(get_application_address(app_id))
+
+    def min_balance(self, address: bytes) -> int:
+        account = self.accounts[address]
+        if not account['amount'] and not account['assets'] and not account['created-apps']:
+            return 0
+        balance = MIN_BALANCE + ASSET_MIN_BALANCE * len(account['assets'])
+        for app_id in account['created-apps']:
+            app = self.apps[app_id]
+            balance += (
+                APP_MIN_BALANCE + APP_UINT_MIN_BALANCE * app['num-uint'] + APP_BYTES_MIN_BALANCE * app['num-byte-slice']
+            )
+        return balance
+
+    def apply(self, txn: Txn, group: _Group, index: Optional[int]) -> Dict[str, Any]:
+        """Apply a transaction, or an inner transaction if `index` is None, returning its pending transaction info"""
+        sender = self.account(txn['snd'])
+        self._debit(txn['snd'], txn.get('fee', 0))
+        if txn.get('rekey', ZERO_ADDRESS) != ZERO_ADDRESS:
+            raise LogicError('rekeying is not supported by the fast AVM')
+        kind = txn['type']
+        info: Dict[str, Any] = {}
+        if kind == 'pay':
+            self._pay(txn['snd'], txn.get('rcv', ZERO_ADDRESS), txn.get('amt', 0))
+            if txn.get('close', ZERO_ADDRESS) != ZERO_ADDRESS:
+                if sender['assets'] or sender['created-apps']:
+                    raise LogicError('cannot close an account that holds assets or created apps')
+                self._pay(txn['snd'], txn['close'], sender['amount'])
+        elif kind == 'axfer':
+            self._transfer_asset(txn)
+        elif kind == 'acfg':
+            info['asset-index'] = self._create_asset(txn)
+        elif kind == 'appl':
+            if index is None:
+                raise LogicError('inner app calls are not supported by the fast AVM')
+            info.update(self._call_app(txn, group, index))
+        else:
+            raise LogicError(f'transaction type {kind} is not supported by the fast AVM')
+        return info
+
+    def _debit(self, address: bytes, amount: int) -> None:
+        account = self.account(address)
+        if account['amount'] < amount:
+            raise LogicError(
+                f'overspend: account {encoding.encode_address(address)} has {account["amount"]}, needs {amount}'
+            )
+        account['amount'] -= amount
+
+    def _pay(self, sender: bytes, receiver: bytes, amount: int) -> None:
+        self._debit(sender, amount)
+        self.account(receiver)['amount'] += amount
+
+    def _transfer_asset(self, txn: Txn) -> None:
+        asset_id = txn.get('xaid', 0)
+        if asset_id not in self.assets:
+            raise LogicError(f'asset {asset_id} does not exist')
+        receiver = txn.get('arcv', ZERO_ADDRESS)
+        amount = txn.get('aamt', 0)
+        holder = txn['snd']
+        if txn.get('asnd', ZERO_ADDRESS) != ZERO_ADDRESS:
+            if txn['snd'] != self.assets[asset_id]['c']:
+                raise LogicError('only the clawback address can revoke an asset')
+            holder = txn['asnd']
+        if receiver == txn['snd'] and amount == 0 and asset_id not in self.account(receiver)['assets']:
+            self.account(receiver)['assets'][asset_id] = 0
+            return
+        holdings = self.account(holder)['assets']
+        if asset_id not in holdings or asset_id not in self.account(receiver)['assets']:
+            raise LogicError(f'asset {asset_id} missing from {encoding.encode_address(receiver)}')
+        if holdings[asset_id] < amount:
+            raise LogicError(f'underflow on subtracting {amount} from asset {asset_id} balance {holdings[asset_id]}')
+        holdings[asset_id] -= amount
+        self.account(receiver)['assets'][asset_id] += amount
+        close_to = txn.get('aclose', ZERO_ADDRESS)
+        if close_to != ZERO_ADDRESS:
+            if asset_id not in self.account(close_to)['assets']:
+                raise LogicError(f'asset {asset_id} missing from {encoding.encode_address(close_to)}')
+            self.account(close_to)['assets'][asset_id] += holdings.pop(asset_id)
+
+    def _create_asset(self, txn: Txn) -> int:
+        if txn.get('caid', 0):
+            raise LogicError('reconfiguring or destroying assets is not supported by the fast AVM')
+        params = dict(ASSET_PARAMS_FIELDS.values())
+        params.update({key: value.encode() if isinstance(value, str) else value for key, value in txn['apar'].items()})
+        asset_id = self.next_id
+        self.next_id += 1
+        self.assets[asset_id] = {**params, 'creator': txn['snd']}
+        self.account(txn['snd'])['assets'][asset_id] = params['t']
+        return asset_id
+
+    def _call_app(self, txn: Txn, group: _Group, index: int) -> Dict[str, Any]:
+        info: Dict[str, Any] = {}
+        app_id = txn.get('apid', 0)
+        on_completion = txn.get('apan', 0)
+        if app_id == 0:
+            schema = txn.get('apgs', {})
+            app_id = self.next_id
+            self.next_id += 1
+            self.apps[app_id] = {
+                'creator': txn['snd'],
+                'approval': txn.get('apap', b''),
+                'clear': txn.get('apsu', b''),
+                'num-uint': schema.get('nui', 0),
+                'num-byte-slice': schema.get('nbs', 0),
+                'global': {},
+            }
+            self.account(txn['snd'])['created-apps'].append(app_id)
+            info['application-index'] = app_id
+        if app_id not in self.apps:
+            raise LogicError(f'application {app_id} does not exist')
+        app = self.apps[app_id]
+        call = _AppCall(self, group, index, app_id)
+        if on_completion == ON_COMPLETIONS['ClearState']:
+            # the clear state program's verdict is ignored, but its effects are kept only if it approves
+            approved = False
+            try:
+                approved = call.run(assemble(app['clear'].decode()))
+            except LogicError:
+                pass
+            if not approved:
+                return info
+        elif not call.run(assemble(app['approval'].decode())):
+            raise LogicError('rejected by ApprovalProgram')
+        if on_completion == ON_COMPLETIONS['UpdateApplication']:
+            app['approval'] = txn.get('apap', b'')
+            app['clear'] = txn.get('apsu', b'')
+        elif on_completion == ON_COMPLETIONS['DeleteApplication']:
+            self.account(app['creator'])['created-apps'].remove(app_id)
+            del self.apps[app_id]
+        if call.logs:
+            info['logs'] = [base64.b64encode(log).decode() for log in call.logs]
+        if call.inner_txns:
+            info['inner-txns'] = call.inner_txns
+        return info
+
+
+class FastAVMClient(AlgodClient):
+    '''
+    An in-process algod that evaluates TEAL programs with a Python interpreter
+
+    It covers the opcodes and transaction types of simple contracts like the K Coin Vault, and is orders of
+    magnitude faster than KAVM, which makes it suitable for running many property test examples.
+    Results should be double-checked on KAVM: signatures, resource availability, local state and
+    many opcodes are not supported. `compile` returns the TEAL source instead of bytecode, so compiled programs
+    only work on this backend.
+
+    Every transaction group is confirmed in a round of its own, as soon as it is sent.
+    '''
+
+    def __init__(self, faucet_address: str, faucet_amount: int = 10**15) -> None:
+        super().__init__('', 'http://fast-avm')
+        self._ledger = _Ledger()
+        self._ledger.account(encoding.decode_address(faucet_address))['amount'] = faucet_amount
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format='json'):
+        if response_format != 'json':
+            raise error.AlgodHTTPError(f'The fast AVM only responds in JSON, {response_format} requested', 400)
+        if method == 'GET' and requrl == '/transactions/params':
+            return {
+                'consensus-version': CONSENSUS_VERSION,
+                'fee': 0,
+                'genesis-hash': GENESIS_HASH,
+                'genesis-id': GENESIS_ID,
+                'last-round': self._ledger.round,
+                'min-fee': MIN_TXN_FEE,
+            }
+        if method == 'GET' and requrl == '/status':
+            return self._status()
+        if method == 'GET' and requrl.startswith('/status/wait-for-block-after/'):
+            # there are no other block producers, so waiting for a block just produces an empty one
+            self._ledger.round = max(self._ledger.round, int(requrl.rsplit('/', 1)[1]) + 1)
+            return self._status()
+        if method == 'GET' and requrl.startswith('/transactions/pending/'):
+            tx_id = requrl.rsplit('/', 1)[1]
+            if tx_id not in self._pending:
+                raise error.AlgodHTTPError('txn does not exist', 404)
+            return self._pending[tx_id]
+        if method == 'GET' and requrl.startswith('/accounts/'):
+            return self._account_info(requrl.rsplit('/', 1)[1])
+        if method == 'POST' and requrl == '/teal/compile':
+            assemble(data.decode())
+            return {
+                'hash': encoding.encode_address(hashlib.sha512(data).digest()[:32]),
+                'result': base64.b64encode(data).decode(),
+            }
+        if method == 'POST' and requrl == '/transactions':
+            return {'txId': self._send(data)}
+        raise error.AlgodHTTPError(f'{method} {requrl} is not supported by the fast AVM', 404)
+
+    def _status(self) -> Dict[str, Any]:
+        return {'last-round': self._ledger.round, 'time-since-last-round': 0, 'catchup-time': 0}
+
+    def _account_info(self, address: str) -> Dict[str, Any]:
+        account = self._ledger.accounts.get(encoding.decode_address(address))
+        if account is None:
+            return {'address': address, 'amount': 0, 'assets': [], 'created-apps': [], 'round': self._ledger.round}
+        return {
+            'address': address,
+            'amount': account['amount'],
+            'min-balance': self._ledger.min_balance(encoding.decode_address(address)),
+            'assets': [
+                {'asset-id': asset_id, 'amount': amount, 'is-frozen': False}
+                for asset_id, amount in account['assets'].items()
+            ],
+            'created-apps': [{'id': app_id} for app_id in account['created-apps']],
+            'round': self._ledger.round,
+        }
+
+    def _send(self, data: bytes) -> str:
+        stxns = self._decode(data)
+        txns = [stxn.transaction.dictify() for stxn in stxns]
+        tx_ids = [stxn.transaction.get_txid() for stxn in stxns]
+        try:
+            infos = self._apply_group(txns, tx_ids)
+        except LogicError as err:
+            _LOGGER.debug(f'Rejected group of {len(txns)} transactions: {err}')
+            raise error.AlgodHTTPError(f'TransactionPool.Remember: transaction {tx_ids[0]}: {err}', 400) from err
+        for tx_id, stxn, info in zip(tx_ids, stxns, infos):
+            self._pending[tx_id] = {
+                'confirmed-round': self._ledger.round,
+                'pool-error': '',
+                'txn': stxn.dictify(),
+                **info,
+            }
+        return tx_ids[0]
+
+    @staticmethod
+    def _decode(data: bytes) -> List[transaction.SignedTransaction]:
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        unpacker.feed(data)
+        return [transaction.SignedTransaction.undictify(stxn) for stxn in unpacker]
+
+    def _apply_group(self, txns: List[Txn], tx_ids: List[str]) -> List[Dict[str, Any]]:
+        """Apply a group atomically, returning the pending transaction info of every transaction"""
+        if len(txns) > 16:
+            raise LogicError(f'group of {len(txns)} transactions is too big')
+        if len({txn.get('grp') for txn in txns}) > 1 or (len(txns) > 1 and 'grp' not in txns[0]):
+            raise LogicError('transactions do not share a group id')
+        next_round = self._ledger.round + 1
+        for tx_id, txn in zip(tx_ids, txns):
+            if not txn.get('fv', 0) <= next_round <= txn.get('lv', 0):
+                raise LogicError(f'txn {tx_id} dead: round {next_round} outside of {txn.get("fv")}--{txn.get("lv")}')
+            if txn.get('gh') != base64.b64decode(GENESIS_HASH):
+                raise LogicError(f'txn {tx_id} has the wrong genesis hash')
+            if tx_id in self._pending:
+                raise LogicError(f'transaction already in ledger: {tx_id}')
+        group = _Group(
+            txns=txns,
+            tx_ids=tx_ids,
+            fee_credit=sum(txn.get('fee', 0) for txn in txns) - MIN_TXN_FEE * len(txns),
+            budget=APP_CALL_BUDGET * sum(txn['type'] == 'appl' for txn in txns),
+        )
+        if group.fee_credit < 0:
+            raise LogicError('fee too small for the transaction group')
+
+        saved = copy.deepcopy((self._ledger.accounts, self._ledger.apps, self._ledger.assets, self._ledger.next_id))
+        try:
+            infos = []
+            for index, txn in enumerate(txns):
+                infos.append(self._ledger.apply(txn, group, index))
+                for address, account in self._ledger.accounts.items():
+                    if account['amount'] < self._ledger.min_balance(address):
+                        raise LogicError(
+                            f'account {encoding.encode_address(address)} balance {account["amount"]} '
+                            f'below min {self._ledger.min_balance(address)}'
+                        )
+        except LogicError:
+            self._ledger.accounts, self._ledger.apps, self._ledger.assets, self._ledger.next_id = saved
+            raise
+        self._ledger.round = next_round
+        return infos
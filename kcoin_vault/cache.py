@@ -0,0 +1,69 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Final, Optional, Union
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class DiskCache:
+    '''
+    A persistent key-value store of JSON documents, one file per entry.
+
+    Entries are evicted in least-recently-used order once there are more than `max_entries`.
+    Recency is tracked with the files' modification times, which are refreshed on every hit.
+    '''
+
+    def __init__(self, directory: Path, max_entries: int = 128) -> None:
+        if max_entries < 1:
+            raise ValueError(f'Cache size must be positive, got {max_entries}')
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(*parts: Union[str, bytes]) -> str:
+        """Content-address the given parts; the key changes if any part changes"""
+        digest = hashlib.sha256()
+        for part in parts:
+            data = part.encode() if isinstance(part, str) else part
+            digest.update(len(data).to_bytes(8, 'big'))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with path.open() as f:
+                value = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            _LOGGER.warning(f'Ignoring unreadable cache entry {path}: {err}')
+            return None
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with tmp_path.open('w') as f:
+            json.dump(value, f)
+        tmp_path.replace(path)
+        self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.json'
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
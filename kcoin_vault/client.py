@@ -1,26 +1,245 @@
 import base64
+import copy
+import functools
 import importlib
-import pytest
+import importlib.util
+import itertools
+import logging
+import sys
+import time
+from importlib.metadata import version
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Final, Iterable, List, Optional, Tuple, Union
 
-import pyteal
 import algosdk
-from algosdk.atomic_transaction_composer import AccountTransactionSigner, TransactionWithSigner
+import pyteal
+import pytest
+from algosdk.abi import Contract
+from algosdk.atomic_transaction_composer import (
+    ABIResult,
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    AtomicTransactionComposerStatus,
+    AtomicTransactionResponse,
+    TransactionSigner,
+    TransactionWithSigner,
+)
+from algosdk.error import AlgodHTTPError
 from algosdk.future import transaction
 from kavm.algod import KAVMAtomicTransactionComposer, KAVMClient
 
+from kcoin_vault.avm import FastAVMClient
+from kcoin_vault.cache import DiskCache
+from kcoin_vault.confirmation import ConfirmationTracker
+from kcoin_vault.dispatch import MethodDispatcher, PreparedCall
+from kcoin_vault.paths import TEAL_CACHE_DIR
+from kcoin_vault.profiling import phase
+from kcoin_vault.remote import RemoteKAVMClient
+from kcoin_vault.signing import BulkSigner
+from kcoin_vault.templates import CallTemplate, abi_return
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# Maximum number of transactions in an atomic group
+MAX_GROUP_SIZE: Final = 16
+
+# Flat fee of a mint or burn app call, covering the inner transaction the app issues
+CALL_FEE: Final = 2000
+
 
 def compile_teal(client, source_code):
     """Compile TEAL source code to binary for a transaction"""
-    compile_response = client.compile(source_code)
+    with phase('algod-compile'):
+        compile_response = client.compile(source_code)
     return base64.b64decode(compile_response["result"])
 
 
+def import_pyteal_module(pyteal_code_module: str) -> ModuleType:
+    """
+    Import a PyTeal module with KAVM's specification decorators stubbed out
+
+    The module is not kept in `sys.modules`, so that later imports, e.g. by KAVM's prover,
+    get the real decorators.
+    """
+    imported = pyteal_code_module in sys.modules
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            target=pyteal.Router,
+            name='hoare_method',
+            value=lambda *args, **kwargs: lambda _: None,
+            raising=False,
+        )
+        monkeypatch.setattr(
+            target=pyteal.Router,
+            name='precondition',
+            value=lambda *args, **kwargs: lambda _: None,
+            raising=False,
+        )
+        monkeypatch.setattr(
+            target=pyteal.Router,
+            name='postcondition',
+            value=lambda *args, **kwargs: lambda _: None,
+            raising=False,
+        )
+        try:
+            with phase('pyteal-import'):
+                return importlib.import_module(pyteal_code_module)
+        finally:
+            if not imported:
+                sys.modules.pop(pyteal_code_module, None)
+
+
+def compile_pyteal_module(
+    algod, pyteal_code_module: str, cache: Optional[DiskCache] = None
+) -> Tuple[bytes, bytes, Contract]:
+    """
+    Compile a PyTeal module to approval and clear program binaries, and its contract description object
+
+    With a `cache`, the artifacts are reused as long as the module's source file, the PyTeal and SDK versions
+    and the kind of `algod` client stay the same, skipping both PyTeal compilation and the `compile` round-trip.
+    """
+    key = None
+    if cache is not None:
+        spec = importlib.util.find_spec(pyteal_code_module)
+        if spec is not None and spec.origin is not None:
+            key = DiskCache.key(
+                Path(spec.origin).read_bytes(),
+                version('pyteal'),
+                version('py-algorand-sdk'),
+                f'{type(algod).__module__}.{type(algod).__qualname__}',
+            )
+            entry = cache.get(key)
+            if entry is not None:
+                _LOGGER.debug(f'Reusing compiled TEAL for {pyteal_code_module}')
+                return (
+                    base64.b64decode(entry['approval']),
+                    base64.b64decode(entry['clear']),
+                    Contract.undictify(entry['contract']),
+                )
+
+    module = import_pyteal_module(pyteal_code_module)
+    with phase('pyteal-compile'):
+        approval_source, clear_source, contract = module.compile_to_teal()
+    approval_program = compile_teal(algod, approval_source)
+    clear_program = compile_teal(algod, clear_source)
+
+    if key is not None:
+        cache.put(
+            key,
+            {
+                'approval': base64.b64encode(approval_program).decode(),
+                'clear': base64.b64encode(clear_program).decode(),
+                'contract': contract.dictify(),
+            },
+        )
+    return approval_program, clear_program, contract
+
+
+class SuggestedParamsCache:
+    '''
+    Suggested transaction parameters, fetched from algod at most once every `ttl` seconds
+
+    The parameters are refetched earlier once a confirmed round comes within `refresh_margin` rounds
+    of their last valid round, so that transactions built from them stay valid. A `ttl` of 0 disables caching.
+    '''
+
+    def __init__(self, algod, ttl: float = 10.0, refresh_margin: int = 10) -> None:
+        self.algod = algod
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self._params: Optional[transaction.SuggestedParams] = None
+        self._fetched_at = 0.0
+
+    def get(self, fee: Optional[int] = None) -> transaction.SuggestedParams:
+        """A copy of the suggested parameters, with a flat `fee` if one is given"""
+        if self._params is None or time.monotonic() - self._fetched_at >= self.ttl:
+            self._params = self.algod.suggested_params()
+            self._fetched_at = time.monotonic()
+        sp = copy.copy(self._params)
+        if fee is not None:
+            sp.flat_fee = True
+            sp.fee = fee
+        return sp
+
+    def observe_round(self, confirmed_round: int) -> None:
+        if self._params is not None and confirmed_round + self.refresh_margin >= self._params.last:
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        self._params = None
+
+
+# Attributes of a `KAVMClient` that hold the loaded K tooling, rather than ledger state: a snapshot shares them
+# with the client. Every other attribute is deep-copied, whatever its type, so that no ledger or account state
+# can be shared between a snapshot and the client it was taken from.
+SHARED_BACKEND_ATTRIBUTES: Final = frozenset({'kavm'})
+
+
+def backend_state(algod) -> Dict[str, Any]:
+    """
+    The attributes of an in-process backend client, which hold its ledger
+
+    Raises a RuntimeError if a `KAVMClient` lacks any of the `SHARED_BACKEND_ATTRIBUTES`, e.g. with another
+    version of KAVM: snapshots would otherwise deep-copy the K tooling along with the ledger.
+    """
+    state = vars(algod)
+    if isinstance(algod, KAVMClient):
+        missing = SHARED_BACKEND_ATTRIBUTES - state.keys()
+        if missing:
+            raise RuntimeError(
+                f'{type(algod).__name__} has no attribute {", ".join(sorted(missing))} holding the K tooling, '
+                f'cannot snapshot its ledger'
+            )
+    return state
+
+
+def copy_ledger(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the attributes of an in-process backend, sharing only the `SHARED_BACKEND_ATTRIBUTES`"""
+    shared = {id(value): value for name, value in state.items() if name in SHARED_BACKEND_ATTRIBUTES}
+    return copy.deepcopy(state, memo=shared)
+
+
+def rejected_at_submission(comp: AtomicTransactionComposer, err: Exception) -> bool:
+    """
+    Whether `err` is the node rejecting a group as it was sent, which leaves the ledger untouched
+
+    Any other error, e.g. a confirmation timeout, leaves it unknown whether the group was committed.
+    """
+    return isinstance(err, AlgodHTTPError) and comp.status < AtomicTransactionComposerStatus.SUBMITTED
+
+
+def _confirmation_tx_ids(comp: AtomicTransactionComposer) -> List[str]:
+    """The transactions of a sent group to wait for: its method calls, whose results are decoded, or its first one"""
+    return [comp.tx_ids[i] for i in sorted(comp.method_dict)] or comp.tx_ids[:1]
+
+
+def _response(comp: AtomicTransactionComposer, tx_infos: Dict[str, Dict[str, Any]]) -> AtomicTransactionResponse:
+    """The response of a confirmed group, decoded from the pending transaction info of its transactions"""
+    results = []
+    for i, method in sorted(comp.method_dict.items()):
+        tx_id = comp.tx_ids[i]
+        return_value, decode_error = None, None
+        try:
+            return_value = abi_return(method, tx_infos[tx_id])
+        except Exception as err:
+            # as `AtomicTransactionComposer.execute` does, a result that cannot be decoded is reported, not raised
+            decode_error = err
+        results.append(ABIResult(tx_id, None, return_value, decode_error, tx_infos[tx_id], method))
+    comp.status = AtomicTransactionComposerStatus.COMMITTED
+    confirmed_round = tx_infos[_confirmation_tx_ids(comp)[0]]['confirmed-round']
+    return AtomicTransactionResponse(confirmed_round, comp.tx_ids, results)
+
+
 class ContractClient:
     '''
     The initializer sets up initial state for testing:
       * create the app
       * trigger creation of app's asset
       * creator opts into app's asset
+
+    With the KAVM and fast AVM backends, the ledger right after this bootstrap is snapshotted,
+    and `reset` restores it.
     '''
 
     def __init__(
@@ -29,38 +248,25 @@ class ContractClient:
         creator_addr,
         creator_private_key,
         pyteal_code_module,
+        cache_compiled: bool = True,
+        suggested_params_ttl: float = 10.0,
+        bulk_signer: Optional[BulkSigner] = None,
     ) -> None:
 
-        with pytest.MonkeyPatch.context() as monkeypatch:
-            monkeypatch.setattr(
-                target=pyteal.Router,
-                name='hoare_method',
-                value=lambda *args, **kwargs: lambda _: None,
-                raising=False,
-            )
-            monkeypatch.setattr(
-                target=pyteal.Router,
-                name='precondition',
-                value=lambda *args, **kwargs: lambda _: None,
-                raising=False,
-            )
-            monkeypatch.setattr(
-                target=pyteal.Router,
-                name='postcondition',
-                value=lambda *args, **kwargs: lambda _: None,
-                raising=False,
-            )
-            config = importlib.import_module(pyteal_code_module)
-            approval_source, clear_source, self.contract_interface = config.compile_to_teal()
-
         self.algod = algod
+        self.bulk_signer = bulk_signer
+        self.suggested_params = SuggestedParamsCache(algod, ttl=suggested_params_ttl)
+        self.confirmations = ConfirmationTracker(algod)
+        self._notes = itertools.count()
+        self._templates: Dict[Tuple[str, str, int], CallTemplate] = {}
         # Compile approval and clear TEAL programs
-        approval_program = compile_teal(algod, approval_source)
-        clear_program = compile_teal(algod, clear_source)
+        approval_program, clear_program, self.contract_interface = compile_pyteal_module(
+            algod, pyteal_code_module, cache=DiskCache(TEAL_CACHE_DIR) if cache_compiled else None
+        )
 
         # create app
         on_complete = transaction.OnComplete.NoOpOC.real
-        params = algod.suggested_params()
+        params = self.suggested_params.get()
 
         global_schema = transaction.StateSchema(num_uints=2, num_byte_slices=0)
         txn = transaction.ApplicationCreateTxn(
@@ -70,33 +276,35 @@ class ContractClient:
         signed_txn = txn.sign(creator_private_key)
         tx_id = signed_txn.transaction.get_txid()
 
-        algod.send_transactions([signed_txn])
-        transaction.wait_for_confirmation(algod, tx_id, 4)
+        with phase('app-create'):
+            algod.send_transactions([signed_txn])
+            transaction_response = self.confirmations.wait([tx_id])[tx_id]
 
         # display results
-        transaction_response = algod.pending_transaction_info(tx_id)
         self.app_id = transaction_response["application-index"]
 
         ## Fund app with algos
-        fund_app_account_txn = transaction.PaymentTxn(
-            sender=creator_addr, sp=params, receiver=algosdk.logic.get_application_address(self.app_id), amt=10**6
+        signer = AccountTransactionSigner(creator_private_key)
+        fund_comp = KAVMAtomicTransactionComposer()
+        fund_comp.add_transaction(
+            TransactionWithSigner(
+                transaction.PaymentTxn(
+                    sender=creator_addr,
+                    sp=params,
+                    receiver=algosdk.logic.get_application_address(self.app_id),
+                    amt=10**6,
+                ),
+                signer,
+            )
         )
-        signed_txn = fund_app_account_txn.sign(creator_private_key)
-        tx_id = signed_txn.transaction.get_txid()
-        algod.send_transactions([signed_txn])
-        transaction.wait_for_confirmation(algod, tx_id, 4)
 
-        # Initialize App's asset
-        signer = AccountTransactionSigner(creator_private_key)
+        # Initialize App's asset, sent right after the funding, which the node applies first
         comp = KAVMAtomicTransactionComposer()
         comp.add_method_call(
             self.app_id, self.contract_interface.get_method_by_name("init_asset"), creator_addr, params, signer
         )
 
-        if isinstance(self.algod, KAVMClient):
-            resp = comp.execute(self.algod, 2, override_tx_ids=['0'])
-        else:
-            resp = comp.execute(self.algod, 2)
+        _, resp = self._execute_all([fund_comp, comp])
         self.asset_id = resp.abi_results[0].return_value
 
         # Opt-in to app's asset
@@ -106,52 +314,62 @@ class ContractClient:
                 transaction.AssetOptInTxn(sender=creator_addr, sp=params, index=self.asset_id), signer
             )
         )
-        if isinstance(self.algod, KAVMClient):
-            resp = comp.execute(self.algod, 2, override_tx_ids=['0'])
-        else:
-            resp = comp.execute(self.algod, 2)
+        self._execute(comp)
+
+        self._bootstrap_snapshot = self.snapshot() if self.supports_snapshots else None
+
+    @property
+    def supports_snapshots(self) -> bool:
+        return isinstance(self.algod, (KAVMClient, FastAVMClient, RemoteKAVMClient))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Capture the current ledger state of an in-process backend
+
+        The K tooling held by the client is shared rather than copied, so a snapshot only costs
+        a copy of the ledger data.
+        """
+        if not self.supports_snapshots:
+            raise RuntimeError(f'Ledger snapshots need the KAVM or fast AVM backend, got {type(self.algod).__name__}')
+        if isinstance(self.algod, RemoteKAVMClient):
+            return self.algod.snapshot()
+        return copy_ledger(backend_state(self.algod))
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """Roll the ledger back to a snapshot. The same snapshot can be restored any number of times."""
+        if not self.supports_snapshots:
+            raise RuntimeError(f'Ledger snapshots need the KAVM or fast AVM backend, got {type(self.algod).__name__}')
+        if isinstance(self.algod, RemoteKAVMClient):
+            self.algod.restore(snapshot)
+            return
+        restored = copy_ledger(snapshot)
+        state = backend_state(self.algod)
+        state.clear()
+        state.update(restored)
+
+    def reset(self) -> None:
+        """Roll the ledger back to the state right after the app was deployed and bootstrapped"""
+        if self._bootstrap_snapshot is None:
+            raise RuntimeError(f'Ledger snapshots need the KAVM or fast AVM backend, got {type(self.algod).__name__}')
+        self.restore(self._bootstrap_snapshot)
 
     def call_mint(
         self,
         sender_addr: str,
         sender_pk: str,
         microalgo_amount: int,
+        fee: int = CALL_FEE,
     ) -> int:
         """
         Call app's 'mint' method
         """
-        contract = self.contract_interface
-        app_id = self.app_id
-        asset_id = self.asset_id
+        if not self._positional_tx_ids:
+            return self._call_template('mint', sender_addr, sender_pk, microalgo_amount, fee)
         comp = KAVMAtomicTransactionComposer()
         signer = AccountTransactionSigner(sender_pk)
-        sp = self.algod.suggested_params()
-        sp.flat_fee = True
-        sp.fee = 2000
-        comp.add_method_call(
-            app_id,
-            contract.get_method_by_name('mint'),
-            sender_addr,
-            sp,
-            signer,
-            foreign_assets=[asset_id],
-            method_args=[
-                TransactionWithSigner(
-                    transaction.PaymentTxn(
-                        sender=sender_addr,
-                        sp=sp,
-                        receiver=algosdk.logic.get_application_address(app_id),
-                        amt=microalgo_amount,
-                    ),
-                    signer,
-                )
-            ],
-        )
-
-        if isinstance(self.algod, KAVMClient):
-            resp = comp.execute(self.algod, 2, override_tx_ids=['0', '1'])
-        else:
-            resp = comp.execute(self.algod, 2)
+        sp = self.suggested_params.get(fee=fee)
+        self._add_mint(comp, sender_addr, signer, sp, microalgo_amount)
+        resp = self._execute(comp)
         return resp.abi_results[0].return_value
 
     def call_burn(
@@ -159,40 +377,260 @@ class ContractClient:
         sender_addr: str,
         sender_pk: str,
         asset_amount: int,
+        fee: int = CALL_FEE,
     ) -> int:
         """
         Call app's 'burn' method
         """
-        contract = self.contract_interface
-        app_id = self.app_id
-        asset_id = self.asset_id
+        if not self._positional_tx_ids:
+            return self._call_template('burn', sender_addr, sender_pk, asset_amount, fee)
         comp = KAVMAtomicTransactionComposer()
         signer = AccountTransactionSigner(sender_pk)
-        sp = self.algod.suggested_params()
-        sp.flat_fee = True
-        sp.fee = 2000
-        comp.add_method_call(
-            app_id,
-            contract.get_method_by_name("burn"),
-            sender_addr,
-            sp,
-            signer,
-            foreign_assets=[asset_id],
-            method_args=[
-                TransactionWithSigner(
-                    transaction.AssetTransferTxn(
-                        sender=sender_addr,
-                        sp=sp,
-                        index=asset_id,
-                        receiver=algosdk.logic.get_application_address(app_id),
-                        amt=asset_amount,
-                    ),
-                    signer,
-                )
-            ],
+        sp = self.suggested_params.get(fee=fee)
+        self._add_burn(comp, sender_addr, signer, sp, asset_amount)
+        resp = self._execute(comp)
+        return resp.abi_results[0].return_value
+
+    def fund_accounts(self, sender_addr: str, sender_pk: str, receivers: List[str], microalgo_amount: int) -> None:
+        """Pay every receiver the same amount, in as few transaction groups as possible"""
+        signer = AccountTransactionSigner(sender_pk)
+        sp = self.suggested_params.get()
+        self._execute_grouped(
+            TransactionWithSigner(
+                transaction.PaymentTxn(
+                    sender=sender_addr, sp=sp, receiver=receiver, amt=microalgo_amount, note=self._next_note()
+                ),
+                signer,
+            )
+            for receiver in receivers
+        )
+
+    def opt_in(self, accounts: List[Tuple[str, str]]) -> None:
+        """Opt `(address, private key)` accounts into the app's asset, in as few transaction groups as possible"""
+        sp = self.suggested_params.get()
+        self._execute_grouped(
+            TransactionWithSigner(
+                transaction.AssetOptInTxn(sender=addr, sp=sp, index=self.asset_id), AccountTransactionSigner(pk)
+            )
+            for addr, pk in accounts
         )
-        if isinstance(self.algod, KAVMClient):
-            resp = comp.execute(self.algod, 2, override_tx_ids=['0', '1'])
+
+    def batch(self, sender_addr: str, sender_pk: str, fee: int = CALL_FEE) -> 'CallBatch':
+        """
+        Start a batch of calls from one sender, e.g. `client.batch(addr, pk).mint(10000).burn(20000).execute()`
+        """
+        return CallBatch(self, sender_addr, sender_pk, fee=fee)
+
+    @functools.cached_property
+    def dispatcher(self) -> MethodDispatcher:
+        """Calls of any method of the app, prepared from its ABI interface"""
+        return MethodDispatcher(self)
+
+    def call_template(self, method: str, sender_addr: str, sender_pk: str, fee: int = CALL_FEE) -> CallTemplate:
+        """The pre-built call of `method` from a sender, built on first use"""
+        key = (method, sender_addr, fee)
+        if key not in self._templates:
+            self._templates[key] = CallTemplate(
+                self, method, sender_addr, sender_pk, self.suggested_params.get(fee=fee)
+            )
+        return self._templates[key]
+
+    @property
+    def _positional_tx_ids(self) -> bool:
+        # KAVM identifies the transactions of a group by their position, so transaction ids are not unique
+        # across groups, and it executes a group as soon as it is sent
+        return isinstance(self.algod, (KAVMClient, RemoteKAVMClient))
+
+    def _call_template(self, method: str, sender_addr: str, sender_pk: str, amount: int, fee: int) -> Any:
+        template = self.call_template(method, sender_addr, sender_pk, fee)
+        signed = template.sign(amount, self.suggested_params.get(fee=fee), self._next_note())
+        with phase('execute'):
+            self.algod.algod_request(
+                'POST', '/transactions', data=signed.raw, headers={'Content-Type': 'application/x-binary'}
+            )
+            tx_info = self.confirmations.wait([signed.tx_id])[signed.tx_id]
+        self.suggested_params.observe_round(tx_info['confirmed-round'])
+        return abi_return(signed.method, tx_info)
+
+    def _add_mint(
+        self,
+        comp: AtomicTransactionComposer,
+        sender_addr: str,
+        signer: TransactionSigner,
+        sp: transaction.SuggestedParams,
+        microalgo_amount: int,
+    ) -> None:
+        self.dispatcher.add_call(comp, sender_addr, signer, sp, 'mint', [microalgo_amount])
+
+    def _add_burn(
+        self,
+        comp: AtomicTransactionComposer,
+        sender_addr: str,
+        signer: TransactionSigner,
+        sp: transaction.SuggestedParams,
+        asset_amount: int,
+    ) -> None:
+        self.dispatcher.add_call(comp, sender_addr, signer, sp, 'burn', [asset_amount])
+
+    def _execute_grouped(self, txns: Iterable[TransactionWithSigner]) -> None:
+        comps = [KAVMAtomicTransactionComposer()]
+        for txn in txns:
+            if comps[-1].get_tx_count() == MAX_GROUP_SIZE:
+                comps.append(KAVMAtomicTransactionComposer())
+            comps[-1].add_transaction(txn)
+        self._execute_all(comp for comp in comps if comp.get_tx_count())
+
+    def _execute_all(
+        self, comps: Iterable[AtomicTransactionComposer], stop_at_rejection: bool = False
+    ) -> List[Union[AtomicTransactionResponse, AlgodHTTPError]]:
+        """
+        Execute groups in order, signing them all up front with the bulk signer, if there is one
+
+        Every group is sent before any is waited for, and all of them are then confirmed in one sweep
+        of the `ConfirmationTracker`; the node applies them in the order they were sent. With KAVM,
+        see `_positional_tx_ids`, the groups are executed one after the other instead.
+        If the node rejects a group as it is sent, the groups after it are not sent, and once the groups before it
+        are confirmed its error is raised, or, with `stop_at_rejection`, returned after their responses.
+        """
+        comps = list(comps)
+        if self.bulk_signer is not None:
+            with phase('sign'):
+                self.bulk_signer.sign_composers(comps)
+        resps: List[Union[AtomicTransactionResponse, AlgodHTTPError]] = []
+        rejection = None
+        if self._positional_tx_ids:
+            for comp in comps:
+                try:
+                    resps.append(self._execute(comp))
+                except AlgodHTTPError as err:
+                    if not (stop_at_rejection and rejected_at_submission(comp, err)):
+                        raise
+                    rejection = err
+                    break
         else:
-            resp = comp.execute(self.algod, 2)
-        return resp.abi_results[0].return_value
+            with phase('execute'):
+                sent = []
+                for comp in comps:
+                    try:
+                        comp.submit(self.algod)
+                    except AlgodHTTPError as err:
+                        rejection = err
+                        break
+                    sent.append(comp)
+                tx_infos = self.confirmations.wait(tx_id for comp in sent for tx_id in _confirmation_tx_ids(comp))
+            resps.extend(_response(comp, tx_infos) for comp in sent)
+            if sent:
+                self.suggested_params.observe_round(max(resp.confirmed_round for resp in resps))
+        if rejection is not None:
+            if not stop_at_rejection:
+                raise rejection
+            resps.append(rejection)
+        return resps
+
+    def _next_note(self) -> bytes:
+        # With cached suggested params, repeated identical calls would otherwise share transaction ids
+        return next(self._notes).to_bytes(8, 'big')
+
+    def _execute(self, comp: AtomicTransactionComposer) -> AtomicTransactionResponse:
+        with phase('execute'):
+            if self._positional_tx_ids:
+                resp = comp.execute(self.algod, 2, override_tx_ids=[str(i) for i in range(comp.get_tx_count())])
+            else:
+                resp = comp.execute(self.algod, 2)
+        self.suggested_params.observe_round(resp.confirmed_round)
+        return resp
+
+
+class CallBatch:
+    '''
+    A sequence of app method calls from one sender, submitted together
+
+    Calls are packed, in order, into atomic transaction groups of at most `MAX_GROUP_SIZE` transactions,
+    so a batch of n mints or burns takes about n / 8 round-trips instead of n.
+    '''
+
+    def __init__(self, client: ContractClient, sender_addr: str, sender_pk: str, fee: int = CALL_FEE) -> None:
+        self.client = client
+        self.sender_addr = sender_addr
+        self.signer = AccountTransactionSigner(sender_pk)
+        self.fee = fee
+        self._calls: List[PreparedCall] = []
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def call(self, method: str, *args: Any) -> 'CallBatch':
+        """
+        Add a call of any method of the app, see `MethodDispatcher` for the arguments it takes
+
+        The call is checked right away: a ValueError is raised, and the call is not added, if the method
+        does not exist or the arguments do not fit it.
+        """
+        self._calls.append(self.client.dispatcher.prepare_call(method, args))
+        return self
+
+    def mint(self, microalgo_amount: int) -> 'CallBatch':
+        return self.call('mint', microalgo_amount)
+
+    def burn(self, asset_amount: int) -> 'CallBatch':
+        return self.call('burn', asset_amount)
+
+    def execute(self) -> List[Any]:
+        """
+        Submit the batched calls and return their results in order
+
+        Groups are all sent before they are confirmed together, see `ContractClient._execute_all`.
+        If a group is rejected, the calls of the groups before it stay committed.
+        """
+        sp = self.client.suggested_params.get(fee=self.fee)
+        resps = self.client._execute_all(self._compose(calls, sp) for calls in self._groups())
+        self._calls.clear()
+        return [result.return_value for resp in resps for result in resp.abi_results]
+
+    def execute_each(self) -> List[Tuple[Any, Optional[str]]]:
+        """
+        Submit the batched calls as independent calls, returning the result, or the error, of every call in order
+
+        Calls are packed into groups as with `execute`, but a group the node rejects as it is sent, which leaves
+        the ledger untouched, is submitted again one call per group, so that a rejected call only fails itself
+        and not the calls it shared its group with. The groups after a rejected one are still submitted.
+        Any other error, e.g. a confirmation timeout, is raised: the group may have been committed,
+        so its calls are not submitted again.
+        """
+        sp = self.client.suggested_params.get(fee=self.fee)
+        groups = self._groups()
+        outcomes: List[Tuple[Any, Optional[str]]] = []
+        while groups:
+            resps = self.client._execute_all((self._compose(calls, sp) for calls in groups), stop_at_rejection=True)
+            for resp in resps:
+                if not isinstance(resp, AlgodHTTPError):
+                    outcomes.extend((result.return_value, None) for result in resp.abi_results)
+            n_executed = len(resps)
+            rejected, groups = groups[n_executed - 1], groups[n_executed:]
+            if isinstance(resps[-1], AlgodHTTPError):
+                if len(rejected) == 1:
+                    outcomes.append((None, f'{type(resps[-1]).__name__}: {resps[-1]}'))
+                else:
+                    # submit the calls of the rejected group again, each in a group of its own
+                    groups = [[call] for call in rejected] + groups
+        self._calls.clear()
+        return outcomes
+
+    def _groups(self) -> List[List[PreparedCall]]:
+        """The batched calls, packed in order into groups of at most `MAX_GROUP_SIZE` transactions"""
+        groups: List[List[PreparedCall]] = [[]]
+        n_txns = 0
+        for call in self._calls:
+            # every call is an app call plus the transactions passed as its arguments
+            if n_txns + call.prepared.n_txns > MAX_GROUP_SIZE:
+                groups.append([])
+                n_txns = 0
+            groups[-1].append(call)
+            n_txns += call.prepared.n_txns
+        return [calls for calls in groups if calls]
+
+    def _compose(self, calls: List[PreparedCall], sp: transaction.SuggestedParams) -> AtomicTransactionComposer:
+        comp = KAVMAtomicTransactionComposer()
+        for call in calls:
+            self.client.dispatcher.add_prepared_call(comp, self.sender_addr, self.signer, sp, call)
+        return comp
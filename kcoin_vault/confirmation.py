@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Final, Iterable, Optional, Tuple
+
+from algosdk import error
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+def _check(tx_id: str, tx_info: Dict[str, Any]) -> bool:
+    """Whether a transaction is confirmed, raising if it has been rejected"""
+    if tx_info.get('pool-error'):
+        raise error.TransactionRejectedError(f'Transaction {tx_id} rejected: {tx_info["pool-error"]}')
+    return bool(tx_info.get('confirmed-round'))
+
+
+class ConfirmationTracker:
+    '''
+    Waits for many transactions at once by following the chain round by round
+
+    Where `wait_for_confirmation` runs a polling loop per transaction, the tracker checks every outstanding
+    transaction in one sweep per round and then waits for the next block with a single `status_after_block`.
+    Transactions in one group are confirmed together, so tracking one transaction per group is enough.
+    '''
+
+    def __init__(self, algod, wait_rounds: int = 4) -> None:
+        self.algod = algod
+        self.wait_rounds = wait_rounds
+
+    def wait(self, tx_ids: Iterable[str], wait_rounds: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Block until all transactions are confirmed, returning their pending transaction info by id"""
+        wait_rounds = wait_rounds if wait_rounds is not None else self.wait_rounds
+        outstanding = list(dict.fromkeys(tx_ids))
+        confirmed: Dict[str, Dict[str, Any]] = {}
+        last_round = self.algod.status()['last-round']
+        current_round = last_round
+        while True:
+            for tx_id in list(outstanding):
+                try:
+                    tx_info = self.algod.pending_transaction_info(tx_id)
+                except error.AlgodHTTPError:
+                    # the node may not know about the transaction yet
+                    continue
+                if _check(tx_id, tx_info):
+                    confirmed[tx_id] = tx_info
+                    outstanding.remove(tx_id)
+            if not outstanding:
+                return confirmed
+            if current_round >= last_round + wait_rounds:
+                raise error.ConfirmationTimeoutError(f'Wait for transaction ids {outstanding} timed out')
+            self.algod.status_after_block(current_round)
+            current_round += 1
+
+
+class AsyncConfirmationTracker:
+    '''
+    The asyncio counterpart of `ConfirmationTracker`
+
+    Coroutines `await tracker.wait(tx_id)`; a single background task sweeps all their transactions once per round
+    and resolves them, for as long as there are waiters. Blocking algod calls are made through `run`,
+    e.g. in a thread pool.
+    '''
+
+    def __init__(self, algod, run: Callable[..., Awaitable[Any]], wait_rounds: int = 4) -> None:
+        self.algod = algod
+        self.wait_rounds = wait_rounds
+        self._run = run
+        # tx id -> (future, last round to wait for, set once the transaction is first swept)
+        self._waiters: Dict[str, Tuple[asyncio.Future, Optional[int]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait(self, tx_id: str) -> Dict[str, Any]:
+        """Wait until a transaction is confirmed, returning its pending transaction info"""
+        if tx_id not in self._waiters:
+            self._waiters[tx_id] = (asyncio.get_running_loop().create_future(), None)
+        future, _ = self._waiters[tx_id]
+        if self._task is None:
+            self._task = asyncio.create_task(self._follow_rounds())
+        return await asyncio.shield(future)
+
+    async def _follow_rounds(self) -> None:
+        try:
+            current_round = (await self._run(self.algod.status))['last-round']
+            while self._waiters:
+                await self._sweep(current_round)
+                if not self._waiters:
+                    break
+                status = await self._run(self.algod.status_after_block, current_round)
+                current_round = max(current_round + 1, status['last-round'])
+        except Exception as err:
+            for future, _ in self._waiters.values():
+                if not future.done():
+                    future.set_exception(err)
+            self._waiters.clear()
+        finally:
+            self._task = None
+
+    async def _sweep(self, current_round: int) -> None:
+        tx_ids = list(self._waiters)
+        tx_infos = await asyncio.gather(
+            *(self._run(self.algod.pending_transaction_info, tx_id) for tx_id in tx_ids), return_exceptions=True
+        )
+        for tx_id, tx_info in zip(tx_ids, tx_infos):
+            future, last_round = self._waiters[tx_id]
+            if last_round is None:
+                last_round = current_round + self.wait_rounds
+                self._waiters[tx_id] = (future, last_round)
+            try:
+                if isinstance(tx_info, error.AlgodHTTPError):
+                    confirmed = False
+                elif isinstance(tx_info, BaseException):
+                    raise tx_info
+                else:
+                    confirmed = _check(tx_id, tx_info)
+            except Exception as err:
+                self._resolve(tx_id, exception=err)
+                continue
+            if confirmed:
+                self._resolve(tx_id, result=tx_info)
+            elif current_round >= last_round:
+                self._resolve(
+                    tx_id, exception=error.ConfirmationTimeoutError(f'Wait for transaction id {tx_id} timed out')
+                )
+
+    def _resolve(self, tx_id: str, result: Any = None, exception: Optional[BaseException] = None) -> None:
+        future, _ = self._waiters.pop(tx_id)
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
@@ -1,13 +1,21 @@
-import logging
-from typing import Any, Dict, Tuple
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
 
 import pytest
 from algosdk.account import generate_account
 from algosdk.v2client.algod import AlgodClient
+from hypothesis import Phase, settings
+from hypothesis.database import DirectoryBasedExampleDatabase
 from kavm.algod import KAVMClient
 
+from kcoin_vault.avm import FastAVMClient
 from kcoin_vault.client import ContractClient
-from kcoin_vault.sandbox import get_accounts
+from kcoin_vault.engine import create_algod
+from kcoin_vault.engine import creator_account as make_creator_account
+from kcoin_vault.paths import N_TESTS
+from kcoin_vault.profiling import PROFILER, phase
+from kcoin_vault.remote import ServeClient
+from kcoin_vault.sequence import MethodCall, open_sequence, read_calls
 
 
 def pytest_addoption(parser):
@@ -16,7 +24,7 @@ def pytest_addoption(parser):
         '--backend',
         action='store',
         default='algod',
-        choices=['kavm', 'sandbox'],
+        choices=['kavm', 'sandbox', 'fast'],
         help='AVM implementaion to run tests against',
     )
     parser.addoption(
@@ -24,19 +32,117 @@ def pytest_addoption(parser):
         type=str,
         help='Method sequence to call',
     )
+    parser.addoption(
+        '--methods-file',
+        type=Path,
+        default=None,
+        help='File to stream the method sequence from, calls or a JSON record per line; - for stdin',
+    )
+    parser.addoption(
+        '--output',
+        type=Path,
+        default=None,
+        help='File to write the result of every call of the method sequence to, as JSON records',
+    )
+    parser.addoption(
+        '--max-examples',
+        type=int,
+        default=N_TESTS,
+        help='Number of examples Hypothesis generates per property test',
+    )
+    parser.addoption(
+        '--example-db',
+        type=Path,
+        default=None,
+        help='Directory of the Hypothesis example database, where failing examples are saved',
+    )
+    parser.addoption(
+        '--replay-examples',
+        action='store_true',
+        default=False,
+        help='Only replay the failing examples saved in the example database, instead of generating new ones',
+    )
+    parser.addoption(
+        '--no-shrink',
+        dest='shrink',
+        action='store_false',
+        default=True,
+        help='Report failing examples as generated, without shrinking them, which takes many more runs on KAVM',
+    )
+    parser.addoption(
+        '--kavm-server',
+        type=Path,
+        default=None,
+        help='Socket of a `kavm-demo serve` server to run the KAVM backend on, instead of loading KAVM',
+    )
+    parser.addoption(
+        '--profile-report',
+        type=Path,
+        default=None,
+        help='Profile the phases of the session and write the JSON report to this path',
+    )
 
 
-@pytest.fixture(scope="session")
-def methods(pytestconfig):
-    return pytestconfig.getoption("methods").split()
+def pytest_configure(config):
+    if config.getoption('replay_examples'):
+        phases = [Phase.explicit, Phase.reuse]
+    elif config.getoption('shrink'):
+        # on the fast AVM, shrinking also makes for small counterexamples to re-check on KAVM
+        phases = [Phase.explicit, Phase.generate, Phase.shrink]
+    else:
+        phases = [Phase.explicit, Phase.generate]
+    example_db = config.getoption('example_db')
+    settings.register_profile(
+        'kavm-demo',
+        max_examples=config.getoption('max_examples'),
+        phases=phases,
+        **({'database': DirectoryBasedExampleDatabase(str(example_db))} if example_db is not None else {}),
+    )
+    settings.load_profile('kavm-demo')
+    if config.getoption('profile_report') is not None:
+        PROFILER.enable()
+
+
+def pytest_unconfigure(config):
+    profile_report = config.getoption('profile_report')
+    if profile_report is not None:
+        PROFILER.write(profile_report.parent, profile_report.stem)
 
 
 @pytest.fixture(scope="session")
-def algod(request: Any, creator_account) -> AlgodClient | KAVMClient:
-    if request.config.getoption('--backend') == 'sandbox':
-        return AlgodClient("a" * 64, "http://localhost:4001")
+def methods(pytestconfig) -> Iterator[Iterator[MethodCall]]:
+    methods_file = pytestconfig.getoption("methods_file")
+    if methods_file is not None:
+        with open_sequence(methods_file) as calls:
+            yield calls
     else:
-        return KAVMClient(faucet_address=creator_account['address'], log_level=logging.ERROR)
+        yield read_calls([pytestconfig.getoption("methods")])
+
+
+@pytest.fixture(scope="session")
+def sequence_output(pytestconfig) -> Iterator[Optional[TextIO]]:
+    output = pytestconfig.getoption("output")
+    if output is None:
+        yield None
+        return
+    with output.open('w') as f:
+        yield f
+
+
+@pytest.fixture(scope="session")
+def kavm_server(request: Any) -> Iterator[Optional[ServeClient]]:
+    socket_path = request.config.getoption('kavm_server')
+    if socket_path is None or request.config.getoption('--backend') != 'kavm':
+        yield None
+        return
+    server = ServeClient.connect(socket_path)
+    yield server
+    server.close()
+
+
+@pytest.fixture(scope="session")
+def algod(request: Any, creator_account, kavm_server) -> AlgodClient | KAVMClient:
+    return create_algod(request.config.getoption('--backend'), creator_account, kavm_server)
 
 
 @pytest.fixture(scope="session")
@@ -45,24 +151,31 @@ def pyteal_code_module_str(pytestconfig):
 
 
 @pytest.fixture(scope="session")
-def creator_account(request: Any) -> Dict[str, str]:
-    if request.config.getoption('--backend') == 'sandbox':
-        creator_addr, creator_private_key = get_accounts()[0]
-        return {'address': creator_addr, 'private_key': creator_private_key}
-    else:
-        creator_private_key, creator_addr = generate_account()
-        return {'address': str(creator_addr), 'private_key': creator_private_key}
+def creator_account(request: Any, kavm_server) -> Dict[str, str]:
+    return make_creator_account(request.config.getoption('--backend'), kavm_server)
 
 
 @pytest.fixture(scope='session')
 def initial_state_fixture(algod, creator_account, pyteal_code_module_str) -> Tuple[ContractClient, str, str]:
-    return (
-        ContractClient(
+    with phase('deploy'):
+        client = ContractClient(
             algod,
             creator_account['address'],
             creator_account['private_key'],
             pyteal_code_module_str,
-        ),
+        )
+    return (
+        client,
         creator_account['address'],
         creator_account['private_key'],
     )
+
+
+@pytest.fixture
+def fast_vault(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Tuple[ContractClient, str, str]:
+    """A vault freshly deployed on the fast AVM, for the unit tests that need a contract to call"""
+    monkeypatch.chdir(tmp_path)
+    private_key, address = generate_account()
+    algod = FastAVMClient(faucet_address=address)
+    client = ContractClient(algod, address, private_key, 'kcoin_vault.kcoin_vault_pyteal_fixed', cache_compiled=False)
+    return client, address, private_key
@@ -0,0 +1,228 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence, Sized, Tuple
+
+import algosdk
+from algosdk import abi
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, TransactionSigner, TransactionWithSigner
+from algosdk.future import transaction
+
+if TYPE_CHECKING:
+    from kcoin_vault.client import ContractClient
+
+# Turns a plain value, e.g. parsed from `mint(10000)`, into the value an argument takes, or raises ValueError
+ArgConverter = Callable[[Any], Any]
+# Turns the converted value of an argument into what the composer takes: an ABI value, or a transaction
+# with its signer
+ArgBuilder = Callable[[Any, str, TransactionSigner, transaction.SuggestedParams, bytes], Any]
+
+
+@dataclass(frozen=True)
+class PreparedMethod:
+    method: abi.Method
+    arg_converters: Tuple[ArgConverter, ...]
+    arg_builders: Tuple[ArgBuilder, ...]
+    # transactions a call takes in its group: the app call and its transaction arguments
+    n_txns: int
+
+    def signature(self) -> str:
+        return f'{self.method.name}({", ".join(f"{arg.type} {arg.name}" for arg in self.method.args)})'
+
+
+@dataclass(frozen=True)
+class PreparedCall:
+    """A call of a method whose arguments are checked and converted, ready to be added to a group"""
+
+    prepared: PreparedMethod
+    args: Tuple[Any, ...]
+
+
+class MethodDispatcher:
+    '''
+    Calls any method of a deployed contract's ABI interface by name
+
+    Every method is prepared once, when the dispatcher is built: its `abi.Method` is looked up and
+    every argument gets a converter from plain values, e.g. parsed from `mint(10000)`, to ABI values.
+    Transaction arguments are built from an amount: a payment of microalgos to the app for `pay`,
+    a transfer of the app's asset to the app for `axfer`.
+    Calls are checked and converted by `prepare_call`, before they are added to a group, so that
+    a malformed call is rejected on its own rather than with the calls it would have shared a group with.
+    '''
+
+    def __init__(self, client: 'ContractClient') -> None:
+        self.client = client
+        self.app_address = algosdk.logic.get_application_address(client.app_id)
+        self.methods: Dict[str, PreparedMethod] = {
+            method.name: self._prepare(method) for method in client.contract_interface.methods
+        }
+
+    def prepared(self, name: str) -> PreparedMethod:
+        try:
+            return self.methods[name]
+        except KeyError:
+            raise ValueError(f'No such method {name}, the contract has: {", ".join(self.methods)}') from None
+
+    def prepare_call(self, name: str, args: Sequence[Any]) -> PreparedCall:
+        """Check the arguments of a call of `name` and convert them, raising ValueError if they do not fit"""
+        prepared = self.prepared(name)
+        if len(args) != len(prepared.arg_converters):
+            raise ValueError(f'{prepared.signature()} takes {len(prepared.arg_converters)} arguments, got {len(args)}')
+        values = []
+        for abi_arg, convert, value in zip(prepared.method.args, prepared.arg_converters, args):
+            try:
+                values.append(convert(value))
+            except (TypeError, ValueError) as err:
+                raise ValueError(f'{prepared.signature()}: invalid {abi_arg.name} {value!r}: {err}') from None
+        return PreparedCall(prepared, tuple(values))
+
+    def add_call(
+        self,
+        comp: AtomicTransactionComposer,
+        sender_addr: str,
+        signer: TransactionSigner,
+        sp: transaction.SuggestedParams,
+        name: str,
+        args: Sequence[Any],
+    ) -> None:
+        self.add_prepared_call(comp, sender_addr, signer, sp, self.prepare_call(name, args))
+
+    def add_prepared_call(
+        self,
+        comp: AtomicTransactionComposer,
+        sender_addr: str,
+        signer: TransactionSigner,
+        sp: transaction.SuggestedParams,
+        call: PreparedCall,
+    ) -> None:
+        prepared, args = call.prepared, call.args
+        note = self.client._next_note()
+        comp.add_method_call(
+            self.client.app_id,
+            prepared.method,
+            sender_addr,
+            sp,
+            signer,
+            foreign_assets=[self.client.asset_id],
+            method_args=[build(arg, sender_addr, signer, sp, note) for build, arg in zip(prepared.arg_builders, args)],
+            note=note,
+        )
+
+    def _prepare(self, method: abi.Method) -> PreparedMethod:
+        return PreparedMethod(
+            method=method,
+            arg_converters=tuple(_arg_converter(arg.type) for arg in method.args),
+            arg_builders=tuple(self._arg_builder(arg.type) for arg in method.args),
+            n_txns=method.get_txn_calls(),
+        )
+
+    def _arg_builder(self, arg_type: Any) -> ArgBuilder:
+        if arg_type == abi.ABITransactionType.PAY:
+            return self._payment
+        if arg_type == abi.ABITransactionType.AXFER:
+            return self._asset_transfer
+        return lambda value, *_: value
+
+    def _payment(
+        self, value: Any, sender_addr: str, signer: TransactionSigner, sp: transaction.SuggestedParams, note: bytes
+    ) -> TransactionWithSigner:
+        return TransactionWithSigner(
+            transaction.PaymentTxn(sender=sender_addr, sp=sp, receiver=self.app_address, amt=value, note=note),
+            signer,
+        )
+
+    def _asset_transfer(
+        self, value: Any, sender_addr: str, signer: TransactionSigner, sp: transaction.SuggestedParams, note: bytes
+    ) -> TransactionWithSigner:
+        return TransactionWithSigner(
+            transaction.AssetTransferTxn(
+                sender=sender_addr,
+                sp=sp,
+                index=self.client.asset_id,
+                receiver=self.app_address,
+                amt=value,
+                note=note,
+            ),
+            signer,
+        )
+
+
+def _arg_converter(arg_type: Any) -> ArgConverter:
+    """Convert the value of an argument: an amount for transaction arguments, see `_converter` otherwise"""
+    if arg_type in (abi.ABITransactionType.PAY, abi.ABITransactionType.AXFER):
+        return _uint(64)
+    if abi.is_abi_transaction_type(arg_type):
+        return _unsupported(f'{arg_type} transaction arguments')
+    return _converter(arg_type)
+
+
+def _converter(arg_type: Any) -> ArgConverter:
+    """Convert a plain value, as parsed from JSON, to the value the ABI type encodes"""
+    if arg_type in (abi.ABIReferenceType.ASSET, abi.ABIReferenceType.APPLICATION):
+        return _uint(64)
+    if arg_type == abi.ABIReferenceType.ACCOUNT:
+        return str
+    if isinstance(arg_type, (abi.UintType, abi.UfixedType)):
+        # ufixed values are given as the integer they are scaled to
+        return _uint(arg_type.bit_size)
+    if isinstance(arg_type, abi.ByteType):
+        return _uint(8)
+    if isinstance(arg_type, abi.BoolType):
+        return _bool
+    if isinstance(arg_type, (abi.StringType, abi.AddressType)):
+        return str
+    if isinstance(arg_type, (abi.ArrayStaticType, abi.ArrayDynamicType)):
+        convert_elem = _converter(arg_type.child_type)
+        length = arg_type.static_length if isinstance(arg_type, abi.ArrayStaticType) else None
+
+        def convert_array(value: Any) -> Any:
+            if isinstance(value, str) and isinstance(arg_type.child_type, abi.ByteType):
+                value = value.encode()
+            _check_length(value, length)
+            return value if isinstance(value, bytes) else [convert_elem(elem) for elem in value]
+
+        return convert_array
+    if isinstance(arg_type, abi.TupleType):
+        convert_elems = [_converter(child_type) for child_type in arg_type.child_types]
+
+        def convert_tuple(value: Any) -> Any:
+            _check_length(value, len(convert_elems))
+            return [convert(elem) for convert, elem in zip(convert_elems, value)]
+
+        return convert_tuple
+    return _unsupported(f'arguments of type {arg_type}')
+
+
+def _check_length(value: Any, length: Optional[int]) -> None:
+    if isinstance(value, (str, dict)) or not isinstance(value, Sized):
+        raise ValueError('expected an array')
+    if length is not None and len(value) != length:
+        raise ValueError(f'expected {length} elements, got {len(value)}')
+
+
+def _uint(bit_size: int) -> ArgConverter:
+    def convert(value: Any) -> int:
+        # True is 1 to Python, and int() would truncate 1.5 to 1
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError('expected an integer')
+        converted = int(value)
+        if not 0 <= converted < 2**bit_size:
+            raise ValueError(f'out of range of uint{bit_size}')
+        return converted
+
+    return convert
+
+
+def _bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ('true', '1'):
+        return True
+    if str(value).lower() in ('false', '0'):
+        return False
+    raise ValueError('expected true or false')
+
+
+def _unsupported(what: str) -> Callable[..., Any]:
+    def fail(*_: Any) -> Any:
+        raise ValueError(f'Calls with {what} are not supported')
+
+    return fail
@@ -0,0 +1,99 @@
+import logging
+from pathlib import Path
+from typing import Any, Dict, Final, Iterable, Iterator, Optional, TextIO, Union
+
+from algosdk.account import generate_account
+from algosdk.v2client.algod import AlgodClient
+from kavm.algod import KAVMClient
+
+from kcoin_vault.avm import FastAVMClient
+from kcoin_vault.client import ContractClient
+from kcoin_vault.profiling import phase
+from kcoin_vault.remote import RemoteKAVMClient, ServeClient
+from kcoin_vault.sandbox import get_accounts
+from kcoin_vault.sequence import CallResult, MethodCall, SequenceSummary, call_results, read_calls, run_calls
+
+BACKENDS: Final = ('kavm', 'sandbox', 'fast')
+
+
+def creator_account(backend: str, server: Optional[ServeClient] = None) -> Dict[str, str]:
+    """The funded account to deploy the contract from: the KAVM server's, the sandbox wallet's first, or a new one"""
+    if server is not None:
+        # the server's ledger is reset for the session, with its own account funded
+        return server.start_session()
+    elif backend == 'sandbox':
+        creator_addr, creator_private_key = get_accounts(limit=1)[0]
+        return {'address': creator_addr, 'private_key': creator_private_key}
+    else:
+        creator_private_key, creator_addr = generate_account()
+        return {'address': str(creator_addr), 'private_key': creator_private_key}
+
+
+def create_algod(
+    backend: str, creator: Dict[str, str], server: Optional[ServeClient] = None
+) -> AlgodClient | KAVMClient:
+    """An algod client for the backend, whose in-process ledgers fund `creator`"""
+    if server is not None:
+        return RemoteKAVMClient(server)
+    elif backend == 'sandbox':
+        return AlgodClient("a" * 64, "http://localhost:4001")
+    elif backend == 'fast':
+        return FastAVMClient(faucet_address=creator['address'])
+    else:
+        with phase('kavm-init'):
+            return KAVMClient(faucet_address=creator['address'], log_level=logging.ERROR)
+
+
+class SimulationEngine:
+    '''
+    Deploys a contract on a backend and runs method sequences on it, in this process and without pytest
+
+    The backend, the creator account and the `ContractClient` are set up once, as the `conftest.py` fixtures do,
+    and sequences run from the creator account. `results` yields a `CallResult` for every call as its group
+    is confirmed, `run` streams them to a file as `simulate --output` does. With the KAVM and fast AVM backends,
+    `reset` rolls the ledger back to right after the deployment, between independent sequences.
+    '''
+
+    def __init__(
+        self, pyteal_code_module_str: str, backend: str = 'kavm', server_socket: Optional[Path] = None
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f'Unknown backend {backend}, expected one of: {", ".join(BACKENDS)}')
+        self.backend = backend
+        self.server = ServeClient.connect(server_socket) if server_socket is not None and backend == 'kavm' else None
+        try:
+            self.creator = creator_account(backend, self.server)
+            self.algod = create_algod(backend, self.creator, self.server)
+            with phase('deploy'):
+                self.client = ContractClient(
+                    self.algod, self.creator['address'], self.creator['private_key'], pyteal_code_module_str
+                )
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> 'SimulationEngine':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+    def results(self, calls: Union[str, Iterable[MethodCall]]) -> Iterator[CallResult]:
+        """Run a method sequence, given as calls or as text like `mint(10000) burn(20000)`"""
+        return call_results(self.client, self.creator['address'], self.creator['private_key'], _calls(calls))
+
+    def run(self, calls: Union[str, Iterable[MethodCall]], output: Optional[TextIO] = None) -> SequenceSummary:
+        """Run a method sequence, writing the result of every call to `output`, see `run_calls`"""
+        return run_calls(self.client, self.creator['address'], self.creator['private_key'], _calls(calls), output)
+
+    def reset(self) -> None:
+        self.client.reset()
+
+
+def _calls(calls: Union[str, Iterable[MethodCall]]) -> Iterable[MethodCall]:
+    return read_calls(calls.splitlines()) if isinstance(calls, str) else calls
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Final, List, Optional, Tuple
+
+from algosdk.account import generate_account
+
+from kcoin_vault.async_client import AsyncContractClient, PooledAlgodClient
+from kcoin_vault.client import ContractClient
+from kcoin_vault.sandbox import get_accounts
+from kcoin_vault.stats import ThroughputStats
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+Account = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class LoadConfig:
+    n_accounts: int = 10
+    # target rate of mint and burn calls per second, across all accounts
+    rate: float = 10.0
+    duration: float = 30.0
+    # fraction of calls that are mints; a burn turns into a mint while the account has too few K Coins
+    mint_ratio: float = 0.5
+    min_amount: int = 10000
+    max_amount: int = 20000
+    # microalgos paid to every generated account
+    fund_amount: int = 10**7
+    max_in_flight: int = 32
+    seed: Optional[int] = None
+
+
+def create_accounts(
+    backend: str, client: ContractClient, creator: Account, n_accounts: int, fund_amount: int
+) -> List[Account]:
+    """
+    Create funded accounts, opted into the vault's asset
+
+    On the sandbox, the funded accounts of the default KMD wallet are used first.
+    Any further accounts are generated and funded by the creator.
+    """
+    accounts: List[Account] = []
+    if backend == 'sandbox':
+        accounts = [account for account in get_accounts(limit=n_accounts + 1) if account[0] != creator[0]][:n_accounts]
+    generated = [generate_account() for _ in range(n_accounts - len(accounts))]
+    generated_accounts = [(addr, pk) for pk, addr in generated]
+    if generated_accounts:
+        _LOGGER.info(f'Funding {len(generated_accounts)} generated accounts')
+        client.fund_accounts(creator[0], creator[1], [addr for addr, _ in generated_accounts], fund_amount)
+    accounts += generated_accounts
+    _LOGGER.info(f'Opting {len(accounts)} accounts into asset {client.asset_id}')
+    client.opt_in(accounts)
+    return accounts
+
+
+class LoadGenerator:
+    '''
+    Drives a random mix of mint and burn calls, spread over many accounts, at a target rate
+
+    Calls are scheduled open-loop, every 1 / `rate` seconds regardless of how long earlier calls take,
+    and statistics are kept per method. Every account's K Coin balance is tracked,
+    so that burns never exceed what the account has minted.
+    '''
+
+    def __init__(self, client: ContractClient, accounts: List[Account], config: LoadConfig) -> None:
+        self.client = client
+        self.accounts = accounts
+        self.config = config
+        self.stats = {'mint': ThroughputStats(), 'burn': ThroughputStats()}
+        self._balances = {addr: 0 for addr, _ in accounts}
+        self._random = random.Random(config.seed)
+
+    def run(self) -> Dict[str, Any]:
+        """Submit calls one at a time, for backends that execute transactions in-process, like KAVM"""
+        self._start()
+        start = time.perf_counter()
+        i = 0
+        while time.perf_counter() - start < self.config.duration:
+            delay = start + i / self.config.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            method, (addr, pk), amount = self._next_call(i)
+            call = self.client.call_mint if method == 'mint' else self.client.call_burn
+            call_start = time.perf_counter()
+            try:
+                output = call(addr, pk, amount)
+            except Exception as err:
+                self._failed(method, addr, amount, err)
+            else:
+                self._succeeded(method, addr, output, time.perf_counter() - call_start)
+            i += 1
+        return self._stop()
+
+    async def run_async(self, async_client: AsyncContractClient) -> Dict[str, Any]:
+        """Submit calls concurrently, for backends reached over the network, like the sandbox"""
+        self._start()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        calls = []
+        i = 0
+        while loop.time() - start < self.config.duration:
+            delay = start + i / self.config.rate - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            calls.append(asyncio.create_task(self._call_async(async_client, *self._next_call(i))))
+            i += 1
+        await asyncio.gather(*calls)
+        return self._stop()
+
+    async def _call_async(self, async_client: AsyncContractClient, method: str, account: Account, amount: int) -> None:
+        addr, pk = account
+        call = async_client.mint if method == 'mint' else async_client.burn
+        call_start = time.perf_counter()
+        try:
+            output = await call(addr, pk, amount)
+        except Exception as err:
+            self._failed(method, addr, amount, err)
+        else:
+            self._succeeded(method, addr, output, time.perf_counter() - call_start)
+
+    def _next_call(self, i: int) -> Tuple[str, Account, int]:
+        account = self.accounts[i % len(self.accounts)]
+        balance = self._balances[account[0]]
+        if self._random.random() >= self.config.mint_ratio and balance >= self.config.min_amount:
+            amount = self._random.randint(self.config.min_amount, min(balance, self.config.max_amount))
+            # reserve the K Coins now, so that concurrent burns do not overdraw the account
+            self._balances[account[0]] -= amount
+            return 'burn', account, amount
+        return 'mint', account, self._random.randint(self.config.min_amount, self.config.max_amount)
+
+    def _succeeded(self, method: str, addr: str, output: int, latency: float) -> None:
+        if method == 'mint':
+            self._balances[addr] += output
+        self.stats[method].record(latency, 2)
+
+    def _failed(self, method: str, addr: str, amount: int, err: Exception) -> None:
+        if method == 'burn':
+            self._balances[addr] += amount
+        _LOGGER.debug(f'{method}({amount}) from {addr} failed: {err}')
+        self.stats[method].record_failure(type(err).__name__)
+
+    def _start(self) -> None:
+        for stats in self.stats.values():
+            stats.start()
+
+    def _stop(self) -> Dict[str, Any]:
+        for stats in self.stats.values():
+            stats.stop()
+        return {method: stats.summary() for method, stats in self.stats.items()}
+
+
+def run_load(backend: str, client: ContractClient, creator: Account, config: LoadConfig) -> Dict[str, Any]:
+    """Create the accounts and drive the load, returning a report of the configuration and per-method statistics"""
+    accounts = create_accounts(backend, client, creator, config.n_accounts, config.fund_amount)
+    generator = LoadGenerator(client, accounts, config)
+    _LOGGER.info(
+        f'Driving {config.rate} calls/s from {len(accounts)} accounts for {config.duration}s on the {backend} backend'
+    )
+    if backend == 'sandbox':
+        results = asyncio.run(_run_async(generator, client, config))
+    else:
+        results = generator.run()
+    return {'backend': backend, 'config': asdict(config), 'methods': results}
+
+
+async def _run_async(generator: LoadGenerator, client: ContractClient, config: LoadConfig) -> Dict[str, Any]:
+    algod = PooledAlgodClient(pool_size=config.max_in_flight)
+    async with AsyncContractClient(client, algod, max_in_flight=config.max_in_flight) as async_client:
+        return await generator.run_async(async_client)
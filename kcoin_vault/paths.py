@@ -0,0 +1,26 @@
+from pathlib import Path
+from typing import Final
+
+# Everything the commands keep between runs lives under .kavm in the current directory.
+# These are kept apart from the modules that use them, so that the command line can be parsed without importing them.
+
+TEAL_CACHE_DIR: Final = Path('.kavm') / 'teal-cache'
+PROOF_CACHE_DIR: Final = Path('.kavm') / 'proof-cache'
+PROFILE_DIR: Final = Path('.kavm') / 'profile'
+
+# Socket and authentication key of the `kavm-demo serve` server of the current directory
+SERVE_SOCKET: Final = Path('.kavm') / 'serve.sock'
+SERVE_KEY: Final = Path('.kavm') / 'serve.key'
+
+# Hypothesis example database of the failing examples found on the fast AVM, to be re-checked on KAVM
+FAST_EXAMPLES_DIR: Final = Path('.kavm') / 'fast-examples'
+
+# Results of the benchmarks/ scripts, one JSON record per run, to compare runs across changes
+BENCHMARK_DIR: Final = Path('.kavm') / 'benchmarks'
+
+# Progress samples of the running proofs, and the per-method statistics of the last `verify` run
+PROOF_PROGRESS: Final = Path('.kavm') / 'verify' / 'progress.jsonl'
+PROOF_STATS: Final = Path('.kavm') / 'verify' / 'stats.json'
+
+# Default number of examples per property test, of both `kavm-demo test` and a plain pytest run
+N_TESTS: Final = 25
@@ -0,0 +1,145 @@
+import contextlib
+import cProfile
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Final, Iterator, List, Optional, Tuple
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_NO_PHASE: Final = contextlib.nullcontext()
+
+
+@dataclass
+class PhaseStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def add(self, seconds: float, count: int = 1, longest: Optional[float] = None) -> None:
+        self.count += count
+        self.total += seconds
+        self.max = max(self.max, longest if longest is not None else seconds)
+
+
+class Profiler:
+    '''
+    Wall-clock time spent in the named phases of a run, e.g. PyTeal compilation, deployment or proving
+
+    Phases nest: a phase entered inside another one is recorded under the path of both, e.g. `deploy/execute`.
+    While disabled, `phase` costs a single attribute check, so instrumented code can stay on hot paths.
+    Optionally, the whole run is also profiled function by function with cProfile.
+    '''
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._phases: Dict[Tuple[str, ...], PhaseStats] = defaultdict(PhaseStats)
+        self._stack: List[str] = []
+        self._started_at: Optional[float] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def enable(self, cprofile: bool = False) -> None:
+        self.enabled = True
+        self._started_at = time.perf_counter()
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+    def phase(self, name: str) -> ContextManager[None]:
+        if not self.enabled:
+            return _NO_PHASE
+        return self._phase(name)
+
+    @contextlib.contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        self._stack.append(name)
+        path = tuple(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases[path].add(time.perf_counter() - start)
+            self._stack.pop()
+
+    def add(self, name: str, seconds: float, count: int = 1, longest: Optional[float] = None) -> None:
+        """Record time spent in a phase measured elsewhere, e.g. in a worker process"""
+        if self.enabled:
+            self._phases[(*self._stack, *name.split('/'))].add(seconds, count, longest)
+
+    def merge(self, report: Dict[str, Any], prefix: str) -> None:
+        """Add the phases of a report written by another process, under a phase `prefix` spanning its run"""
+        self.add(prefix, report['wall_s'])
+        for name, stats in report['phases'].items():
+            self.add(f'{prefix}/{name}', stats['total_s'], stats['count'], stats['max_s'])
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Total, mean and maximum time of every phase, by path
+
+        A phase's time includes the phases nested in it; `self_s` is the part spent outside of them.
+        Phases that ran in parallel, e.g. proofs in worker processes, can add up to more than their parent.
+        """
+        wall = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+        phases = {}
+        for path, stats in sorted(self._phases.items()):
+            nested = sum(other.total for other_path, other in self._phases.items() if other_path[:-1] == path)
+            phases['/'.join(path)] = {
+                'count': stats.count,
+                'total_s': stats.total,
+                'self_s': max(0.0, stats.total - nested),
+                'mean_s': stats.total / stats.count,
+                'max_s': stats.max,
+            }
+        return {'wall_s': wall, 'phases': phases}
+
+    def folded_stacks(self) -> List[str]:
+        """Phase self times in microseconds, in the collapsed stack format read by flamegraph.pl and speedscope"""
+        return [
+            f'{name.replace("/", ";")} {round(stats["self_s"] * 1e6)}'
+            for name, stats in self.report()['phases'].items()
+            if stats['self_s'] > 0
+        ]
+
+    def write(self, directory: Path, name: str) -> Path:
+        """
+        Write the report to `<name>.json`, the phases as folded stacks to `<name>.folded`
+        and, if cProfile was on, its statistics to `<name>.prof`, returning the report's path
+        """
+        self.disable()
+        directory.mkdir(parents=True, exist_ok=True)
+        report = self.report()
+        report_file = directory / f'{name}.json'
+        report_file.write_text(json.dumps(report, indent=2))
+        (directory / f'{name}.folded').write_text(''.join(f'{line}\n' for line in self.folded_stacks()))
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(directory / f'{name}.prof')
+        self._log(report)
+        _LOGGER.info(f'Wrote profile to {report_file}')
+        return report_file
+
+    @staticmethod
+    def _log(report: Dict[str, Any]) -> None:
+        width = max((len(name) for name in report['phases']), default=0)
+        lines = [
+            f'{name:<{width}}  {stats["count"]:6d}x  {stats["total_s"]:9.3f}s total  {stats["self_s"]:9.3f}s self'
+            for name, stats in report['phases'].items()
+        ]
+        lines.append(f'{"wall":<{width}}  {"":7}  {report["wall_s"]:9.3f}s')
+        _LOGGER.info('Profile:\n' + '\n'.join(lines))
+
+
+# The profiler of this process, enabled by the --profile option
+PROFILER: Final = Profiler()
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Time a block of code as phase `name` of the process-wide profiler, if it is enabled"""
+    return PROFILER.phase(name)
@@ -0,0 +1,268 @@
+import functools
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Final, List, Optional, TextIO, Tuple
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# Executables of the K prover, by what their CPU time is accounted as
+SMT_SOLVERS: Final = ('z3', 'cvc4', 'cvc5')
+REWRITERS: Final = ('kore-exec', 'kore-rpc', 'kore-rpc-booster')
+
+# kore-exec logs an entry per rewrite step, listing the source locations of the rules it applied.
+# Several rules applying to one configuration split the execution into as many branches.
+_KORE_LOG_ENTRIES: Final = 'DebugAppliedRewriteRules'
+_RULE_LOCATION_RE: Final = re.compile(r'\.k:\d+:\d+')
+
+# Processes are sampled more often than progress is reported, to account for the CPU time of short-lived ones
+SAMPLE_INTERVAL: Final = 1.0
+
+
+@dataclass(frozen=True)
+class ProofProgress:
+    '''
+    A sample of a running proof
+
+    `steps` and `branches` are the rewrite steps taken and the execution paths the search space has split into,
+    as logged by kore-exec, or None if it logged nothing. The CPU times are those of the prover's processes,
+    rewriting being the haskell backend's, SMT the solvers' it starts, and other the rest, e.g. the K frontend's.
+    '''
+
+    method: str
+    elapsed_s: float
+    steps: Optional[int]
+    branches: Optional[int]
+    rewrite_s: float
+    smt_s: float
+    other_s: float
+    processes: int
+    rss_mb: float
+
+    def __str__(self) -> str:
+        search = f'{self.steps} steps, {self.branches} branches, ' if self.steps is not None else ''
+        return (
+            f'Proving {self.method}: {self.elapsed_s:.0f}s, {search}rewriting {self.rewrite_s:.1f}s, '
+            f'SMT {self.smt_s:.1f}s, {self.processes} processes using {self.rss_mb:.0f}MB'
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def _proc_units() -> Optional[Tuple[int, int]]:
+    """The clock ticks per second and the page size of /proc/<pid>/stat, or None if there is no /proc to read"""
+    if not hasattr(os, 'sysconf') or not os.path.isdir('/proc'):
+        return None
+    try:
+        return os.sysconf('SC_CLK_TCK'), os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def _read_stat(pid: str, clock_ticks: int, page_size: int) -> Optional[Tuple[int, str, float, int]]:
+    """The parent, executable name, CPU seconds and resident bytes of a process, from /proc/<pid>/stat"""
+    try:
+        stat = Path('/proc', pid, 'stat').read_text()
+    except OSError:
+        # the process exited
+        return None
+    # the executable name is in parentheses and may itself contain spaces or parentheses
+    comm, _, rest = stat.partition('(')[2].rpartition(') ')
+    fields = rest.split()
+    return int(fields[1]), comm, (int(fields[11]) + int(fields[12])) / clock_ticks, int(fields[21]) * page_size
+
+
+def descendant_processes(root: int) -> Dict[int, Tuple[str, float, int]]:
+    '''
+    The executable name, CPU seconds and resident bytes of every process descending from `root`
+
+    Without a readable /proc, e.g. on macOS, no process is found.
+    '''
+    units = _proc_units()
+    if units is None:
+        return {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError as err:
+        _LOGGER.debug(f'Cannot list the processes: {err}')
+        return {}
+    stats = {}
+    children: Dict[int, List[int]] = {}
+    for entry in entries:
+        if entry.isdigit():
+            stat = _read_stat(entry, *units)
+            if stat is not None:
+                ppid, comm, cpu, rss = stat
+                stats[int(entry)] = (comm, cpu, rss)
+                children.setdefault(ppid, []).append(int(entry))
+    descendants = {}
+    pending = list(children.get(root, []))
+    while pending:
+        pid = pending.pop()
+        descendants[pid] = stats[pid]
+        pending.extend(children.get(pid, []))
+    return descendants
+
+
+class KoreLog:
+    """Follows the log kore-exec appends to, counting rewrite steps and branches"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.steps = 0
+        self.branches = 1
+        self._file: Optional[TextIO] = None
+        self._partial = ''
+
+    def update(self) -> None:
+        if self._file is None:
+            if not self.path.exists():
+                return
+            self._file = self.path.open()
+        lines = (self._partial + self._file.read()).split('\n')
+        # the last line may still be being written
+        self._partial = lines.pop()
+        for line in lines:
+            if _KORE_LOG_ENTRIES in line:
+                self.steps += 1
+                self.branches += max(0, len(_RULE_LOCATION_RE.findall(line)) - 1)
+
+    @property
+    def started(self) -> bool:
+        return self._file is not None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ProofMonitor:
+    '''
+    Streams the progress of a proof running in this process, every `interval` seconds
+
+    While the monitor is entered, a background thread samples the CPU time of the processes the prover starts,
+    from /proc where there is one. With `kore_log`, kore-exec is also told through `KORE_EXEC_OPTS`
+    to log its rewrite steps, which the thread counts: the variable is process-wide, and the logging options
+    must be ones the installed kore-exec accepts, so this is opt-in.
+    Processes that exit between two samples are accounted for as other CPU time, with the children times
+    of this process, which is why a monitored proof must be the only one running in its process.
+    Every `interval`, a sample is logged, and appended as a JSON record to `events` if given, so that it can be followed
+    with `tail -f` while proofs run in other processes. The last sample is the proof's statistics.
+    '''
+
+    def __init__(
+        self, method: str, interval: float = 10.0, events: Optional[Path] = None, kore_log: bool = False
+    ) -> None:
+        self.method = method
+        self.interval = interval
+        self.events = events
+        self.kore_log = kore_log
+        self.last: Optional[ProofProgress] = None
+        self.peak_rss_mb = 0.0
+        # CPU time of every process seen, so that processes that exited are still accounted for
+        self._cpu: Dict[int, Tuple[str, float]] = {}
+        self._started_at = time.perf_counter()
+        self._reported_at = self._started_at
+        self._children_cpu = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'proof-monitor-{method}', daemon=True)
+        self._log_dir = tempfile.TemporaryDirectory(prefix='kore-log-')
+        self._log = KoreLog(Path(self._log_dir.name) / 'kore-exec.log')
+        self._kore_exec_opts: Optional[str] = None
+
+    def __enter__(self) -> 'ProofMonitor':
+        if self.kore_log:
+            self._kore_exec_opts = os.environ.get('KORE_EXEC_OPTS')
+            os.environ['KORE_EXEC_OPTS'] = ' '.join(
+                [
+                    *([self._kore_exec_opts] if self._kore_exec_opts else []),
+                    f'--log {self._log.path} --log-format oneline --log-entries {_KORE_LOG_ENTRIES}',
+                ]
+            )
+        self._started_at = self._reported_at = time.perf_counter()
+        self._children_cpu = _children_cpu()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stopped.set()
+        self._thread.join()
+        if self.kore_log:
+            if self._kore_exec_opts is None:
+                os.environ.pop('KORE_EXEC_OPTS', None)
+            else:
+                os.environ['KORE_EXEC_OPTS'] = self._kore_exec_opts
+        try:
+            self._record(self.sample(), final=True)
+        except Exception as err:
+            # like the samples taken while it ran, the statistics of the proof are best effort
+            _LOGGER.debug(f'Could not sample the end of the proof of {self.method}: {err}')
+        finally:
+            self._log.close()
+            self._log_dir.cleanup()
+
+    def sample(self) -> ProofProgress:
+        processes = descendant_processes(os.getpid())
+        for pid, (comm, cpu, _) in processes.items():
+            self._cpu[pid] = (comm, cpu)
+        cpu_by_kind = {'rewrite': 0.0, 'smt': 0.0, 'other': 0.0}
+        for comm, cpu in self._cpu.values():
+            kind = 'smt' if comm in SMT_SOLVERS else 'rewrite' if comm in REWRITERS else 'other'
+            cpu_by_kind[kind] += cpu
+        # processes that exited were waited for, by this process or by ones that exited since
+        untracked = _children_cpu() - self._children_cpu + sum(cpu for _, cpu, _ in processes.values())
+        cpu_by_kind['other'] += max(0.0, untracked - sum(cpu_by_kind.values()))
+        rss_mb = sum(rss for _, _, rss in processes.values()) / 2**20
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        self._log.update()
+        return ProofProgress(
+            method=self.method,
+            elapsed_s=time.perf_counter() - self._started_at,
+            steps=self._log.steps if self._log.started else None,
+            branches=self._log.branches if self._log.started else None,
+            rewrite_s=cpu_by_kind['rewrite'],
+            smt_s=cpu_by_kind['smt'],
+            other_s=cpu_by_kind['other'],
+            processes=len(processes),
+            rss_mb=rss_mb,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """The search-space and resource statistics of the proof, once it is done"""
+        if self.last is None:
+            return {}
+        stats = asdict(self.last)
+        del stats['method'], stats['elapsed_s'], stats['processes'], stats['rss_mb']
+        stats['peak_rss_mb'] = self.peak_rss_mb
+        return stats
+
+    def _run(self) -> None:
+        while not self._stopped.wait(min(self.interval, SAMPLE_INTERVAL)):
+            try:
+                progress = self.sample()
+                if time.perf_counter() - self._reported_at >= self.interval:
+                    self._reported_at = time.perf_counter()
+                    self._record(progress)
+            except Exception as err:
+                # progress is best effort, the proof goes on without it
+                _LOGGER.debug(f'Could not sample the proof of {self.method}: {err}')
+
+    def _record(self, progress: ProofProgress, final: bool = False) -> None:
+        self.last = progress
+        if not final:
+            # the outcome of the proof is logged by the caller
+            _LOGGER.info(progress)
+        if self.events is not None:
+            with self.events.open('a') as f:
+                f.write(json.dumps({'time': time.time(), **asdict(progress), 'final': final}) + '\n')
+
+
+def _children_cpu() -> float:
+    times = os.times()
+    return times.children_user + times.children_system
@@ -0,0 +1,102 @@
+import logging
+import os
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection
+from pathlib import Path
+from typing import Any, Dict, Final, Optional
+
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from kcoin_vault.paths import SERVE_KEY, SERVE_SOCKET
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class ServerError(Exception):
+    pass
+
+
+class ServeClient:
+    '''
+    A connection to a `kavm-demo serve` server
+
+    The server handles one connection at a time, so holding a connection gives exclusive use of its KAVM ledger.
+    '''
+
+    def __init__(self, conn: Connection) -> None:
+        self._conn = conn
+
+    @staticmethod
+    def connect(socket_path: Path = SERVE_SOCKET) -> 'ServeClient':
+        key_path = socket_path.with_name(SERVE_KEY.name)
+        return ServeClient(Client(str(socket_path), family='AF_UNIX', authkey=key_path.read_bytes()))
+
+    def call(self, op: str, **kwargs: Any) -> Any:
+        self._conn.send((op, kwargs))
+        status, *payload = self._conn.recv()
+        if status == 'algod-error':
+            msg, code = payload
+            raise AlgodHTTPError(msg, code)
+        if status == 'error':
+            raise ServerError(payload[0])
+        return payload[0]
+
+    def start_session(self) -> Dict[str, str]:
+        """Reset the server's ledger to its initial state, returning the funded account it was created with"""
+        return self.call('session')
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def connect_server(socket_path: Path = SERVE_SOCKET) -> Optional[ServeClient]:
+    """Connect to the server of the current directory, or return None if none is running"""
+    if not socket_path.exists():
+        return None
+    try:
+        client = ServeClient.connect(socket_path)
+        client.call('ping')
+    except (OSError, EOFError) as err:
+        _LOGGER.debug(f'No KAVM server at {socket_path}: {err}')
+        return None
+    except AuthenticationError as err:
+        # the key was replaced since the server started, e.g. by a second server that then failed to start
+        key_path = socket_path.with_name(SERVE_KEY.name)
+        _LOGGER.warning(
+            f'The KAVM server at {socket_path} rejected the key in {key_path} ({err}), loading KAVM in this process. '
+            f'Stop the server with `kavm-demo serve --stop`, or if that fails, stop its process and delete {key_path}'
+        )
+        return None
+    _LOGGER.info(f'Using the KAVM server at {socket_path}')
+    return client
+
+
+class RemoteKAVMClient(AlgodClient):
+    '''
+    An algod client for the KAVM ledger of a `kavm-demo serve` server
+
+    Every algod request is forwarded to the server's `KAVMClient`, so this client behaves like one,
+    without loading the KAVM definition in this process.
+    '''
+
+    def __init__(self, server: ServeClient) -> None:
+        super().__init__('', f'kavm-serve://{os.getcwd()}')
+        self.server = server
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format='json'):
+        return self.server.call(
+            'algod',
+            method=method,
+            requrl=requrl,
+            params=params,
+            data=data,
+            headers=headers,
+            response_format=response_format,
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'snapshot_id': self.server.call('snapshot')}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        self.server.call('restore', snapshot_id=snapshot['snapshot_id'])
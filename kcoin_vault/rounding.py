@@ -0,0 +1,209 @@
+import csv
+import logging
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Dict, Final, List, Optional, TextIO
+
+from pyteal import App, AppField, BinaryExpr, Bytes, Expr, Int, NaryExpr, Op, SubroutineCall, Tmpl
+
+from kcoin_vault.client import import_pyteal_module
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# Placeholder for the argument of a conversion subroutine, bound to the array of inputs on evaluation
+_AMOUNT: Final = 'TMPL_AMOUNT'
+
+# Number of failing inputs to keep in a report, besides the ones written out
+N_KEPT_FAILURES: Final = 10
+
+
+@dataclass(frozen=True)
+class RoundingFailure:
+    '''
+    An input to mint whose round trip through burn is off by more than the tolerance
+
+    `minted` or `returned` is None when the mint or the burn is rejected, e.g. by a uint64 overflow.
+    '''
+
+    microalgos: int
+    minted: Optional[int]
+    returned: Optional[int]
+
+    @property
+    def error(self) -> Optional[int]:
+        return abs(self.returned - self.microalgos) if self.returned is not None else None
+
+
+@dataclass(frozen=True)
+class RoundingReport:
+    checked: int
+    failed: int
+    rejected: int
+    max_error: int
+    failures: List[RoundingFailure]
+    elapsed: float
+
+
+def _numpy() -> ModuleType:
+    try:
+        import numpy
+    except ImportError as err:
+        raise RuntimeError('Checking rounding needs NumPy, install it with: poetry install --extras rounding') from err
+    return numpy
+
+
+def conversion(module: ModuleType, name: str) -> Expr:
+    """The expression tree a uint64 subroutine of a PyTeal module computes, over a placeholder argument"""
+    subroutine = getattr(module, name).subroutine
+    return subroutine.implementation(Tmpl.Int(_AMOUNT))
+
+
+def evaluate(np: ModuleType, expr: Expr, amounts: Any, state: Dict[str, int], rejected: Any) -> Any:
+    '''
+    Evaluate a uint64 expression tree on a whole array of inputs at once
+
+    The elements the AVM would reject, on an overflow, an underflow or a division by zero, are flagged in `rejected`.
+    Only the expressions that make up conversion math are supported: constants, the argument,
+    global state reads, arithmetic and calls to other subroutines.
+    '''
+    if isinstance(expr, Tmpl) and expr.name == _AMOUNT:
+        return amounts
+    if isinstance(expr, Int):
+        return np.broadcast_to(np.uint64(expr.value), amounts.shape)
+    if isinstance(expr, App) and expr.field == AppField.globalGet:
+        # a missing key reads as zero
+        return np.broadcast_to(np.uint64(state.get(_state_key(expr.args[0]), 0)), amounts.shape)
+    if isinstance(expr, SubroutineCall):
+        return evaluate(np, expr.subroutine.implementation(*expr.args), amounts, state, rejected)
+    if isinstance(expr, (BinaryExpr, NaryExpr)) and expr.op in _ARITHMETIC:
+        operands = [expr.argLeft, expr.argRight] if isinstance(expr, BinaryExpr) else expr.args
+        values = [evaluate(np, operand, amounts, state, rejected) for operand in operands]
+        result = values[0]
+        for value in values[1:]:
+            result = _ARITHMETIC[expr.op](np, result, value, rejected)
+        return result
+    raise ValueError(f'Cannot evaluate expression in bulk: {expr}')
+
+
+def _state_key(key: Expr) -> str:
+    if not isinstance(key, Bytes) or key.base != 'utf8':
+        raise ValueError(f'Only global state keys given as UTF-8 byte strings are supported, got: {key}')
+    return key.byte_str[1:-1]
+
+
+def _add(np: ModuleType, left: Any, right: Any, rejected: Any) -> Any:
+    result = left + right
+    rejected |= result < left
+    return result
+
+
+def _minus(np: ModuleType, left: Any, right: Any, rejected: Any) -> Any:
+    rejected |= left < right
+    return left - right
+
+
+def _mul(np: ModuleType, left: Any, right: Any, rejected: Any) -> Any:
+    result = left * right
+    nonzero = left != 0
+    rejected |= nonzero & (result // np.where(nonzero, left, 1) != right)
+    return result
+
+
+def _div(np: ModuleType, left: Any, right: Any, rejected: Any) -> Any:
+    zero = right == 0
+    rejected |= zero
+    return left // np.where(zero, 1, right)
+
+
+def _mod(np: ModuleType, left: Any, right: Any, rejected: Any) -> Any:
+    zero = right == 0
+    rejected |= zero
+    return left % np.where(zero, 1, right)
+
+
+_ARITHMETIC: Final = {Op.add: _add, Op.minus: _minus, Op.mul: _mul, Op.div: _div, Op.mod: _mod}
+
+
+def check_round_trip(
+    pyteal_code_module: str,
+    min_microalgos: int,
+    max_microalgos: int,
+    tolerance: int = 1,
+    exchange_rate: Optional[int] = None,
+    chunk_size: int = 2**20,
+    failures_file: Optional[TextIO] = None,
+    to_asset: str = 'algos_to_kcoin',
+    to_algos: str = 'kcoin_to_algos',
+) -> RoundingReport:
+    '''
+    Check every amount of microalgos in a range for the rounding error of minting and burning it back
+
+    Rather than running the contract, the conversion subroutines are evaluated with NumPy, a chunk of inputs at a time.
+    The exchange rate defaults to the module's INITIAL_EXCHANGE_RATE, the one the vault starts with.
+    Every failing input is written to `failures_file` as CSV, if given.
+    '''
+    if not 0 <= min_microalgos <= max_microalgos:
+        raise ValueError(f'Invalid range of microalgos: {min_microalgos} to {max_microalgos}')
+    np = _numpy()
+    module = import_pyteal_module(pyteal_code_module)
+    if exchange_rate is None:
+        exchange_rate = module.INITIAL_EXCHANGE_RATE
+    state = {'exchange_rate': exchange_rate}
+    mint_expr = conversion(module, to_asset)
+    burn_expr = conversion(module, to_algos)
+
+    _LOGGER.info(
+        f'Checking the round trip of {to_asset} and {to_algos} on {max_microalgos - min_microalgos + 1} amounts '
+        f'from {min_microalgos} to {max_microalgos} microalgos, at exchange rate {exchange_rate}'
+    )
+    writer = csv.writer(failures_file) if failures_file is not None else None
+    if writer is not None:
+        writer.writerow(['microalgos', 'minted', 'returned', 'error'])
+    checked = failed = rejected = max_error = 0
+    kept: List[RoundingFailure] = []
+    start = time.perf_counter()
+    for low in range(min_microalgos, max_microalgos + 1, chunk_size):
+        amounts = np.arange(low, min(low + chunk_size, max_microalgos + 1), dtype=np.uint64)
+        mint_rejected = np.zeros(amounts.shape, dtype=bool)
+        minted = evaluate(np, mint_expr, amounts, state, mint_rejected)
+        burn_rejected = mint_rejected.copy()
+        returned = evaluate(np, burn_expr, minted, state, burn_rejected)
+        error = np.where(returned >= amounts, returned - amounts, amounts - returned)
+        failing = np.flatnonzero(burn_rejected | (error > tolerance))
+
+        checked += len(amounts)
+        failed += len(failing)
+        rejected += int(np.count_nonzero(burn_rejected))
+        completed = error[~burn_rejected]
+        if len(completed):
+            max_error = max(max_error, int(completed.max()))
+        if writer is None:
+            # without a file to write them to, only the failures kept in the report are needed
+            failing = failing[: N_KEPT_FAILURES - len(kept)]
+        rows = zip(
+            amounts[failing].tolist(),
+            minted[failing].tolist(),
+            returned[failing].tolist(),
+            mint_rejected[failing].tolist(),
+            burn_rejected[failing].tolist(),
+        )
+        for microalgos, minted_amount, returned_amount, mint_failed, burn_failed in rows:
+            failure = RoundingFailure(
+                microalgos,
+                None if mint_failed else minted_amount,
+                None if burn_failed else returned_amount,
+            )
+            if len(kept) < N_KEPT_FAILURES:
+                kept.append(failure)
+            if writer is not None:
+                writer.writerow([failure.microalgos, failure.minted, failure.returned, failure.error])
+
+    return RoundingReport(
+        checked=checked,
+        failed=failed,
+        rejected=rejected,
+        max_error=max_error,
+        failures=kept,
+        elapsed=time.perf_counter() - start,
+    )
@@ -1,3 +1,8 @@
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
 import algosdk
 
 KMD_ADDRESS = "http://localhost:4002"
@@ -6,27 +11,50 @@ KMD_TOKEN = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
 KMD_WALLET_NAME = "unencrypted-default-wallet"
 KMD_WALLET_PASSWORD = ""
 
+# Concurrent key exports from the wallet
+KMD_EXPORT_WORKERS = 8
 
-def get_accounts():
-    kmd = algosdk.kmd.KMDClient(KMD_TOKEN, KMD_ADDRESS)
-    wallets = kmd.list_wallets()
-
-    walletID = None
-    for wallet in wallets:
-        if wallet["name"] == KMD_WALLET_NAME:
-            walletID = wallet["id"]
-            break
+# The wallet's addresses, in KMD's order, and the keys exported so far, kept for the session
+_addresses: Optional[List[str]] = None
+_private_keys: Dict[str, str] = {}
+_lock = threading.Lock()
 
-    if walletID is None:
-        raise Exception("Wallet not found: {}".format(KMD_WALLET_NAME))
 
-    walletHandle = kmd.init_wallet_handle(walletID, KMD_WALLET_PASSWORD)
+@functools.lru_cache(maxsize=None)
+def kmd_client() -> algosdk.kmd.KMDClient:
+    return algosdk.kmd.KMDClient(KMD_TOKEN, KMD_ADDRESS)
 
-    try:
-        addresses = kmd.list_keys(walletHandle)
-        privateKeys = [kmd.export_key(walletHandle, KMD_WALLET_PASSWORD, addr) for addr in addresses]
-        kmdAccounts = [(addresses[i], privateKeys[i]) for i in range(len(privateKeys))]
-    finally:
-        kmd.release_wallet_handle(walletHandle)
 
-    return kmdAccounts
+@functools.lru_cache(maxsize=None)
+def _wallet_id() -> str:
+    for wallet in kmd_client().list_wallets():
+        if wallet["name"] == KMD_WALLET_NAME:
+            return wallet["id"]
+    raise Exception("Wallet not found: {}".format(KMD_WALLET_NAME))
+
+
+def get_accounts(limit: Optional[int] = None) -> List[Tuple[str, str]]:
+    '''
+    The `(address, private key)` accounts of the sandbox's default wallet, or only the first `limit` of them
+
+    Keys are exported concurrently, under a single wallet handle that is released once they all are,
+    and kept for the rest of the session, so that later calls only export keys they have not seen yet.
+    '''
+    global _addresses
+    with _lock:
+        if _addresses is not None and all(addr in _private_keys for addr in _addresses[:limit]):
+            return [(addr, _private_keys[addr]) for addr in _addresses[:limit]]
+
+        kmd = kmd_client()
+        handle = kmd.init_wallet_handle(_wallet_id(), KMD_WALLET_PASSWORD)
+        try:
+            if _addresses is None:
+                _addresses = kmd.list_keys(handle)
+            missing = [addr for addr in _addresses[:limit] if addr not in _private_keys]
+            with ThreadPoolExecutor(max_workers=KMD_EXPORT_WORKERS) as executor:
+                exported = executor.map(lambda addr: kmd.export_key(handle, KMD_WALLET_PASSWORD, addr), missing)
+                _private_keys.update(zip(missing, exported))
+        finally:
+            kmd.release_wallet_handle(handle)
+
+        return [(addr, _private_keys[addr]) for addr in _addresses[:limit]]
@@ -0,0 +1,210 @@
+import itertools
+import json
+import logging
+import re
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Final, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from kcoin_vault.client import MAX_GROUP_SIZE, ContractClient
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_CALL_RE: Final = re.compile(r'(\w+)\((.*)\)', re.DOTALL)
+
+# About one transaction group of calls, most calls being an app call plus the transaction passed as its argument
+CALLS_PER_GROUP: Final = MAX_GROUP_SIZE // 2
+
+
+@dataclass(frozen=True)
+class MethodCall:
+    method: str
+    args: Tuple[Any, ...]
+
+    def __str__(self) -> str:
+        return f'{self.method}({", ".join(json.dumps(arg) for arg in self.args)})'
+
+
+def parse_calls(line: str) -> List[MethodCall]:
+    '''
+    Parse a line of a method sequence
+
+    A line is either whitespace-separated calls like `mint(10000) burn(20000)`, with JSON values as arguments,
+    or a JSON record like `{"method": "mint", "args": [10000]}`. Blank lines and `#` comments have no calls.
+    The arguments are checked against the ABI of the method when the call is queued, see `MethodDispatcher`.
+    '''
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return []
+    if line.startswith('{'):
+        record = json.loads(line)
+        args = record['args'] if 'args' in record else [record['amount']]
+        return [MethodCall(str(record['method']), tuple(args))]
+    calls = []
+    for token in _split_calls(line):
+        match = _CALL_RE.fullmatch(token)
+        if match is None:
+            raise ValueError(f'Cannot parse method call: {token}')
+        calls.append(MethodCall(match.group(1), _parse_args(match.group(2))))
+    return calls
+
+
+def _split_calls(line: str) -> Iterator[str]:
+    """Split a line at the whitespace between calls, but not inside their argument lists"""
+    start: Optional[int] = None
+    depth = 0
+    quoted = escaped = False
+    for i, char in enumerate(line):
+        if quoted:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                quoted = False
+            continue
+        if char.isspace() and depth == 0:
+            if start is not None:
+                yield line[start:i]
+                start = None
+            continue
+        if start is None:
+            start = i
+        if char == '"':
+            quoted = True
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+    if start is not None:
+        yield line[start:]
+
+
+def _parse_args(text: str) -> Tuple[Any, ...]:
+    if not text.strip():
+        return ()
+    try:
+        return tuple(json.loads(f'[{text}]'))
+    except json.JSONDecodeError:
+        # bare words, e.g. addresses, are taken as strings
+        return tuple(_parse_value(arg.strip()) for arg in text.split(','))
+
+
+def _parse_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def read_calls(lines: Iterable[str]) -> Iterator[MethodCall]:
+    """Parse a method sequence lazily, line by line, e.g. as it is read from a file or a pipe"""
+    for line in lines:
+        yield from parse_calls(line)
+
+
+@contextmanager
+def open_sequence(path: Path) -> Iterator[Iterator[MethodCall]]:
+    """The calls of a method sequence file, or of the standard input if `path` is `-`"""
+    if str(path) == '-':
+        yield read_calls(sys.stdin)
+        return
+    with Path(path).open() as f:
+        yield read_calls(f)
+
+
+@dataclass(frozen=True)
+class CallResult:
+    index: int
+    call: MethodCall
+    # the return value, None for void methods and for rejected calls
+    output: Any = None
+    error: Optional[str] = None
+
+    @property
+    def failed(self) -> bool:
+        # a call fails if it is rejected or it returns zero, a void method returns None
+        return self.error is not None or (self.output is not None and not self.output)
+
+    def record(self) -> Dict[str, Any]:
+        record = {'index': self.index, 'method': self.call.method, 'args': list(self.call.args), 'output': self.output}
+        if self.error is not None:
+            record['error'] = self.error
+        return record
+
+    def __str__(self) -> str:
+        return f'{self.call} => {self.output if self.error is None else self.error}'
+
+
+@dataclass
+class SequenceSummary:
+    calls: int = 0
+    failed: int = 0
+
+
+def call_results(
+    client: ContractClient, sender_addr: str, sender_pk: str, calls: Iterable[MethodCall]
+) -> Iterator[CallResult]:
+    """
+    Run a method sequence group by group, yielding the result of every call once its group is confirmed
+
+    The calls are independent, as if each had its own group: a rejected call only fails itself,
+    see `CallBatch.execute_each`, and the sequence goes on with the next call.
+    """
+    calls = iter(calls)
+    index = 0
+    while True:
+        chunk = list(itertools.islice(calls, CALLS_PER_GROUP))
+        if not chunk:
+            return
+        batch = client.batch(sender_addr, sender_pk)
+        # a call that does not fit its method fails on its own, and is left out of the batch
+        invalid: Dict[int, str] = {}
+        for i, call in enumerate(chunk):
+            try:
+                batch.call(call.method, *call.args)
+            except ValueError as err:
+                invalid[i] = f'{type(err).__name__}: {err}'
+        outcomes = iter(batch.execute_each())
+        for i, call in enumerate(chunk):
+            output, error = (None, invalid[i]) if i in invalid else next(outcomes)
+            yield CallResult(index, call, output, error)
+            index += 1
+
+
+def run_calls(
+    client: ContractClient,
+    sender_addr: str,
+    sender_pk: str,
+    calls: Iterable[MethodCall],
+    output: Optional[TextIO] = None,
+) -> SequenceSummary:
+    '''
+    Run a method sequence, consuming it group by group
+
+    At most one transaction group worth of calls is held at a time, and the result of every call
+    is written to `output` as a JSON record once its group is confirmed, so sequences of any length
+    run in constant memory. Calls of any method of the app can be mixed.
+    A call fails if it returns zero or if it is rejected; it is logged as a warning,
+    and the sequence goes on with the next call.
+    '''
+    summary = SequenceSummary()
+    for result in call_results(client, sender_addr, sender_pk, calls):
+        summary.calls += 1
+        summary.failed += result.failed
+        if result.failed:
+            _LOGGER.warning(f'Call {result.index} failed: {result}')
+        elif output is not None:
+            _LOGGER.debug(result)
+        else:
+            _LOGGER.info(result)
+        if output is not None:
+            output.write(json.dumps(result.record()) + '\n')
+            # the last call of a group: the whole group is written
+            if result.index % CALLS_PER_GROUP == CALLS_PER_GROUP - 1:
+                output.flush()
+    if output is not None:
+        output.flush()
+    return summary
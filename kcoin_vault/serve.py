@@ -0,0 +1,119 @@
+import importlib
+import logging
+import os
+import sys
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Connection, Listener
+from pathlib import Path
+from typing import Any, Dict, Final, List
+
+from algosdk.account import generate_account
+from algosdk.error import AlgodHTTPError
+from kavm.algod import KAVMClient
+
+from kcoin_vault.client import copy_ledger
+from kcoin_vault.paths import SERVE_KEY, SERVE_SOCKET
+from kcoin_vault.remote import connect_server
+from kcoin_vault.verify import ProofResult, prove_methods
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class KAVMServer:
+    '''
+    A long-running process that keeps KAVM loaded for the `verify`, `test` and `simulate` commands
+
+    It holds a `KAVMClient`, whose ledger every test session starts from afresh, and proves methods
+    in worker processes forked from it, which inherit the already imported prover.
+    Connections are served one at a time, in the order they arrive.
+    '''
+
+    def __init__(self, socket_path: Path = SERVE_SOCKET) -> None:
+        self.socket_path = socket_path
+        private_key, address = generate_account()
+        self.faucet = {'address': str(address), 'private_key': private_key}
+        _LOGGER.info('Loading KAVM')
+        self.algod = KAVMClient(faucet_address=self.faucet['address'], log_level=logging.ERROR)
+        # proofs run in processes forked from the server, which inherit the prover imported here
+        importlib.import_module('kavm.prover')
+        self._initial_state = copy_ledger(vars(self.algod))
+        self._snapshots: List[Dict[str, Any]] = []
+        self._running = False
+
+    def serve(self) -> None:
+        if connect_server(self.socket_path) is not None:
+            raise RuntimeError(f'A KAVM server is already running at {self.socket_path}')
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        key_path = self.socket_path.with_name(SERVE_KEY.name)
+        key_path.unlink(missing_ok=True)
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(os.urandom(32))
+
+        self._running = True
+        try:
+            with Listener(str(self.socket_path), family='AF_UNIX', authkey=key_path.read_bytes()) as listener:
+                _LOGGER.info(f'KAVM server listening on {self.socket_path}')
+                while self._running:
+                    try:
+                        conn = listener.accept()
+                    except (OSError, EOFError, AuthenticationError) as err:
+                        _LOGGER.warning(f'Rejected connection: {err}')
+                        continue
+                    with conn:
+                        self._handle(conn)
+        finally:
+            self.socket_path.unlink(missing_ok=True)
+            key_path.unlink(missing_ok=True)
+
+    def _handle(self, conn: Connection) -> None:
+        while self._running:
+            try:
+                op, kwargs = conn.recv()
+            except EOFError:
+                break
+            _LOGGER.debug(f'Request {op}')
+            try:
+                response = ('ok', getattr(self, f'_op_{op.replace("-", "_")}')(**kwargs))
+            except AlgodHTTPError as err:
+                response = ('algod-error', str(err), err.code)
+            except Exception as err:
+                _LOGGER.exception(f'Request {op} failed')
+                response = ('error', f'{type(err).__name__}: {err}')
+            conn.send(response)
+        # snapshots refer to the ledger of the session
+        self._snapshots.clear()
+
+    def _op_ping(self) -> int:
+        return os.getpid()
+
+    def _op_shutdown(self) -> None:
+        _LOGGER.info('Shutting down')
+        self._running = False
+
+    def _op_session(self) -> Dict[str, str]:
+        self._restore(self._initial_state)
+        self._snapshots.clear()
+        return self.faucet
+
+    def _op_algod(self, method: str, requrl: str, **kwargs: Any) -> Any:
+        return self.algod.algod_request(method, requrl, **kwargs)
+
+    def _op_snapshot(self) -> int:
+        self._snapshots.append(copy_ledger(vars(self.algod)))
+        return len(self._snapshots) - 1
+
+    def _op_restore(self, snapshot_id: int) -> None:
+        self._restore(self._snapshots[snapshot_id])
+
+    def _op_prove(self, pyteal_code_module_str: str, **kwargs: Any) -> List[ProofResult]:
+        # the PyTeal module may have changed since the last proof, make the prover import it afresh
+        sys.modules.pop(pyteal_code_module_str, None)
+        importlib.invalidate_caches()
+        return prove_methods(pyteal_code_module_str, **kwargs)
+
+    def _restore(self, snapshot: Dict[str, Any]) -> None:
+        state = vars(self.algod)
+        state.clear()
+        state.update(copy_ledger(snapshot))
@@ -0,0 +1,102 @@
+import cmd
+import sys
+import time
+from typing import Any, Dict
+
+from kcoin_vault.engine import SimulationEngine
+from kcoin_vault.sequence import parse_calls
+
+
+class VaultShell(cmd.Cmd):
+    '''
+    An interactive session on one deployed vault
+
+    Lines of calls, e.g. `mint(10000) burn(20000)`, run on the engine's ledger, which persists from one line
+    to the next, so every command only pays for its own calls. The ledger can be rolled back to right after
+    the deployment with `reset`, or to a named `snapshot` with `restore`.
+    '''
+
+    intro = 'K Coin Vault shell. Type calls like mint(10000) burn(20000), or help for the commands.'
+    prompt = 'kcoin-vault> '
+
+    def __init__(self, engine: SimulationEngine, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.engine = engine
+        if not sys.stdin.isatty():
+            # commands are piped in, e.g. from a file: only print their results
+            self.intro = ''
+            self.prompt = ''
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+
+    def onecmd(self, line: str) -> bool:
+        try:
+            return super().onecmd(line)
+        except Exception as err:
+            # keep the session, and its ledger, alive
+            self._print(f'*** {type(err).__name__}: {err}')
+            return False
+
+    def emptyline(self) -> bool:
+        return False
+
+    def default(self, line: str) -> bool:
+        """Run the calls of the line"""
+        if line == 'EOF':
+            return self.do_quit('')
+        calls = parse_calls(line)
+        start = time.perf_counter()
+        for result in self.engine.results(calls):
+            self._print(str(result))
+        if calls:
+            self._print(f'({len(calls)} call{"s" if len(calls) > 1 else ""} in {time.perf_counter() - start:.3f}s)')
+        return False
+
+    def do_methods(self, arg: str) -> None:
+        """List the methods of the app and their arguments"""
+        for prepared in self.engine.client.dispatcher.methods.values():
+            self._print(prepared.signature())
+
+    def do_balance(self, arg: str) -> None:
+        """balance [address]: microalgos and K Coins of an account, the creator's by default"""
+        address = arg.strip() or self.engine.creator['address']
+        info = self.engine.algod.account_info(address)
+        kcoins = next(
+            (asset['amount'] for asset in info['assets'] if asset['asset-id'] == self.engine.client.asset_id), None
+        )
+        self._print(f'{address}: {info["amount"]} microalgos, {kcoins if kcoins is not None else "no"} K Coins')
+
+    def do_reset(self, arg: str) -> None:
+        """Roll the ledger back to right after the vault was deployed"""
+        if self._check_snapshots():
+            self.engine.reset()
+            self._print('Ledger reset')
+
+    def do_snapshot(self, arg: str) -> None:
+        """snapshot [name]: save the ledger under a name, to restore it later"""
+        if self._check_snapshots():
+            name = arg.strip() or str(len(self._snapshots))
+            self._snapshots[name] = self.engine.client.snapshot()
+            self._print(f'Saved snapshot {name}')
+
+    def do_restore(self, arg: str) -> None:
+        """restore name: roll the ledger back to a snapshot"""
+        name = arg.strip()
+        if name not in self._snapshots:
+            self._print(f'*** No snapshot {name!r}, saved: {", ".join(self._snapshots) or "none"}')
+        elif self._check_snapshots():
+            self.engine.client.restore(self._snapshots[name])
+            self._print(f'Restored snapshot {name}')
+
+    def do_quit(self, arg: str) -> bool:
+        """Leave the shell"""
+        return True
+
+    do_exit = do_quit
+
+    def _check_snapshots(self) -> bool:
+        if not self.engine.client.supports_snapshots:
+            self._print(f'*** Ledger snapshots need the KAVM or fast AVM backend, not {self.engine.backend}')
+        return self.engine.client.supports_snapshots
+
+    def _print(self, text: str) -> None:
+        self.stdout.write(text + '\n')
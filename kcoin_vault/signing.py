@@ -0,0 +1,107 @@
+import base64
+import functools
+import itertools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Final, List, Optional, Sequence, Tuple
+
+from algosdk import constants, encoding
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    AtomicTransactionComposerStatus,
+)
+from algosdk.future import transaction
+from nacl.signing import SigningKey
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class BulkSigner:
+    '''
+    Signs many transactions at once, fanning ed25519 signing out across a pool of worker processes
+
+    Transactions are encoded in this process and sent to the workers in chunks, as the bytes to sign together
+    with the seed of their key, and their signatures come back in order. Workers keep the keys they derive,
+    as the same accounts sign over and over. Fewer than `min_parallel` transactions are signed in this process,
+    where a round-trip to the pool would cost more than it saves.
+    The pool is started on first use, from fresh interpreters, so that it does not inherit a loaded KAVM.
+    '''
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 256, min_parallel: int = 512) -> None:
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.min_parallel = min_parallel
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'BulkSigner':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def sign(self, txns: Sequence[Tuple[transaction.Transaction, str]]) -> List[transaction.SignedTransaction]:
+        """Sign `(transaction, private key)` pairs, returning the signed transactions in the same order"""
+        items = [
+            (
+                base64.b64decode(private_key)[: constants.key_len_bytes],
+                constants.txid_prefix + base64.b64decode(encoding.msgpack_encode(txn)),
+            )
+            for txn, private_key in txns
+        ]
+        if len(items) < self.min_parallel:
+            signatures = _sign_chunk(items)
+        else:
+            remaining = iter(items)
+            chunks = iter(lambda: list(itertools.islice(remaining, self.chunk_size)), [])
+            signatures = list(itertools.chain.from_iterable(self._executor().map(_sign_chunk, chunks)))
+        return [
+            transaction.SignedTransaction(txn, base64.b64encode(signature).decode())
+            for (txn, _), signature in zip(txns, signatures)
+        ]
+
+    def sign_composers(self, comps: Sequence[AtomicTransactionComposer]) -> None:
+        '''
+        Sign the groups of many composers at once
+
+        Every composer is left signed, so that executing it submits the signatures made here.
+        Composers with transactions that an `AccountTransactionSigner` does not sign, e.g. logic signatures,
+        are left to sign themselves when they are executed.
+        '''
+        pending = []
+        txns: List[Tuple[transaction.Transaction, str]] = []
+        for comp in comps:
+            if comp.status >= AtomicTransactionComposerStatus.SIGNED:
+                continue
+            group = comp.build_group()
+            if not all(isinstance(txn.signer, AccountTransactionSigner) for txn in group):
+                continue
+            pending.append((comp, len(group)))
+            txns.extend((txn.txn, txn.signer.private_key) for txn in group)
+
+        signed_txns = iter(self.sign(txns))
+        for comp, n_txns in pending:
+            comp.signed_txns = list(itertools.islice(signed_txns, n_txns))
+            comp.status = AtomicTransactionComposerStatus.SIGNED
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+            _LOGGER.info(f'Started {self.max_workers or os.cpu_count()} signing processes')
+        return self._pool
+
+
+@functools.lru_cache(maxsize=4096)
+def _signing_key(seed: bytes) -> SigningKey:
+    return SigningKey(seed)
+
+
+def _sign_chunk(items: List[Tuple[bytes, bytes]]) -> List[bytes]:
+    return [_signing_key(seed).sign(to_sign).signature for seed, to_sign in items]
@@ -0,0 +1,84 @@
+import bisect
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Final, List, Optional, Sequence
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS: Final = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def percentile(values: Sequence[float], p: float) -> Optional[float]:
+    """The `p`-th percentile of `values` by the nearest-rank method, None if there are no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class ThroughputStats:
+    '''
+    Confirmation latencies and failures of submitted transaction groups
+
+    Throughput is counted in transactions, not groups, over the time between `start` and `stop`.
+    '''
+
+    latencies: List[float] = field(default_factory=list)
+    n_txns: int = 0
+    failures: Counter = field(default_factory=Counter)
+    started_at: Optional[float] = None
+    stopped_at: Optional[float] = None
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self.stopped_at = None
+
+    def stop(self) -> None:
+        self.stopped_at = time.perf_counter()
+
+    def record(self, latency: float, n_txns: int) -> None:
+        self.latencies.append(latency)
+        self.n_txns += n_txns
+
+    def record_failure(self, kind: str = 'error') -> None:
+        self.failures[kind] += 1
+
+    @property
+    def n_failures(self) -> int:
+        return sum(self.failures.values())
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        stopped_at = self.stopped_at if self.stopped_at is not None else time.perf_counter()
+        return stopped_at - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Confirmed transactions per second"""
+        return self.n_txns / self.elapsed if self.elapsed > 0 else 0.0
+
+    def histogram(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> Dict[str, int]:
+        """Number of latencies at most each bucket's bound, and above the last one"""
+        counts = [0] * (len(buckets) + 1)
+        for latency in self.latencies:
+            counts[bisect.bisect_left(buckets, latency)] += 1
+        labels = [f'<={bound}s' for bound in buckets] + [f'>{buckets[-1]}s']
+        return dict(zip(labels, counts))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'elapsed_s': self.elapsed,
+            'groups': len(self.latencies),
+            'txns': self.n_txns,
+            'failures': self.n_failures,
+            'failures_by_kind': dict(self.failures),
+            'throughput_tps': self.throughput,
+            'latency_s': {f'p{p}': percentile(self.latencies, p) for p in (50, 90, 99)}
+            | {'max': max(self.latencies, default=None)},
+            'latency_histogram': self.histogram(),
+        }
@@ -0,0 +1,97 @@
+import base64
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Final, List, Tuple
+
+import algosdk
+import msgpack
+from algosdk import constants, encoding, error
+from algosdk.abi import Method
+from algosdk.atomic_transaction_composer import ABI_RETURN_HASH, AccountTransactionSigner, AtomicTransactionComposer
+from algosdk.future import transaction
+from nacl.signing import SigningKey
+
+if TYPE_CHECKING:
+    from kcoin_vault.client import ContractClient
+
+# The field holding the amount of a transaction argument, by transaction type
+_AMOUNT_FIELDS: Final = {'pay': 'amt', 'axfer': 'aamt'}
+
+
+@dataclass(frozen=True)
+class SignedCall:
+    method: Method
+    # the signed transactions of the group, encoded and concatenated as `POST /transactions` takes them
+    raw: bytes
+    tx_ids: Tuple[str, ...]
+
+    @property
+    def tx_id(self) -> str:
+        """The id of the app call, the last transaction of the group"""
+        return self.tx_ids[-1]
+
+
+class CallTemplate:
+    '''
+    A call of a method taking a single payment or asset transfer, e.g. `mint` or `burn`, from one sender
+
+    The group of a call is built once, through `MethodDispatcher`, and kept as the canonical msgpack fields
+    of its transactions: method selector, foreign assets, app address, fees and genesis are all fixed.
+    `sign` only patches in the amount, the validity rounds and the note, recomputes the group id,
+    and signs both transactions with a signing key derived once.
+    '''
+
+    def __init__(
+        self, client: 'ContractClient', method: str, sender_addr: str, sender_pk: str, sp: transaction.SuggestedParams
+    ) -> None:
+        prepared = client.dispatcher.prepared(method)
+        arg_types = [str(arg.type) for arg in prepared.method.args]
+        if len(arg_types) != 1 or arg_types[0] not in _AMOUNT_FIELDS:
+            raise ValueError(f'{prepared.signature()} does not take a single payment or asset transfer')
+        self.method = prepared.method
+        self._amount_field = _AMOUNT_FIELDS[arg_types[0]]
+        self._signing_key = SigningKey(base64.b64decode(sender_pk)[: constants.key_len_bytes])
+
+        comp = AtomicTransactionComposer()
+        client.dispatcher.add_call(comp, sender_addr, AccountTransactionSigner(sender_pk), sp, method, [1])
+        self._skeleton: List[Dict[str, Any]] = []
+        for txn in comp.build_group():
+            fields = txn.txn.dictify()
+            fields.pop('grp')
+            self._skeleton.append(fields)
+
+    def sign(self, amount: int, sp: transaction.SuggestedParams, note: bytes) -> SignedCall:
+        patch = {'fv': sp.first, 'lv': sp.last, 'note': note}
+        arg_txn, app_txn = self._skeleton
+        txns = [{**arg_txn, **patch, self._amount_field: amount}, {**app_txn, **patch}]
+        tx_hashes = [encoding.checksum(constants.txid_prefix + _pack(_canonical(txn))) for txn in txns]
+        group_id = encoding.checksum(constants.tgid_prefix + _pack({'txlist': tx_hashes}))
+
+        raw = bytearray()
+        tx_ids = []
+        for txn in txns:
+            txn['grp'] = group_id
+            fields = _canonical(txn)
+            to_sign = constants.txid_prefix + _pack(fields)
+            tx_ids.append(base64.b32encode(encoding.checksum(to_sign)).decode().rstrip('='))
+            raw += _pack({'sig': self._signing_key.sign(to_sign).signature, 'txn': fields})
+        return SignedCall(self.method, bytes(raw), tuple(tx_ids))
+
+
+def _canonical(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Sort the fields of a transaction and omit the zero ones, as canonical msgpack requires"""
+    return {key: fields[key] for key in sorted(fields) if fields[key]}
+
+
+def _pack(fields: Dict[str, Any]) -> bytes:
+    return msgpack.packb(fields, use_bin_type=True)
+
+
+def abi_return(method: Method, tx_info: Dict[str, Any]) -> Any:
+    """Decode the return value of a method from the pending transaction info of its app call"""
+    if method.returns.type == algosdk.abi.Returns.VOID:
+        return None
+    logs = tx_info.get('logs', [])
+    result = base64.b64decode(logs[-1]) if logs else b''
+    if result[:4] != ABI_RETURN_HASH:
+        raise error.AtomicTransactionComposerError('app call transaction did not log a return value')
+    return method.returns.type.decode(result[4:])
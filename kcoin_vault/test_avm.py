@@ -0,0 +1,200 @@
+import base64
+from typing import List, Optional, Tuple
+
+import pytest
+from algosdk.account import generate_account
+from algosdk.error import AlgodHTTPError
+from algosdk.future import transaction
+
+from kcoin_vault.avm import (
+    APP_CALL_BUDGET,
+    MAX_UINT64,
+    MIN_BALANCE,
+    MIN_TXN_FEE,
+    FastAVMClient,
+    LogicError,
+    Value,
+    _AppCall,
+    _Group,
+    _Ledger,
+    assemble,
+)
+
+APP_ID = 1
+
+
+def _run(source: str, fee_credit: int = 0, app_balance: int = 0) -> Tuple[bool, List[Value], _AppCall]:
+    """Evaluate a program, with `; ` separating lines, as app `APP_ID` called alone in its group"""
+    ledger = _Ledger()
+    ledger.account(ledger.app_address(APP_ID))['amount'] = app_balance
+    group = _Group(txns=[{'type': 'appl', 'apid': APP_ID}], tx_ids=[''], fee_credit=fee_credit, budget=APP_CALL_BUDGET)
+    call = _AppCall(ledger, group, 0, APP_ID)
+    approved = call.run(assemble(source.replace('; ', '\n')))
+    return approved, call.stack, call
+
+
+@pytest.mark.parametrize(
+    'source,stack',
+    [
+        ('int 7; int 3; -', [4]),
+        ('int 7; int 3; /', [2]),
+        ('int 7; int 3; %', [1]),
+        ('int 6; int 7; *', [42]),
+        ('int 2; int 3; <', [1]),
+        ('int 2; int 0; &&', [0]),
+        ('byte "ab"; byte 0x6162; ==', [1]),
+        ('int 1; itob; btoi', [1]),
+        ('byte "ab"; byte "cd"; concat; len', [4]),
+        ('int 1; int 2; swap; pop', [2]),
+        ('int 5; store 3; load 3; dup; +', [10]),
+        ('int 0; bnz skip; int 9; b end\nskip:\nint 8\nend:', [9]),
+        ('callsub double; b end\ndouble:\nint 21; dup; +; retsub\nend:', [42]),
+        ('int pay; int appl; !=', [1]),
+        ('global CurrentApplicationID; txn ApplicationID; ==', [1]),
+    ],
+)
+def test_opcodes(source: str, stack: List[Value]) -> None:
+    approved, final_stack, _ = _run(source)
+    assert final_stack == stack
+    assert approved == (stack[-1] != 0)
+
+
+@pytest.mark.parametrize(
+    'source,error',
+    [
+        (f'int {MAX_UINT64}; int 1; +', 'overflow'),
+        ('int 1; int 2; -', 'underflow'),
+        (f'int {MAX_UINT64}; int 2; *', 'overflow'),
+        ('int 1; int 0; /', 'division by zero'),
+        ('int 1; int 0; %', 'modulo by zero'),
+        ('byte 0x010203040506070809; btoi', 'btoi of 9 bytes'),
+        ('int 1; byte "1"; ==', 'cannot compare'),
+        ('byte "1"; int 1; +', 'expected uint64'),
+        ('int 0; assert; int 1', 'assert failed'),
+        ('pop', 'stack underflow'),
+        ('retsub', 'empty call stack'),
+        ('int 1; int 1', 'stack finished with 2 elements'),
+        ('loop:\nb loop', 'budget exceeded'),
+    ],
+)
+def test_opcode_errors(source: str, error: str) -> None:
+    with pytest.raises(LogicError, match=error):
+        _run(source)
+
+
+def test_return_halts() -> None:
+    assert _run('int 0; return; int 1')[0] is False
+    assert _run('int 2; return; err')[0] is True
+
+
+def test_assemble_rejects_unsupported_opcodes() -> None:
+    with pytest.raises(LogicError, match='line 2: opcode sha256 is not supported'):
+        assemble('int 1\nsha256')
+    with pytest.raises(LogicError, match='line 1: invalid arguments'):
+        assemble('b nowhere')
+
+
+_INNER_PAYMENT = '''
+itxn_begin
+int pay
+itxn_field TypeEnum
+int 0
+itxn_field Amount
+itxn_submit
+int 1
+'''
+
+
+@pytest.mark.parametrize('fee_credit,fee', [(MIN_TXN_FEE, 0), (MIN_TXN_FEE - 1, MIN_TXN_FEE), (0, MIN_TXN_FEE)])
+def test_inner_fees_are_pooled(fee_credit: int, fee: int) -> None:
+    _, _, call = _run(_INNER_PAYMENT, fee_credit=fee_credit, app_balance=MIN_TXN_FEE)
+    assert call.last_inner is not None
+    assert call.last_inner[0]['fee'] == fee
+    assert call.ledger.account(call.ledger.app_address(APP_ID))['amount'] == MIN_TXN_FEE - fee
+    assert call.group.fee_credit == fee_credit - MIN_TXN_FEE + fee
+
+
+def test_inner_fee_below_the_minimum_needs_credit() -> None:
+    source = _INNER_PAYMENT.replace('itxn_submit', 'int 0\nitxn_field Fee\nitxn_submit')
+    with pytest.raises(LogicError, match='fee too small for inner transaction'):
+        _run(source, fee_credit=MIN_TXN_FEE - 1, app_balance=MIN_TXN_FEE)
+
+
+@pytest.fixture
+def algod() -> Tuple[FastAVMClient, str, str]:
+    private_key, address = generate_account()
+    return FastAVMClient(faucet_address=address), address, private_key
+
+
+def _payment(algod: FastAVMClient, sender: str, receiver: str, amount: int, fee: Optional[int] = None, **kwargs):
+    sp = algod.suggested_params()
+    if fee is not None:
+        sp.fee = fee
+        sp.flat_fee = True
+    return transaction.PaymentTxn(sender, sp, receiver, amount, **kwargs)
+
+
+def _send(algod: FastAVMClient, private_key: str, *txns: transaction.Transaction) -> None:
+    if len(txns) > 1:
+        transaction.assign_group_id(list(txns))
+    algod.send_transactions([txn.sign(private_key) for txn in txns])
+
+
+def _amount(algod: FastAVMClient, address: str) -> int:
+    return algod.account_info(address)['amount']
+
+
+def test_group_fees_are_pooled(algod: Tuple[FastAVMClient, str, str]) -> None:
+    client, address, private_key = algod
+    receiver = generate_account()[1]
+    _send(
+        client,
+        private_key,
+        _payment(client, address, receiver, MIN_BALANCE, fee=2 * MIN_TXN_FEE),
+        _payment(client, address, receiver, MIN_BALANCE, fee=0),
+    )
+    assert _amount(client, receiver) == 2 * MIN_BALANCE
+    with pytest.raises(AlgodHTTPError, match='fee too small'):
+        _send(
+            client,
+            private_key,
+            _payment(client, address, receiver, MIN_BALANCE, fee=MIN_TXN_FEE),
+            _payment(client, address, receiver, MIN_BALANCE, fee=MIN_TXN_FEE - 1),
+        )
+
+
+def test_min_balance(algod: Tuple[FastAVMClient, str, str]) -> None:
+    client, address, private_key = algod
+    private_key_2, receiver = generate_account()
+    with pytest.raises(AlgodHTTPError, match='below min'):
+        _send(client, private_key, _payment(client, address, receiver, MIN_BALANCE - 1))
+    _send(client, private_key, _payment(client, address, receiver, MIN_BALANCE + MIN_TXN_FEE))
+    assert client.account_info(receiver)['min-balance'] == MIN_BALANCE
+    with pytest.raises(AlgodHTTPError, match='below min'):
+        _send(client, private_key_2, _payment(client, receiver, address, 1))
+    # closing the account empties it, which needs no minimum balance
+    _send(client, private_key_2, _payment(client, receiver, address, 0, close_remainder_to=address))
+    assert _amount(client, receiver) == 0
+
+
+def test_rejected_group_is_rolled_back(algod: Tuple[FastAVMClient, str, str]) -> None:
+    client, address, private_key = algod
+    receiver = generate_account()[1]
+    before = _amount(client, address)
+    with pytest.raises(AlgodHTTPError, match='overspend'):
+        _send(
+            client,
+            private_key,
+            _payment(client, address, receiver, MIN_BALANCE),
+            _payment(client, address, receiver, before),
+        )
+    assert _amount(client, address) == before
+    assert _amount(client, receiver) == 0
+
+
+def test_rejects_a_foreign_genesis_hash(algod: Tuple[FastAVMClient, str, str]) -> None:
+    client, address, private_key = algod
+    txn = _payment(client, address, generate_account()[1], MIN_BALANCE)
+    txn.genesis_hash = base64.b64encode(bytes(32)).decode()
+    with pytest.raises(AlgodHTTPError, match='wrong genesis hash'):
+        _send(client, private_key, txn)
@@ -0,0 +1,46 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from kcoin_vault.cache import DiskCache
+
+
+def test_key_changes_with_any_part() -> None:
+    assert DiskCache.key('a', 'b') == DiskCache.key('a', b'b')
+    assert DiskCache.key('a', 'b') != DiskCache.key('a', 'c')
+    # parts are length-prefixed, so moving a boundary changes the key
+    assert DiskCache.key('ab', 'c') != DiskCache.key('a', 'bc')
+
+
+def test_get_returns_what_was_put(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path)
+    cache.put('k', {'passed': True})
+    assert cache.get('k') == {'passed': True}
+    assert cache.get('missing') is None
+
+
+def test_unreadable_entry_is_a_miss(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path)
+    (tmp_path / 'k.json').write_text('{not json')
+    assert cache.get('k') is None
+
+
+def test_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path, max_entries=2)
+    cache.put('a', {'n': 1})
+    cache.put('b', {'n': 2})
+    # make the insertion order unambiguous, whatever the resolution of the file system's timestamps
+    os.utime(tmp_path / 'a.json', (1, 1))
+    os.utime(tmp_path / 'b.json', (2, 2))
+    # a hit makes `a` the most recently used
+    assert cache.get('a') == {'n': 1}
+    cache.put('c', {'n': 3})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'n': 1}
+    assert cache.get('c') == {'n': 3}
+
+
+def test_size_must_be_positive(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        DiskCache(tmp_path, max_entries=0)
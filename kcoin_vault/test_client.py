@@ -0,0 +1,116 @@
+from typing import Any, Dict, Tuple
+
+import pytest
+from algosdk.account import generate_account
+from algosdk.error import AlgodHTTPError, ConfirmationTimeoutError
+from algosdk.logic import get_application_address
+from kavm.algod import KAVMClient
+
+from kcoin_vault.avm import FastAVMClient
+from kcoin_vault.client import SHARED_BACKEND_ATTRIBUTES, ContractClient, backend_state, copy_ledger
+
+
+def _balances(client: ContractClient, address: str) -> Dict[str, Any]:
+    return {addr: client.algod.account_info(addr) for addr in (address, get_application_address(client.app_id))}
+
+
+def _kcoins(client: ContractClient, address: str) -> int:
+    assets = client.algod.account_info(address)['assets']
+    return next(asset['amount'] for asset in assets if asset['asset-id'] == client.asset_id)
+
+
+def test_copy_ledger_copies_all_but_the_k_tooling() -> None:
+    tooling = object()
+    state = {'kavm': tooling, '_accounts': {'a': {'amount': 1}}}
+    copied = copy_ledger(state)
+    assert copied['kavm'] is tooling
+    assert copied['_accounts'] is not state['_accounts']
+    state['_accounts']['a']['amount'] = 2
+    assert copied['_accounts'] == {'a': {'amount': 1}}
+
+
+def test_backend_state_needs_the_k_tooling_of_kavm() -> None:
+    # a client that never loaded KAVM has none of the attributes to share
+    with pytest.raises(RuntimeError, match='no attribute kavm'):
+        backend_state(object.__new__(KAVMClient))
+    assert backend_state(FastAVMClient(faucet_address=generate_account()[1]))
+
+
+def test_kavm_snapshot_shares_only_the_k_tooling(request: pytest.FixtureRequest) -> None:
+    if request.config.getoption('--backend') != 'kavm' or request.config.getoption('kavm_server') is not None:
+        pytest.skip('needs KAVM loaded in this process, with --backend kavm')
+    creator = request.getfixturevalue('creator_account')
+    address, private_key = creator['address'], creator['private_key']
+    client = ContractClient(
+        request.getfixturevalue('algod'), address, private_key, 'kcoin_vault.kcoin_vault_pyteal_fixed'
+    )
+    snapshot = client.snapshot()
+    for name in SHARED_BACKEND_ATTRIBUTES:
+        assert snapshot[name] is getattr(client.algod, name)
+    deployed = _balances(client, address)
+    assert client.call_mint(address, private_key, 100000)
+    client.restore(snapshot)
+    assert _balances(client, address) == deployed
+
+
+def test_reset_restores_balances(fast_vault: Tuple[ContractClient, str, str]) -> None:
+    client, address, private_key = fast_vault
+    deployed = _balances(client, address)
+
+    minted = client.call_mint(address, private_key, 100000)
+    assert minted
+    assert _balances(client, address) != deployed
+
+    client.reset()
+    assert _balances(client, address) == deployed
+    # the bootstrap snapshot survives a restore, and the ledger keeps working after it
+    assert client.call_mint(address, private_key, 100000) == minted
+    client.reset()
+    assert _balances(client, address) == deployed
+
+
+def test_batch_execute_each_fails_only_the_rejected_call(fast_vault: Tuple[ContractClient, str, str]) -> None:
+    client, address, private_key = fast_vault
+    outcomes = client.batch(address, private_key).mint(10000).burn(10**9).mint(10000).execute_each()
+    assert [error is None for _, error in outcomes] == [True, False, True]
+    assert outcomes[0][0] == outcomes[2][0] > 0
+    # both mints are committed, the burn is not
+    assert _kcoins(client, address) == 2 * outcomes[0][0]
+
+
+def test_batch_execute_each_does_not_resubmit_a_group_that_may_have_committed(
+    fast_vault: Tuple[ContractClient, str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client, address, private_key = fast_vault
+    minted = client.call_mint(address, private_key, 10000)
+    with monkeypatch.context() as patched:
+        # the group is committed, but never seen as confirmed
+        patched.setattr(client.algod, 'pending_transaction_info', lambda *args, **kwargs: {})
+        with pytest.raises(ConfirmationTimeoutError):
+            client.batch(address, private_key).mint(10000).mint(10000).execute_each()
+    assert _kcoins(client, address) == 3 * minted
+
+
+def test_batch_groups_are_confirmed_in_one_sweep(
+    fast_vault: Tuple[ContractClient, str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client, address, private_key = fast_vault
+    waits = []
+    wait = client.confirmations.wait
+    monkeypatch.setattr(client.confirmations, 'wait', lambda tx_ids: waits.append(list(tx_ids)) or wait(waits[-1]))
+    minted = client.batch(address, private_key).mint(10000).mint(10000).execute()[0]
+    batch = client.batch(address, private_key)
+    for _ in range(20):
+        batch.mint(10000)
+    assert batch.execute() == [minted] * 20
+    # three groups of mints, with all 20 app calls confirmed together
+    assert [len(tx_ids) for tx_ids in waits] == [2, 20]
+    assert _kcoins(client, address) == 22 * minted
+
+
+def test_batch_execute_is_atomic_per_group(fast_vault: Tuple[ContractClient, str, str]) -> None:
+    client, address, private_key = fast_vault
+    with pytest.raises(AlgodHTTPError):
+        client.batch(address, private_key).mint(10000).burn(10**9).execute()
+    # the mint was rejected together with the burn
+    assert _kcoins(client, address) == 0
@@ -0,0 +1,86 @@
+from typing import Any, Tuple
+
+import pytest
+from algosdk import abi
+
+from kcoin_vault.client import ContractClient
+from kcoin_vault.dispatch import _arg_converter
+
+
+@pytest.mark.parametrize(
+    'type_str,value,converted',
+    [
+        ('uint64', 10000, 10000),
+        ('uint64', '10000', 10000),
+        ('uint64', 10000.0, 10000),
+        ('uint8', 255, 255),
+        ('ufixed64x2', 150, 150),
+        ('byte', 7, 7),
+        ('bool', True, True),
+        ('bool', 'false', False),
+        ('bool', 1, True),
+        ('string', 'a b', 'a b'),
+        ('byte[]', 'ab', b'ab'),
+        ('byte[2]', [1, 2], [1, 2]),
+        ('uint64[]', ['1', 2], [1, 2]),
+        ('(uint64,bool)', [1, 'true'], [1, True]),
+        ('asset', 3, 3),
+    ],
+)
+def test_converter(type_str: str, value: Any, converted: Any) -> None:
+    convert = _arg_converter(_type(type_str))
+    assert convert(value) == converted
+
+
+@pytest.mark.parametrize(
+    'type_str,value',
+    [
+        ('uint64', 'abc'),
+        ('uint64', -1),
+        ('uint64', 2**64),
+        ('uint8', 256),
+        ('uint64', True),
+        ('uint64', 1.5),
+        ('uint64', None),
+        ('bool', 'maybe'),
+        ('byte[2]', [1, 2, 3]),
+        ('uint64[]', 'abc'),
+        ('uint64[]', 5),
+        ('(uint64,bool)', [1]),
+        ('pay', -5),
+    ],
+)
+def test_converter_rejects(type_str: str, value: Any) -> None:
+    convert = _arg_converter(_type(type_str))
+    with pytest.raises((TypeError, ValueError)):
+        convert(value)
+
+
+def _type(type_str: str) -> Any:
+    if type_str in ('pay', 'axfer'):
+        return type_str
+    if type_str == 'asset':
+        return abi.ABIReferenceType.ASSET
+    return abi.ABIType.from_string(type_str)
+
+
+def test_prepare_call(fast_vault: Tuple[ContractClient, str, str]) -> None:
+    dispatcher = fast_vault[0].dispatcher
+    assert dispatcher.prepare_call('mint', ['10000']).args == (10000,)
+    assert dispatcher.prepare_call('init_asset', []).args == ()
+
+
+@pytest.mark.parametrize('method,args', [('mint', ['abc']), ('mint', []), ('mint', [1, 2]), ('mint_all', [1])])
+def test_prepare_call_rejects(fast_vault: Tuple[ContractClient, str, str], method: str, args: list) -> None:
+    with pytest.raises(ValueError):
+        fast_vault[0].dispatcher.prepare_call(method, args)
+
+
+def test_batch_rejects_a_malformed_call_when_it_is_queued(fast_vault: Tuple[ContractClient, str, str]) -> None:
+    client, address, private_key = fast_vault
+    batch = client.batch(address, private_key).mint(10000)
+    with pytest.raises(ValueError, match='payment'):
+        batch.mint('abc')
+    assert len(batch) == 1
+    [(output, error)] = batch.execute_each()
+    assert output and error is None
@@ -11,25 +11,31 @@ The PyTeal file above has a fault, hence Hypothesis finds the error. Test the fi
 poetry run kavm-demo test --pyteal-code-file kcoin_vault/kcoin_vault_pyteal_fixed.py \
                           --test-code-file kcoin_vault/test_mint_burn.py
 ```
+
+Add `--backend fast` to run the examples on the fast AVM, a Python interpreter of the compiled TEAL,
+and only re-check the counterexamples it finds on KAVM.
 '''
 
 from datetime import timedelta
 
-from hypothesis import Phase, given, settings
+from hypothesis import given, settings
 from hypothesis import strategies as st
 
 MIN_ARG_VALUE = 1 * 10**2
 MAX_ARG_VALUE = 1 * 10**6
 TEST_CASE_DEADLINE = timedelta(seconds=5)
-N_TESTS = 25
 
 
-@settings(deadline=TEST_CASE_DEADLINE, max_examples=N_TESTS, phases=[Phase.generate])
+# The number of examples and the phases are set by the options of the run, see conftest.py
+@settings(deadline=TEST_CASE_DEADLINE)
 @given(
     microalgos=st.integers(min_value=MIN_ARG_VALUE, max_value=MAX_ARG_VALUE),
 )
 def test_mint_burn(initial_state_fixture, microalgos: int) -> None:
     client, user_addr, user_private_key = initial_state_fixture
+    if client.supports_snapshots:
+        # start every example from the freshly deployed vault
+        client.reset()
     minted = client.call_mint(user_addr, user_private_key, microalgos)
     got_back = client.call_burn(user_addr, user_private_key, minted)
     assert abs(got_back - microalgos) <= 1
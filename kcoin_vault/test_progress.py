@@ -0,0 +1,97 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from kcoin_vault import progress
+from kcoin_vault.progress import KoreLog, ProofMonitor, descendant_processes
+
+
+def _entry(*locations: str) -> str:
+    rules = ', '.join(f'/k/avm-semantics.k:{location}' for location in locations)
+    return f'kore-exec: [1234] Debug (DebugAppliedRewriteRules): applied rules [{rules}]\n'
+
+
+def test_kore_log_counts_steps_and_branches(tmp_path: Path) -> None:
+    log = KoreLog(tmp_path / 'kore-exec.log')
+    log.update()
+    assert not log.started
+
+    with log.path.open('w') as f:
+        f.write(
+            _entry('10:3') + 'kore-exec: [1234] Info (InfoReachability): proving\n' + _entry('10:3', '12:5', '20:1')
+        )
+        f.flush()
+        log.update()
+        assert log.started
+        assert (log.steps, log.branches) == (2, 3)
+
+        # an entry still being written is only counted once it is complete
+        entry = _entry('30:7', '31:7')
+        f.write(entry[:20])
+        f.flush()
+        log.update()
+        assert (log.steps, log.branches) == (2, 3)
+        f.write(entry[20:])
+        f.flush()
+        log.update()
+        assert (log.steps, log.branches) == (3, 4)
+    log.close()
+    assert not log.started
+
+
+def test_kore_log_of_a_step_without_rules(tmp_path: Path) -> None:
+    log = KoreLog(tmp_path / 'kore-exec.log')
+    log.path.write_text(_entry())
+    log.update()
+    assert (log.steps, log.branches) == (1, 1)
+    log.close()
+
+
+def test_descendant_processes_without_proc(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(progress, '_proc_units', lambda: None)
+    assert descendant_processes(os.getpid()) == {}
+
+
+def test_descendant_processes_with_unreadable_proc(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(progress, '_proc_units', lambda: (100, 4096))
+
+    def listdir(path: str) -> Any:
+        raise PermissionError(path)
+
+    monkeypatch.setattr(os, 'listdir', listdir)
+    assert descendant_processes(os.getpid()) == {}
+
+
+@pytest.mark.parametrize('kore_log', [False, True])
+def test_monitor_sets_kore_exec_opts_only_with_kore_log(monkeypatch: pytest.MonkeyPatch, kore_log: bool) -> None:
+    monkeypatch.setenv('KORE_EXEC_OPTS', '--smt-timeout 100')
+    with ProofMonitor('mint', interval=60, kore_log=kore_log) as monitor:
+        opts = os.environ['KORE_EXEC_OPTS']
+    assert os.environ['KORE_EXEC_OPTS'] == '--smt-timeout 100'
+    assert opts.startswith('--smt-timeout 100')
+    assert ('--log ' in opts) == kore_log
+    assert monitor.last is not None
+    assert monitor.last.steps is None
+
+
+def test_monitor_survives_a_failing_final_sample(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    def fail() -> Any:
+        raise OSError('no /proc')
+
+    events = tmp_path / 'progress.jsonl'
+    with ProofMonitor('mint', interval=60, events=events) as monitor:
+        monkeypatch.setattr(monitor, 'sample', fail)
+    assert monitor.stats() == {}
+    assert not events.exists()
+
+
+def test_monitor_records_the_final_sample(tmp_path: Path) -> None:
+    events = tmp_path / 'progress.jsonl'
+    with ProofMonitor('mint', interval=60, events=events) as monitor:
+        pass
+    [record] = [json.loads(line) for line in events.read_text().splitlines()]
+    assert record['method'] == 'mint' and record['final']
+    assert set(monitor.stats()) == {'steps', 'branches', 'rewrite_s', 'smt_s', 'other_s', 'peak_rss_mb'}
@@ -0,0 +1,60 @@
+import logging
+import os
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from kcoin_vault.paths import SERVE_KEY
+from kcoin_vault.remote import connect_server
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Path:
+    return tmp_path / 'serve.sock'
+
+
+@pytest.fixture
+def server(socket_path: Path) -> Iterator[None]:
+    """A server answering one ping, with the key in its directory when it started"""
+    key = os.urandom(32)
+    socket_path.with_name(SERVE_KEY.name).write_bytes(key)
+    listener = Listener(str(socket_path), family='AF_UNIX', authkey=key)
+
+    def serve() -> None:
+        try:
+            with listener.accept() as conn:
+                conn.recv()
+                conn.send(('ok', 'pong'))
+        except AuthenticationError:
+            # the client's key is not the server's
+            pass
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield
+    thread.join(timeout=5)
+    listener.close()
+
+
+def test_connect_server(socket_path: Path, server: None) -> None:
+    client = connect_server(socket_path)
+    assert client is not None
+    client.close()
+
+
+def test_connect_server_without_server(socket_path: Path) -> None:
+    assert connect_server(socket_path) is None
+    socket_path.touch()
+    socket_path.with_name(SERVE_KEY.name).write_bytes(os.urandom(32))
+    assert connect_server(socket_path) is None
+
+
+def test_connect_server_with_a_stale_key(socket_path: Path, server: None, caplog: pytest.LogCaptureFixture) -> None:
+    socket_path.with_name(SERVE_KEY.name).write_bytes(os.urandom(32))
+    with caplog.at_level(logging.WARNING):
+        assert connect_server(socket_path) is None
+    assert 'serve --stop' in caplog.text
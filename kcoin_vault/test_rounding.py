@@ -0,0 +1,97 @@
+import io
+from typing import Any, List
+
+import pytest
+from pyteal import Add, App, Bytes, Div, Expr, Int, Minus, Mod, Mul, Sha256, Tmpl
+
+from kcoin_vault.rounding import _AMOUNT, check_round_trip, conversion, evaluate
+
+np = pytest.importorskip('numpy')
+
+MAX_UINT64 = 2**64 - 1
+AMOUNT = Tmpl.Int(_AMOUNT)
+RATE = App.globalGet(Bytes('exchange_rate'))
+
+
+def _evaluate(expr: Expr, amounts: List[int], rate: int = 2000) -> Any:
+    rejected = np.zeros(len(amounts), dtype=bool)
+    result = evaluate(np, expr, np.array(amounts, dtype=np.uint64), {'exchange_rate': rate}, rejected)
+    return result.tolist(), rejected.tolist()
+
+
+@pytest.mark.parametrize(
+    'expr,amounts,result',
+    [
+        (AMOUNT, [0, 7], [0, 7]),
+        (Int(3), [0, 7], [3, 3]),
+        (RATE, [0, 7], [2000, 2000]),
+        (App.globalGet(Bytes('missing')), [7], [0]),
+        (Add(AMOUNT, Int(1), Int(2)), [0, 7], [3, 10]),
+        (Minus(AMOUNT, Int(1)), [1, 7], [0, 6]),
+        (Mul(AMOUNT, RATE), [0, 7], [0, 14000]),
+        (Div(AMOUNT, Int(2)), [0, 7], [0, 3]),
+        (Mod(AMOUNT, Int(4)), [0, 7], [0, 3]),
+    ],
+)
+def test_evaluate(expr: Expr, amounts: List[int], result: List[int]) -> None:
+    assert _evaluate(expr, amounts) == (result, [False] * len(amounts))
+
+
+@pytest.mark.parametrize(
+    'expr,amounts,rejected',
+    [
+        (Add(AMOUNT, Int(1)), [MAX_UINT64 - 1, MAX_UINT64], [False, True]),
+        (Minus(AMOUNT, Int(1)), [1, 0], [False, True]),
+        (Mul(AMOUNT, Int(2)), [2**63 - 1, 2**63, 0], [False, True, False]),
+        (Mul(Int(0), AMOUNT), [MAX_UINT64], [False]),
+        (Div(Int(1), AMOUNT), [1, 0], [False, True]),
+        (Mod(Int(1), AMOUNT), [1, 0], [False, True]),
+    ],
+)
+def test_evaluate_flags_what_the_avm_rejects(expr: Expr, amounts: List[int], rejected: List[bool]) -> None:
+    assert _evaluate(expr, amounts)[1] == rejected
+
+
+def test_evaluate_keeps_earlier_rejections() -> None:
+    rejected = np.array([True, False])
+    evaluate(np, AMOUNT, np.array([1, 2], dtype=np.uint64), {}, rejected)
+    assert rejected.tolist() == [True, False]
+
+
+def test_evaluate_rejects_unsupported_expressions() -> None:
+    with pytest.raises(ValueError, match='Cannot evaluate'):
+        _evaluate(Sha256(Bytes('a')), [1])
+    with pytest.raises(ValueError, match='UTF-8'):
+        _evaluate(App.globalGet(Bytes('base16', '00')), [1])
+
+
+@pytest.mark.parametrize('module', ['kcoin_vault.kcoin_vault_pyteal', 'kcoin_vault.kcoin_vault_pyteal_fixed'])
+def test_evaluate_matches_the_subroutines(module: str) -> None:
+    from kcoin_vault.client import import_pyteal_module
+
+    amounts = [0, 1, 999, 1000, 12345, 10**6]
+    to_asset, _ = _evaluate(conversion(import_pyteal_module(module), 'algos_to_kcoin'), amounts)
+    to_algos, _ = _evaluate(conversion(import_pyteal_module(module), 'kcoin_to_algos'), to_asset)
+    assert to_asset == [amount * 2000 // 1000 for amount in amounts]
+    if module.endswith('_fixed'):
+        assert to_algos == [amount * 1000 // 2000 for amount in to_asset]
+    else:
+        assert to_algos == [amount // 2000 * 1000 for amount in to_asset]
+
+
+def test_check_round_trip() -> None:
+    fixed = check_round_trip('kcoin_vault.kcoin_vault_pyteal_fixed', 0, 10**5, chunk_size=4096)
+    assert (fixed.checked, fixed.failed, fixed.max_error) == (10**5 + 1, 0, 0)
+
+    failures = io.StringIO()
+    faulty = check_round_trip('kcoin_vault.kcoin_vault_pyteal', 100, 2000, chunk_size=256, failures_file=failures)
+    # burning returns whole thousands of microalgos
+    assert faulty.failed == sum(1 for amount in range(100, 2001) if amount % 1000 > 1)
+    assert faulty.failures[0].microalgos == 100 and faulty.failures[0].returned == 0
+    assert len(failures.getvalue().splitlines()) == faulty.failed + 1
+
+
+@pytest.mark.parametrize('min_microalgos,max_microalgos', [(10, 5), (-1, 5)])
+def test_check_round_trip_rejects_invalid_ranges(min_microalgos: int, max_microalgos: int) -> None:
+    with pytest.raises(ValueError, match='Invalid range'):
+        check_round_trip('kcoin_vault.kcoin_vault_pyteal_fixed', min_microalgos, max_microalgos)
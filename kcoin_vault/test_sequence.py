@@ -0,0 +1,74 @@
+import io
+import json
+import logging
+from typing import Iterator, Tuple
+
+import pytest
+
+from kcoin_vault.client import ContractClient
+from kcoin_vault.sequence import MethodCall, parse_calls, read_calls, run_calls
+
+
+@pytest.mark.parametrize(
+    'line,calls',
+    [
+        ('', []),
+        ('   ', []),
+        ('# mint(1)', []),
+        ('mint(10000)', [MethodCall('mint', (10000,))]),
+        ('mint(10000)  burn(20000)', [MethodCall('mint', (10000,)), MethodCall('burn', (20000,))]),
+        ('init_asset()', [MethodCall('init_asset', ())]),
+        ('f("a b", [1, 2]) g()', [MethodCall('f', ('a b', [1, 2])), MethodCall('g', ())]),
+        ('f(ADDR, 1)', [MethodCall('f', ('ADDR', 1))]),
+        ('mint(abc)', [MethodCall('mint', ('abc',))]),
+        ('{"method": "burn", "args": [20000]}', [MethodCall('burn', (20000,))]),
+        ('{"method": "mint", "amount": 10000}', [MethodCall('mint', (10000,))]),
+    ],
+)
+def test_parse_calls(line: str, calls: list) -> None:
+    assert parse_calls(line) == calls
+
+
+@pytest.mark.parametrize('line', ['mint', 'mint(1', 'mint(1)x'])
+def test_parse_calls_rejects_malformed_calls(line: str) -> None:
+    with pytest.raises(ValueError):
+        parse_calls(line)
+
+
+def test_call_str_round_trips() -> None:
+    call = MethodCall('f', ('a b', 1, [2]))
+    assert parse_calls(str(call)) == [call]
+
+
+def test_read_calls_is_lazy() -> None:
+    def lines() -> Iterator[str]:
+        yield 'mint(1) burn(2)'
+        raise AssertionError('read past the first call')
+
+    calls = read_calls(lines())
+    assert next(calls) == MethodCall('mint', (1,))
+
+
+def test_run_calls_fails_only_the_failing_call(
+    fast_vault: Tuple[ContractClient, str, str], caplog: pytest.LogCaptureFixture
+) -> None:
+    client, address, private_key = fast_vault
+    output = io.StringIO()
+    summary = run_calls(client, address, private_key, read_calls(['mint(10000) burn(1000000000) mint(10000)']), output)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert (summary.calls, summary.failed) == (3, 1)
+    assert ['error' in record for record in records] == [False, True, False]
+    assert records[0]['output'] == records[2]['output'] > 0
+    [warning] = [record for record in caplog.records if record.levelno >= logging.WARNING]
+    assert warning.getMessage().startswith('Call 1 failed: burn(1000000000)')
+
+
+def test_run_calls_fails_only_the_malformed_call(fast_vault: Tuple[ContractClient, str, str]) -> None:
+    client, address, private_key = fast_vault
+    output = io.StringIO()
+    summary = run_calls(client, address, private_key, read_calls(['mint(10000) mint(abc) mint(10000)']), output)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert (summary.calls, summary.failed) == (3, 1)
+    assert ['error' in record for record in records] == [False, True, False]
+    assert 'payment' in records[1]['error']
+    assert records[0]['output'] == records[2]['output'] > 0
@@ -0,0 +1,72 @@
+from typing import Iterator, List, Tuple
+
+import pytest
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    AtomicTransactionComposerStatus,
+    TransactionWithSigner,
+)
+from algosdk.future import transaction
+
+from kcoin_vault.signing import BulkSigner
+
+ACCOUNTS = [generate_account() for _ in range(3)]
+
+
+def _sp() -> transaction.SuggestedParams:
+    return transaction.SuggestedParams(
+        1000, 1, 1000, 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA=', 'test-v1', flat_fee=True
+    )
+
+
+def _payments(payments: range) -> List[Tuple[transaction.Transaction, str]]:
+    """Payments from alternating senders, all different"""
+    txns = []
+    for i in payments:
+        private_key, address = ACCOUNTS[i % len(ACCOUNTS)]
+        txns.append((transaction.PaymentTxn(address, _sp(), ACCOUNTS[0][1], i), private_key))
+    return txns
+
+
+@pytest.fixture(params=['in-process', 'pool'])
+def signer(request: pytest.FixtureRequest) -> Iterator[BulkSigner]:
+    # chunks of an odd size, so that the last one is partial
+    min_parallel = 10**6 if request.param == 'in-process' else 1
+    with BulkSigner(max_workers=2, chunk_size=7, min_parallel=min_parallel) as signer:
+        yield signer
+
+
+def test_sign_keeps_the_order(signer: BulkSigner) -> None:
+    txns = _payments(range(40))
+    signed = signer.sign(txns)
+    assert [stxn.transaction for stxn in signed] == [txn for txn, _ in txns]
+    assert [stxn.signature for stxn in signed] == [txn.sign(private_key).signature for txn, private_key in txns]
+
+
+def test_sign_nothing(signer: BulkSigner) -> None:
+    assert signer.sign([]) == []
+
+
+def _composer(payments: range) -> AtomicTransactionComposer:
+    """A composer of some of the `_payments`, built afresh as a composer assigns the group id"""
+    comp = AtomicTransactionComposer()
+    for txn, private_key in _payments(payments):
+        comp.add_transaction(TransactionWithSigner(txn, AccountTransactionSigner(private_key)))
+    return comp
+
+
+def test_sign_composers_keeps_the_groups(signer: BulkSigner) -> None:
+    groups = [range(0, 1), range(1, 4), range(4, 5), range(5, 12)]
+    signed_comp = _composer(groups[2])
+    signed_before = signed_comp.gather_signatures()
+    comps = [_composer(groups[0]), _composer(groups[1]), signed_comp, _composer(groups[3])]
+
+    signer.sign_composers(comps)
+    assert all(comp.status == AtomicTransactionComposerStatus.SIGNED for comp in comps)
+    # already signed composers are left as they are
+    assert signed_comp.signed_txns is signed_before
+    for comp, group in zip(comps, groups):
+        expected = _composer(group).gather_signatures()
+        assert [stxn.dictify() for stxn in comp.signed_txns] == [stxn.dictify() for stxn in expected]
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from kcoin_vault.stats import LATENCY_BUCKETS, ThroughputStats, percentile
+
+
+@pytest.mark.parametrize(
+    'p,expected',
+    [(0, 1.0), (10, 1.0), (11, 2.0), (50, 5.0), (51, 6.0), (90, 9.0), (99, 10.0), (100, 10.0)],
+)
+def test_percentile_nearest_rank(p: float, expected: float) -> None:
+    # in any order
+    values = [3.0, 10.0, 1.0, 7.0, 5.0, 2.0, 9.0, 4.0, 8.0, 6.0]
+    assert percentile(values, p) == expected
+
+
+def test_percentile_of_one_and_no_values() -> None:
+    assert percentile([0.5], 99) == 0.5
+    assert percentile([], 50) is None
+
+
+def test_summary_latency_percentiles() -> None:
+    stats = ThroughputStats()
+    for i in range(1, 101):
+        stats.record(i / 1000, n_txns=2)
+    latency = stats.summary()['latency_s']
+    assert latency == {'p50': 0.05, 'p90': 0.09, 'p99': 0.099, 'max': 0.1}
+    assert stats.summary()['txns'] == 200
+
+
+def test_summary_without_groups() -> None:
+    stats = ThroughputStats()
+    stats.record_failure('rejected')
+    summary = stats.summary()
+    assert summary['groups'] == 0
+    assert summary['failures_by_kind'] == {'rejected': 1}
+    # no latencies are null in the JSON report, not NaN, which is not valid JSON
+    assert json.loads(json.dumps(summary, allow_nan=False))['latency_s'] == dict.fromkeys(['p50', 'p90', 'p99', 'max'])
+    assert summary['throughput_tps'] == 0.0
+
+
+def test_histogram_bounds_are_inclusive() -> None:
+    stats = ThroughputStats()
+    for latency in (0.001, 0.0011, 10.0, 11.0):
+        stats.record(latency, n_txns=1)
+    histogram = stats.histogram()
+    assert len(histogram) == len(LATENCY_BUCKETS) + 1
+    assert histogram['<=0.001s'] == 1
+    assert histogram['<=0.0025s'] == 1
+    assert histogram['<=10.0s'] == 1
+    assert histogram['>10.0s'] == 1
+    assert sum(histogram.values()) == 4
@@ -0,0 +1,40 @@
+import base64
+from typing import Tuple
+
+import pytest
+from algosdk import encoding
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, AtomicTransactionComposer
+
+from kcoin_vault.client import CALL_FEE, ContractClient
+from kcoin_vault.templates import CallTemplate
+
+NOTE = b'kavm-demo-note'
+
+
+@pytest.mark.parametrize('method', ['mint', 'burn'])
+@pytest.mark.parametrize('amount', [0, 1, 10000, 2**64 - 1])
+def test_template_signs_what_the_composer_does(
+    fast_vault: Tuple[ContractClient, str, str], monkeypatch: pytest.MonkeyPatch, method: str, amount: int
+) -> None:
+    client, address, private_key = fast_vault
+    template = CallTemplate(client, method, address, private_key, client.suggested_params.get(fee=CALL_FEE))
+    # the rounds differ from the ones the template was built with
+    sp = client.suggested_params.get(fee=CALL_FEE)
+    sp.first += 7
+    sp.last += 7
+
+    monkeypatch.setattr(client, '_next_note', lambda: NOTE)
+    comp = AtomicTransactionComposer()
+    client.dispatcher.add_call(comp, address, AccountTransactionSigner(private_key), sp, method, [amount])
+    stxns = comp.gather_signatures()
+
+    signed = template.sign(amount, sp, NOTE)
+    assert signed.raw == b''.join(base64.b64decode(encoding.msgpack_encode(stxn)) for stxn in stxns)
+    assert list(signed.tx_ids) == comp.tx_ids
+    assert signed.method == client.dispatcher.prepared(method).method
+
+
+def test_template_needs_a_single_transaction_argument(fast_vault: Tuple[ContractClient, str, str]) -> None:
+    client, address, private_key = fast_vault
+    with pytest.raises(ValueError, match='init_asset'):
+        CallTemplate(client, 'init_asset', address, private_key, client.suggested_params.get(fee=CALL_FEE))
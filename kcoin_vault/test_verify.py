@@ -0,0 +1,126 @@
+import ast
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any, List
+
+import pytest
+
+from kcoin_vault.cache import DiskCache
+from kcoin_vault.verify import (
+    global_state_reads,
+    method_dependencies,
+    method_fingerprints,
+    prove_method,
+    prove_methods,
+)
+
+
+def _fake_prover(monkeypatch: pytest.MonkeyPatch, prove: Any) -> None:
+    class AutoProver:
+        def __init__(self, **kwargs: Any) -> None:
+            pass
+
+        def prove(self, method: str) -> Any:
+            return prove()
+
+    module = ModuleType('kavm.prover')
+    module.AutoProver = AutoProver  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, 'kavm.prover', module)
+
+
+def _exit(code: Any) -> Any:
+    sys.exit(code)
+
+
+@pytest.mark.parametrize(
+    'prove,passed',
+    [
+        (lambda: True, True),
+        (lambda: False, False),
+        (lambda: None, True),
+        (lambda: _exit(0), True),
+        (lambda: _exit(None), True),
+        (lambda: _exit(1), False),
+    ],
+)
+def test_prove_method_verdict(monkeypatch: pytest.MonkeyPatch, tmp_path: Any, prove: Any, passed: bool) -> None:
+    monkeypatch.chdir(tmp_path)
+    _fake_prover(monkeypatch, prove)
+    result = prove_method('kcoin_vault.kcoin_vault_pyteal_fixed', 'mint', {}, {}, progress_interval=60)
+    assert result.passed == passed
+
+
+def test_prove_method_records_errors(monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    monkeypatch.chdir(tmp_path)
+    _fake_prover(monkeypatch, lambda: {}['unknown'])
+    result = prove_method('kcoin_vault.kcoin_vault_pyteal_fixed', 'mint', {}, {}, progress_interval=60)
+    assert not result.passed
+    assert result.error == "KeyError: 'unknown'"
+
+
+def test_prove_method_records_exit_code(monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    monkeypatch.chdir(tmp_path)
+    _fake_prover(monkeypatch, lambda: _exit(3))
+    result = prove_method('kcoin_vault.kcoin_vault_pyteal_fixed', 'mint', {}, {}, progress_interval=60)
+    assert not result.passed
+    assert result.error == 'exit code 3'
+
+
+@pytest.mark.parametrize('prove,cached', [(lambda: None, True), (lambda: False, True), (lambda: _exit(1), False)])
+def test_prove_methods_caches_definite_verdicts(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Any, prove: Any, cached: bool
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    _fake_prover(monkeypatch, prove)
+    cache = DiskCache(tmp_path / 'proof-cache')
+    prove_methods('kcoin_vault.kcoin_vault_pyteal_fixed', ['mint'], {}, {}, jobs=1, cache=cache)
+    [result] = prove_methods('kcoin_vault.kcoin_vault_pyteal_fixed', ['mint'], {}, {}, jobs=1, cache=cache)
+    assert result.cached == cached
+
+
+FIXED_SOURCE = Path(__file__).with_name('kcoin_vault_pyteal_fixed.py').read_text()
+
+
+def _changed(tmp_path: Path, old: str, new: str) -> List[str]:
+    """The methods whose fingerprint changes when `old` is replaced by `new` in the vault's source"""
+    assert old in FIXED_SOURCE
+    before, after = tmp_path / 'before.py', tmp_path / 'after.py'
+    before.write_text(FIXED_SOURCE)
+    after.write_text(FIXED_SOURCE.replace(old, new))
+    methods = ['init_asset', 'mint', 'burn']
+    fingerprints = method_fingerprints(before, methods)
+    return [
+        method
+        for method, fingerprint in method_fingerprints(after, methods).items()
+        if fingerprint != fingerprints[method]
+    ]
+
+
+@pytest.mark.parametrize(
+    'old,new,changed',
+    [
+        ('# The PyTeal router', '# The router', []),
+        ('Convert microKs to microalgos', 'Convert microKs back to microalgos', []),
+        ('    return approval, clear, contract', '\n    return (approval, clear, contract)', []),
+        (
+            'def compile_to_teal()',
+            '@router.method\ndef noop() -> Expr:\n    return Approve()\n\n\ndef compile_to_teal()',
+            [],
+        ),
+        ('Div(Mul(asset_amount, Int(SCALING_FACTOR))', 'Div(Mul(Int(SCALING_FACTOR), asset_amount)', ['burn']),
+        ("'payment.get().amount() <= Int(20000)'", "'payment.get().amount() <= Int(30000)'", ['mint']),
+        ('SCALING_FACTOR = 1000', 'SCALING_FACTOR = 100', ['mint', 'burn']),
+        ('scratch_slots=True', 'scratch_slots=False', ['init_asset', 'mint', 'burn']),
+    ],
+)
+def test_method_fingerprints_change_with_dependencies_only(
+    tmp_path: Path, old: str, new: str, changed: List[str]
+) -> None:
+    assert _changed(tmp_path, old, new) == changed
+
+
+def test_global_state_reads_of_methods() -> None:
+    tree = ast.parse(FIXED_SOURCE)
+    assert global_state_reads(method_dependencies(tree, 'mint')) == ['asset_id', 'exchange_rate']
+    assert global_state_reads(method_dependencies(tree, 'burn')) == ['exchange_rate']
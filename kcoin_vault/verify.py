@@ -0,0 +1,431 @@
+import ast
+import copy
+import importlib.util
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field, replace
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Dict, Final, Iterable, List, Optional, Set, Tuple
+
+from kcoin_vault.cache import DiskCache
+from kcoin_vault.paths import PROOF_PROGRESS, PROOF_STATS
+from kcoin_vault.profiling import PROFILER, phase
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# Module-level definitions every method depends on: the program is compiled as a whole by this function
+COMPILATION_ROOTS: Final = ('compile_to_teal',)
+
+# Part of every proof cache key, bumped when what a cached verdict means changes, to drop the older verdicts.
+# 2: only definite verdicts are cached, a proof that could not be run to completion is re-run.
+PROOF_CACHE_VERSION: Final = '2'
+
+
+@dataclass(frozen=True)
+class ProofResult:
+    """
+    The outcome of proving one method
+
+    `error` is set when the prover gave no definite verdict: it could not be run to completion,
+    or exited with a non-zero code.
+    `phases` is the time spent generating the K spec and proving it,
+    `stats` the size of the proof's search space and the resources it took, see `ProofMonitor`.
+    """
+
+    method: str
+    passed: bool
+    duration: float
+    error: Optional[str] = None
+    cached: bool = False
+    phases: Dict[str, float] = field(default_factory=dict)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+
+def hoare_methods(pyteal_code_file: Path) -> List[str]:
+    """Names of the router methods decorated with `@router.hoare_method`, in source order"""
+    tree = ast.parse(Path(pyteal_code_file).read_text(), filename=str(pyteal_code_file))
+    return [
+        node.name
+        for node in tree.body
+        if isinstance(node, ast.FunctionDef)
+        and any(_decorator_name(decorator) == 'hoare_method' for decorator in node.decorator_list)
+    ]
+
+
+def _decorator_name(decorator: ast.expr) -> Optional[str]:
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator, ast.Attribute):
+        return decorator.attr
+    if isinstance(decorator, ast.Name):
+        return decorator.id
+    return None
+
+
+def method_conditions(pyteal_code_file: Path, namespace: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    The precondition and postcondition expressions of every method, from which KAVM generates the K spec
+
+    The `expr` arguments of the decorators are evaluated in `namespace`, the PyTeal module's globals,
+    so that constants interpolated into the expressions are accounted for.
+    """
+    source = Path(pyteal_code_file).read_text()
+    tree = ast.parse(source, filename=str(pyteal_code_file))
+    conditions = {}
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        exprs = []
+        for decorator in node.decorator_list:
+            kind = _decorator_name(decorator)
+            if kind not in ('precondition', 'postcondition') or not isinstance(decorator, ast.Call):
+                continue
+            args = [keyword.value for keyword in decorator.keywords if keyword.arg == 'expr'] + decorator.args
+            expr = eval(compile(ast.Expression(body=args[0]), str(pyteal_code_file), 'eval'), dict(namespace))
+            exprs.append(f'{kind}: {expr}')
+        conditions[node.name] = exprs
+    return conditions
+
+
+def method_dependencies(tree: ast.Module, method: str) -> List[ast.stmt]:
+    '''
+    The module-level statements a method depends on, in source order
+
+    Starting from the method and the compilation entry point, every module-level function, class
+    or assignment referenced by name is followed transitively, e.g. the subroutines the method calls,
+    the constants they use and the router the method is registered with.
+    Names imported from other modules are covered by their import statement only.
+    '''
+    definitions: Dict[str, List[ast.stmt]] = {}
+    for stmt in tree.body:
+        for name in _defined_names(stmt):
+            definitions.setdefault(name, []).append(stmt)
+
+    seen: Set[int] = set()
+    pending = [method, *COMPILATION_ROOTS]
+    while pending:
+        for stmt in definitions.get(pending.pop(), []):
+            if id(stmt) not in seen:
+                seen.add(id(stmt))
+                pending.extend(node.id for node in ast.walk(stmt) if isinstance(node, ast.Name))
+    return [stmt for stmt in tree.body if id(stmt) in seen]
+
+
+def _defined_names(stmt: ast.stmt) -> Iterable[str]:
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [stmt.name]
+    if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+        return [(alias.asname or alias.name).split('.')[0] for alias in stmt.names]
+    if isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+        targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+        return [node.id for target in targets for node in ast.walk(target) if isinstance(node, ast.Name)]
+    return []
+
+
+def global_state_reads(stmts: List[ast.stmt]) -> List[str]:
+    """The global state keys read with `App.globalGet(Bytes("..."))` in the given statements"""
+    keys = set()
+    for stmt in stmts:
+        for node in ast.walk(stmt):
+            if (
+                isinstance(node, ast.Call)
+                and _decorator_name(node.func) in ('globalGet', 'globalGetEx')
+                and node.args
+                and isinstance(node.args[-1], ast.Call)
+                and _decorator_name(node.args[-1].func) == 'Bytes'
+                and node.args[-1].args
+                and isinstance(node.args[-1].args[-1], ast.Constant)
+            ):
+                keys.add(str(node.args[-1].args[-1].value))
+    return sorted(keys)
+
+
+def method_fingerprints(pyteal_code_file: Path, methods: List[str]) -> Dict[str, str]:
+    '''
+    Fingerprint the source code of every method together with everything it depends on
+
+    The fingerprint changes with the method's body and decorators, the subroutines it calls,
+    the constants they use, the router and the compilation options, and the global state keys it reads,
+    but not with other methods, formatting, comments or docstrings.
+    '''
+    tree = ast.parse(Path(pyteal_code_file).read_text(), filename=str(pyteal_code_file))
+    fingerprints = {}
+    for method in methods:
+        stmts = method_dependencies(tree, method)
+        reads = global_state_reads(stmts)
+        _LOGGER.debug(
+            f'Method {method} depends on {[name for stmt in stmts for name in _defined_names(stmt)]}, '
+            f'reads global state {reads}'
+        )
+        fingerprints[method] = DiskCache.key(
+            *(ast.dump(_without_docstrings(stmt)) for stmt in stmts), *(f'global-state-read: {key}' for key in reads)
+        )
+    return fingerprints
+
+
+def _without_docstrings(stmt: ast.stmt) -> ast.stmt:
+    stmt = copy.deepcopy(stmt)
+    for node in ast.walk(stmt):
+        if (
+            isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+            and node.body
+            and isinstance(node.body[0], ast.Expr)
+            and isinstance(node.body[0].value, ast.Constant)
+            and isinstance(node.body[0].value.value, str)
+        ):
+            node.body = node.body[1:] or [ast.Pass()]
+    return stmt
+
+
+def proof_cache_keys(
+    pyteal_code_module_str: str,
+    methods: List[str],
+    sdk_app_creator_account_dict: Dict[str, Any],
+    sdk_app_account_dict: Dict[str, Any],
+) -> Dict[str, str]:
+    """
+    Content-address the proof of every method
+
+    A key covers everything the prover's verdict depends on: the fingerprint of the method's source code
+    and its dependencies, with the version of PyTeal that compiles it, the method's pre- and postconditions
+    together with the version of KAVM that turns them into a K spec, the method name and the account data.
+    Changing one method thus only invalidates the proofs of the methods that depend on the change.
+    """
+    from kcoin_vault.client import import_pyteal_module
+
+    module = import_pyteal_module(pyteal_code_module_str)
+    spec = importlib.util.find_spec(pyteal_code_module_str)
+    assert spec is not None and spec.origin is not None
+    fingerprints = method_fingerprints(Path(spec.origin), methods)
+    conditions = method_conditions(Path(spec.origin), vars(module))
+    versions = [_version('pyteal'), _version('kavm')]
+    accounts = json.dumps([sdk_app_creator_account_dict, sdk_app_account_dict], sort_keys=True)
+    return {
+        method: DiskCache.key(
+            PROOF_CACHE_VERSION, fingerprints[method], *versions, *conditions.get(method, []), method, accounts
+        )
+        for method in methods
+    }
+
+
+def _version(package: str) -> str:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def prove_method(
+    pyteal_code_module_str: str,
+    method: str,
+    sdk_app_creator_account_dict: Dict[str, Any],
+    sdk_app_account_dict: Dict[str, Any],
+    progress_interval: float = 10.0,
+    kore_log: bool = False,
+) -> ProofResult:
+    """
+    Build an `AutoProver` for a single method and prove its specification.
+
+    Safe to run in a worker process: prover failures, including the prover exiting,
+    are reported in the result rather than propagated.
+    A proof passes if the prover returns anything but False, or exits with code 0.
+    The progress of the proof is logged and streamed to `PROOF_PROGRESS` every `progress_interval` seconds,
+    with the rewrite steps and branches of kore-exec if `kore_log`, see `ProofMonitor`.
+    """
+    from kavm.prover import AutoProver
+
+    from kcoin_vault.progress import ProofMonitor
+
+    sys.setrecursionlimit(15000000)
+    start = time.perf_counter()
+    phases: Dict[str, float] = {}
+    passed = False
+    error = None
+    PROOF_PROGRESS.parent.mkdir(parents=True, exist_ok=True)
+    with ProofMonitor(method, interval=progress_interval, events=PROOF_PROGRESS, kore_log=kore_log) as monitor:
+        try:
+            # constructing the prover generates the K spec of the method
+            prover = AutoProver(
+                pyteal_module_name=pyteal_code_module_str,
+                app_id=1,
+                sdk_app_creator_account_dict=sdk_app_creator_account_dict,
+                sdk_app_account_dict=sdk_app_account_dict,
+                method_names=[method],
+            )
+            phases['spec-generation'] = time.perf_counter() - start
+            passed, error = _verdict(prover.prove(method))
+        except SystemExit as err:
+            passed = err.code in (0, None)
+            if not passed:
+                error = f'exit code {err.code}'
+        except Exception as err:
+            error = f'{type(err).__name__}: {err}'
+    duration = time.perf_counter() - start
+    if 'spec-generation' in phases:
+        phases['proof'] = duration - phases['spec-generation']
+    return ProofResult(
+        method=method, passed=passed, duration=duration, error=error, phases=phases, stats=monitor.stats()
+    )
+
+
+def _verdict(returned: Any) -> Tuple[bool, Optional[str]]:
+    # AutoProver.prove reports a failed proof by exiting or raising, not by its return value,
+    # so returning passes the proof unless the prover explicitly returned False
+    return returned is not False, None
+
+
+def prove_methods(
+    pyteal_code_module_str: str,
+    methods: List[str],
+    sdk_app_creator_account_dict: Dict[str, Any],
+    sdk_app_account_dict: Dict[str, Any],
+    jobs: Optional[int] = None,
+    cache: Optional[DiskCache] = None,
+    progress_interval: float = 10.0,
+    kore_log: bool = False,
+) -> List[ProofResult]:
+    """
+    Prove the specifications of several methods, each in its own worker process.
+
+    At most `jobs` proofs run at once, one per method by default, each reporting its progress
+    every `progress_interval` seconds.
+    With a `cache`, methods whose earlier verdict is still valid are not re-proved.
+    Only definite verdicts are cached: a proof that ended with an error is re-run the next time.
+    Results are returned in the order of `methods`.
+    """
+    results: Dict[str, ProofResult] = {}
+    keys: Dict[str, str] = {}
+    if cache is not None:
+        with phase('proof-cache-keys'):
+            keys = proof_cache_keys(pyteal_code_module_str, methods, sdk_app_creator_account_dict, sdk_app_account_dict)
+        for method in methods:
+            entry = cache.get(keys[method])
+            if entry is not None:
+                results[method] = _log_result(replace(ProofResult(**entry), cached=True))
+
+    to_prove = [method for method in methods if method not in results]
+    for result in _prove(
+        pyteal_code_module_str,
+        to_prove,
+        sdk_app_creator_account_dict,
+        sdk_app_account_dict,
+        jobs,
+        progress_interval,
+        kore_log,
+    ):
+        results[result.method] = result
+        # proofs may run in worker processes, so their phases are recorded here rather than where they ran
+        if result.phases:
+            PROFILER.add(f'prove-{result.method}', result.duration)
+        for name, seconds in result.phases.items():
+            PROFILER.add(f'prove-{result.method}/{name}', seconds)
+        if cache is not None and result.error is None:
+            cache.put(keys[result.method], asdict(result))
+    return [results[method] for method in methods]
+
+
+def _prove(
+    pyteal_code_module_str: str,
+    methods: List[str],
+    sdk_app_creator_account_dict: Dict[str, Any],
+    sdk_app_account_dict: Dict[str, Any],
+    jobs: Optional[int],
+    progress_interval: float,
+    kore_log: bool,
+) -> List[ProofResult]:
+    if not methods:
+        return []
+    jobs = jobs or len(methods)
+    if jobs == 1 or len(methods) == 1:
+        return [
+            _log_result(
+                prove_method(
+                    pyteal_code_module_str,
+                    method,
+                    sdk_app_creator_account_dict,
+                    sdk_app_account_dict,
+                    progress_interval,
+                    kore_log,
+                )
+            )
+            for method in methods
+        ]
+
+    results = []
+    _LOGGER.info(f'Proving {len(methods)} methods with {jobs} parallel jobs')
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                prove_method,
+                pyteal_code_module_str,
+                method,
+                sdk_app_creator_account_dict,
+                sdk_app_account_dict,
+                progress_interval,
+                kore_log,
+            ): method
+            for method in methods
+        }
+        for future in as_completed(futures):
+            method = futures[future]
+            try:
+                result = future.result()
+            except Exception as err:
+                result = ProofResult(method=method, passed=False, duration=0.0, error=f'worker crashed: {err}')
+            results.append(_log_result(result))
+    return results
+
+
+def _log_result(result: ProofResult) -> ProofResult:
+    if result.cached:
+        _LOGGER.info(f'Reusing cached verdict for method {result.method}: {"proved" if result.passed else "failed"}')
+    elif result.passed:
+        _LOGGER.info(f'Proved method {result.method} in {result.duration:.1f}s')
+    else:
+        _LOGGER.error(
+            f'Failed to prove method {result.method} in {result.duration:.1f}s: {result.error or "proof failed"}'
+        )
+    return result
+
+
+def report(results: List[ProofResult]) -> bool:
+    """Log a combined pass/fail report, returning whether every proof passed"""
+    width = max(len(result.method) for result in results)
+    lines = [
+        f'{result.method:<{width}}  {"PASS" if result.passed else "FAIL"}  {result.duration:8.1f}s'
+        + _stats_summary(result.stats)
+        + ('  (cached)' if result.cached else '')
+        for result in results
+    ]
+    n_passed = sum(result.passed for result in results)
+    lines.append(f'{n_passed}/{len(results)} methods verified')
+    _LOGGER.info('Verification report:\n' + '\n'.join(lines))
+    return n_passed == len(results)
+
+
+def _stats_summary(stats: Dict[str, Any]) -> str:
+    if not stats:
+        return ''
+    search = f'  {stats["steps"]:>8} steps  {stats["branches"]:>5} branches' if stats.get('steps') is not None else ''
+    return f'{search}  rewriting {stats["rewrite_s"]:8.1f}s  SMT {stats["smt_s"]:8.1f}s'
+
+
+def write_stats(results: List[ProofResult], path: Path = PROOF_STATS) -> None:
+    """Write the outcome, time and search-space statistics of every method's proof, as a JSON object by method"""
+    stats = {
+        result.method: {
+            'passed': result.passed,
+            'duration_s': result.duration,
+            'cached': result.cached,
+            'error': result.error,
+            'phases': result.phases,
+            **result.stats,
+        }
+        for result in results
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(stats, indent=2) + '\n')
@@ -0,0 +1,155 @@
+import json
+import logging
+import random
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final, List, Optional
+
+from kcoin_vault.profiling import PROFILER
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+WORKERS_DIR: Final = Path('.kavm') / 'test-workers'
+
+
+@dataclass(frozen=True)
+class WorkerFailure:
+    test: str
+    message: str
+    details: str
+
+
+@dataclass(frozen=True)
+class WorkerResult:
+    index: int
+    seed: Optional[int]
+    max_examples: int
+    returncode: int
+    log_file: Path
+    failures: List[WorkerFailure]
+
+
+def split_examples(examples: int, workers: int) -> List[int]:
+    """Share out an example budget as evenly as possible"""
+    return [examples // workers + (1 if i < examples % workers else 0) for i in range(workers)]
+
+
+def run_pytest_workers(
+    pytest_args: List[str],
+    examples: int,
+    workers: int,
+    seed: Optional[int] = None,
+    profile: bool = False,
+    seeded: bool = True,
+) -> int:
+    """
+    Run a property test suite in `workers` pytest processes, splitting the example budget between them
+
+    Every worker sets up its own backend and deployed contract through the session fixtures,
+    and explores a different part of the input space thanks to its own Hypothesis seed.
+    The failures of all workers are reported together; returns the exit code of the whole run.
+    With `profile`, every worker profiles its phases and they are merged into this process's profile.
+    Hypothesis does not save the failing examples of seeded runs in its example database;
+    without `seeded`, the workers are left to pick random seeds of their own, so that their failures are saved.
+    """
+    WORKERS_DIR.mkdir(parents=True, exist_ok=True)
+    seed = seed if seed is not None else random.getrandbits(32)
+    procs = []
+    for i, max_examples in enumerate(split_examples(examples, workers)):
+        if max_examples == 0:
+            continue
+        worker_seed = seed + i if seeded else None
+        log_file = WORKERS_DIR / f'worker-{i}.log'
+        junit_file = WORKERS_DIR / f'worker-{i}.xml'
+        profile_file = WORKERS_DIR / f'worker-{i}-profile.json'
+        junit_file.unlink(missing_ok=True)
+        profile_file.unlink(missing_ok=True)
+        args = [
+            sys.executable,
+            '-m',
+            'pytest',
+            *pytest_args,
+            f'--max-examples={max_examples}',
+            *([f'--hypothesis-seed={worker_seed}'] if worker_seed is not None else []),
+            f'--junitxml={junit_file}',
+            '--tb=short',
+            '-p',
+            'no:cacheprovider',
+            *([f'--profile-report={profile_file}'] if profile else []),
+        ]
+        with log_file.open('w') as log:
+            procs.append(
+                (
+                    i,
+                    worker_seed,
+                    max_examples,
+                    log_file,
+                    junit_file,
+                    profile_file,
+                    subprocess.Popen(args, stdout=log, stderr=subprocess.STDOUT),
+                )
+            )
+    _LOGGER.info(
+        f'Running {examples} examples in {len(procs)} workers'
+        + (f' with base seed {seed}' if seeded else '')
+        + f', logs in {WORKERS_DIR}'
+    )
+
+    results = []
+    for i, worker_seed, max_examples, log_file, junit_file, profile_file, proc in procs:
+        returncode = proc.wait()
+        if profile and profile_file.exists():
+            PROFILER.merge(json.loads(profile_file.read_text()), f'worker-{i}')
+        results.append(
+            WorkerResult(
+                index=i,
+                seed=worker_seed,
+                max_examples=max_examples,
+                returncode=returncode,
+                log_file=log_file,
+                failures=_junit_failures(junit_file),
+            )
+        )
+    return _report(results)
+
+
+def _junit_failures(junit_file: Path) -> List[WorkerFailure]:
+    if not junit_file.exists():
+        return []
+    failures = []
+    for testcase in ET.parse(junit_file).getroot().iter('testcase'):
+        for failure in [*testcase.iter('failure'), *testcase.iter('error')]:
+            failures.append(
+                WorkerFailure(
+                    test=f'{testcase.get("classname")}::{testcase.get("name")}',
+                    message=failure.get('message', ''),
+                    details=failure.text or '',
+                )
+            )
+    return failures
+
+
+def _report(results: List[WorkerResult]) -> int:
+    n_failed = 0
+    for result in results:
+        worker = f'Worker {result.index}' + (f' (seed {result.seed})' if result.seed is not None else '')
+        if result.returncode == 0:
+            _LOGGER.info(f'{worker}: {result.max_examples} examples passed')
+            continue
+        n_failed += 1
+        if not result.failures:
+            _LOGGER.error(f'{worker} exited with {result.returncode}, see {result.log_file}')
+        for failure in result.failures:
+            _LOGGER.error(
+                f'{worker} failed {failure.test}: {failure.message}\n{failure.details}'
+                + (
+                    f'\nReproduce with --workers 1 --seed {result.seed} --examples {result.max_examples}'
+                    if result.seed is not None
+                    else ''
+                )
+            )
+    _LOGGER.info(f'{len(results) - n_failed}/{len(results)} workers passed')
+    return 1 if n_failed else 0